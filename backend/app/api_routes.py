@@ -5,6 +5,8 @@ These are the programmatic API routes that require API key authentication
 (dependencies=[Depends(require_api_key)]).
 """
 
+import asyncio
+
 from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Depends, status
 from fastapi.responses import JSONResponse
 
@@ -72,6 +74,7 @@ def job_status(request: Request, job_id: str):
             allowed = conn.execute(
                 "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
                 (job.patient_id, tenant_id),
+                prepare=True,
             ).fetchone()
         elif job.document_id:
             allowed = conn.execute(
@@ -82,6 +85,7 @@ def job_status(request: Request, job_id: str):
                 WHERE d.id = %s AND p.tenant_id = %s
                 """,
                 (job.document_id, tenant_id),
+                prepare=True,
             ).fetchone()
         if not allowed:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -94,17 +98,6 @@ def job_status(request: Request, job_id: str):
             tenant_id=tenant_id,
         )
         conn.commit()
-        return JobStatus(job_id=job.id, status=job.status)
-    with get_conn() as conn:
-        _log_action(
-            conn,
-            str(job.patient_id) if job.patient_id else None,
-            "job.status_view",
-            actor,
-            {"job_id": job.id, "status": job.status},
-            tenant_id=tenant_id,
-        )
-        conn.commit()
     return JobStatus(job_id=job.id, status=job.status)
 
 
@@ -168,19 +161,23 @@ def delete_patient(request: Request, patient_id: str):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
     with get_conn() as conn:
+        # Tenant check and storage paths in one round-trip.
         patient = conn.execute(
-            "SELECT id FROM patients WHERE id = %s AND tenant_id = %s",
+            """
+            SELECT ARRAY(SELECT d.storage_path FROM documents d WHERE d.patient_id = p.id) AS paths
+            FROM patients p
+            WHERE p.id = %s AND p.tenant_id = %s
+            """,
             (patient_id, tenant_id),
         ).fetchone()
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
-        rows = conn.execute(
-            "SELECT storage_path FROM documents WHERE patient_id = %s",
-            (patient_id,),
-        ).fetchall()
-        paths = [row["storage_path"] for row in rows]
-        _log_action(conn, patient_id, "patient.delete", actor, {"files": len(paths)}, tenant_id=tenant_id)
-        conn.execute("DELETE FROM patients WHERE id = %s AND tenant_id = %s", (patient_id, tenant_id))
+        paths = list(patient["paths"])
+        # The audit rows reference the patient, so they are written before the
+        # DELETE; pipeline mode sends both without waiting in between.
+        with conn.pipeline():
+            _log_action(conn, patient_id, "patient.delete", actor, {"files": len(paths)}, tenant_id=tenant_id)
+            conn.execute("DELETE FROM patients WHERE id = %s AND tenant_id = %s", (patient_id, tenant_id))
         conn.commit()
 
     if paths:
@@ -209,7 +206,7 @@ def delete_patient(request: Request, patient_id: str):
 async def upload_document(request: Request, patient_id: str, file: UploadFile = File(...)):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
-    doc = _upload_document(patient_id, file, actor=actor, tenant_id=tenant_id)
+    doc = await asyncio.to_thread(_upload_document, patient_id, file, actor=actor, tenant_id=tenant_id)
     return doc
 
 
@@ -288,22 +285,19 @@ def delete_document(request: Request, document_id: str):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
     with get_conn() as conn:
+        # Tenant-scoped delete in one statement; no row means the document is
+        # missing or belongs to another tenant.
         doc = conn.execute(
             """
-            SELECT id, patient_id, storage_path
-            FROM documents
-            WHERE id = %s
+            DELETE FROM documents d
+            USING patients p
+            WHERE d.id = %s AND p.id = d.patient_id AND p.tenant_id = %s
+            RETURNING d.id, d.patient_id, d.storage_path
             """,
-            (document_id,),
+            (document_id, tenant_id),
         ).fetchone()
         if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
-        allowed = conn.execute(
-            "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
-            (str(doc["patient_id"]), tenant_id),
-        ).fetchone()
-        if not allowed:
-            raise HTTPException(status_code=404, detail="Document not found")
         _log_action(
             conn,
             str(doc["patient_id"]),
@@ -312,7 +306,6 @@ def delete_document(request: Request, document_id: str):
             {"document_id": document_id},
             tenant_id=tenant_id,
         )
-        conn.execute("DELETE FROM documents WHERE id = %s", (document_id,))
         conn.commit()
 
     try:
@@ -337,30 +330,33 @@ def delete_document(request: Request, document_id: str):
     response_model=ExtractionResult | JobStatus,
     dependencies=[Depends(require_api_key), Depends(require_write_scope)],
 )
-def extract_document(request: Request, document_id: str, async_process: bool = False):
+def extract_document(request: Request, document_id: str, async_process: bool = False, refresh: bool = False):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
-    with get_conn() as conn:
-        allowed = conn.execute(
-            """
-            SELECT 1
-            FROM documents d
-            JOIN patients p ON p.id = d.patient_id
-            WHERE d.id = %s AND p.tenant_id = %s
-            """,
-            (document_id, tenant_id),
-        ).fetchone()
-    if not allowed:
-        raise HTTPException(status_code=404, detail="Document not found")
     if settings.job_queue_enabled or async_process:
+        with get_conn() as conn:
+            allowed = conn.execute(
+                """
+                SELECT 1
+                FROM documents d
+                JOIN patients p ON p.id = d.patient_id
+                WHERE d.id = %s AND p.tenant_id = %s
+                """,
+                (document_id, tenant_id),
+                prepare=True,
+            ).fetchone()
+        if not allowed:
+            raise HTTPException(status_code=404, detail="Document not found")
         job_id = enqueue_job(
             "extract",
-            {"document_id": document_id, "actor": actor, "tenant_id": tenant_id},
+            {"document_id": document_id, "actor": actor, "tenant_id": tenant_id, "refresh": refresh},
             tenant_id=tenant_id,
             document_id=document_id,
         )
         return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=status.HTTP_202_ACCEPTED)
-    return _extract_document(document_id, actor=actor, tenant_id=tenant_id)
+    # _extract_document's tenant-scoped lookup 404s on its own, so the inline
+    # path skips the separate check.
+    return _extract_document(document_id, actor=actor, tenant_id=tenant_id, refresh=refresh)
 
 
 @router.post(
@@ -371,19 +367,20 @@ def extract_document(request: Request, document_id: str, async_process: bool = F
 def embed_document(request: Request, document_id: str, async_process: bool = False):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
-    with get_conn() as conn:
-        allowed = conn.execute(
-            """
-            SELECT 1
-            FROM documents d
-            JOIN patients p ON p.id = d.patient_id
-            WHERE d.id = %s AND p.tenant_id = %s
-            """,
-            (document_id, tenant_id),
-        ).fetchone()
-    if not allowed:
-        raise HTTPException(status_code=404, detail="Document not found")
     if settings.job_queue_enabled or async_process:
+        with get_conn() as conn:
+            allowed = conn.execute(
+                """
+                SELECT 1
+                FROM documents d
+                JOIN patients p ON p.id = d.patient_id
+                WHERE d.id = %s AND p.tenant_id = %s
+                """,
+                (document_id, tenant_id),
+                prepare=True,
+            ).fetchone()
+        if not allowed:
+            raise HTTPException(status_code=404, detail="Document not found")
         job_id = enqueue_job(
             "embed",
             {"document_id": document_id, "actor": actor, "tenant_id": tenant_id},
@@ -391,6 +388,8 @@ def embed_document(request: Request, document_id: str, async_process: bool = Fal
             document_id=document_id,
         )
         return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=status.HTTP_202_ACCEPTED)
+    # As with extraction, the tenant-scoped lookup in _embed_document 404s on
+    # its own, so the inline path skips the separate check.
     return _embed_document(document_id, actor=actor, tenant_id=tenant_id)
 
 
@@ -402,14 +401,15 @@ def embed_document(request: Request, document_id: str, async_process: bool = Fal
 def draft_chr(request: Request, payload: ChrDraftRequest, async_process: bool = False):
     actor = getattr(request.state, "actor", "api")
     tenant_id = require_tenant_id(request)
-    with get_conn() as conn:
-        allowed = conn.execute(
-            "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
-            (payload.patient_id, tenant_id),
-        ).fetchone()
-    if not allowed:
-        raise HTTPException(status_code=404, detail="Patient not found")
     if settings.job_queue_enabled or async_process:
+        with get_conn() as conn:
+            allowed = conn.execute(
+                "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
+                (payload.patient_id, tenant_id),
+                prepare=True,
+            ).fetchone()
+        if not allowed:
+            raise HTTPException(status_code=404, detail="Patient not found")
         job_id = enqueue_job(
             "draft_chr",
             {"patient_id": payload.patient_id, "notes": payload.notes, "actor": actor, "tenant_id": tenant_id},
@@ -417,4 +417,6 @@ def draft_chr(request: Request, payload: ChrDraftRequest, async_process: bool =
             patient_id=payload.patient_id,
         )
         return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=status.HTTP_202_ACCEPTED)
+    # _aggregate_structured only reads the tenant's own patients, so a foreign
+    # or unknown patient_id 404s there.
     return _draft_chr(payload.patient_id, payload.notes, actor=actor, tenant_id=tenant_id)
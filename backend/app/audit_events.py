@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Any
 from uuid import UUID
 
 from psycopg.types.json import Json
 
-from .db import get_actor_context, get_tenant_context
+from .db import get_actor_context, get_async_conn, get_conn, get_tenant_context, set_tenant_context
+
+_logger = logging.getLogger(__name__)
+
+# Batched writer limits: flush after this many queued events or this many seconds.
+_AUDIT_BATCH_MAX = 500
+_AUDIT_FLUSH_INTERVAL_S = 0.1
+# Pause before re-trying events whose write failed.
+_AUDIT_RETRY_BACKOFF_S = 1.0
+
+_audit_queue: asyncio.Queue | None = None
+_audit_flusher_task: asyncio.Task | None = None
+# Events the flusher could not write yet; retried before newly queued ones
+# and flushed by stop_audit_flusher.
+_audit_retry: list[tuple] = []
 
 
 def _to_uuid(value: str | None):
@@ -17,6 +33,58 @@ def _to_uuid(value: str | None):
         return None
 
 
+_INSERT_AUDIT_EVENT_SQL = """
+    INSERT INTO audit_events (
+        tenant_id,
+        actor_id,
+        actor,
+        ip_address,
+        user_agent,
+        request_id,
+        resource_type,
+        resource_id,
+        action,
+        outcome,
+        details
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _audit_event_params(
+    *,
+    action: str,
+    resource_type: str,
+    resource_id: str | None = None,
+    outcome: str = "SUCCESS",
+    details: dict[str, Any] | None = None,
+    tenant_id: str | None = None,
+    actor: str | None = None,
+    actor_id: str | None = None,
+    ip_address: str | None = None,
+    user_agent: str | None = None,
+    request_id: str | None = None,
+) -> tuple:
+    resolved_tenant_id = tenant_id or get_tenant_context()
+    resolved_actor_id = actor_id or get_actor_context()
+    event_details = dict(details or {})
+    if resource_id and _to_uuid(resource_id) is None:
+        event_details.setdefault("resource_id_raw", resource_id)
+    return (
+        resolved_tenant_id,
+        _to_uuid(resolved_actor_id),
+        actor,
+        ip_address,
+        user_agent,
+        request_id,
+        resource_type,
+        _to_uuid(resource_id),
+        action,
+        outcome,
+        Json(event_details),
+    )
+
+
 def append_audit_event(
     conn,
     *,
@@ -37,39 +105,151 @@ def append_audit_event(
 
     This intentionally performs INSERT-only writes; immutability is enforced in SQL migration triggers.
     """
-    resolved_tenant_id = tenant_id or get_tenant_context()
-    resolved_actor_id = actor_id or get_actor_context()
-    event_details = dict(details or {})
-    if resource_id and _to_uuid(resource_id) is None:
-        event_details.setdefault("resource_id_raw", resource_id)
     conn.execute(
-        """
-        INSERT INTO audit_events (
-            tenant_id,
-            actor_id,
-            actor,
-            ip_address,
-            user_agent,
-            request_id,
-            resource_type,
-            resource_id,
-            action,
-            outcome,
-            details
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            resolved_tenant_id,
-            _to_uuid(resolved_actor_id),
-            actor,
-            ip_address,
-            user_agent,
-            request_id,
-            resource_type,
-            _to_uuid(resource_id),
-            action,
-            outcome,
-            Json(event_details),
+        _INSERT_AUDIT_EVENT_SQL,
+        _audit_event_params(
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            outcome=outcome,
+            details=details,
+            tenant_id=tenant_id,
+            actor=actor,
+            actor_id=actor_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_id=request_id,
         ),
     )
+
+
+async def _write_audit_batch(batch: list[tuple]) -> None:
+    # RLS checks tenant_id against app.tenant_id, so each tenant's rows are
+    # written on a connection scoped to that tenant.
+    by_tenant: dict[Any, list[tuple]] = {}
+    for params in batch:
+        by_tenant.setdefault(params[0], []).append(params)
+    previous_tenant = get_tenant_context()
+    try:
+        for tenant_id, rows in by_tenant.items():
+            set_tenant_context(str(tenant_id) if tenant_id else None)
+            async with get_async_conn() as conn:
+                async with conn.cursor() as cur:
+                    await cur.executemany(_INSERT_AUDIT_EVENT_SQL, rows)
+                await conn.commit()
+    finally:
+        set_tenant_context(previous_tenant)
+
+
+def _write_audit_event_sync(params: tuple) -> None:
+    # Fallback for a failed batch: one event per transaction on the sync pool,
+    # so a single bad row or a broken async pool does not sink the rest.
+    previous_tenant = get_tenant_context()
+    try:
+        set_tenant_context(str(params[0]) if params[0] else None)
+        with get_conn() as conn:
+            conn.execute(_INSERT_AUDIT_EVENT_SQL, params)
+            conn.commit()
+    finally:
+        set_tenant_context(previous_tenant)
+
+
+async def _write_audit_events_individually(batch: list[tuple]) -> list[tuple]:
+    """Write ``batch`` one event at a time; returns the events that still failed."""
+    failed = []
+    for params in batch:
+        try:
+            await asyncio.to_thread(_write_audit_event_sync, params)
+        except Exception:
+            failed.append(params)
+    return failed
+
+
+async def _drain_audit_batch(queue: asyncio.Queue) -> list[tuple]:
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + _AUDIT_FLUSH_INTERVAL_S
+    while len(batch) < _AUDIT_BATCH_MAX:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _audit_flusher(queue: asyncio.Queue) -> None:
+    while True:
+        if _audit_retry:
+            await asyncio.sleep(_AUDIT_RETRY_BACKOFF_S)
+            batch = _audit_retry[:]
+            _audit_retry.clear()
+        else:
+            batch = await _drain_audit_batch(queue)
+        # Until written, the batch stays in _audit_retry so a shutdown that
+        # cancels this task still flushes it.
+        _audit_retry.extend(batch)
+        try:
+            await _write_audit_batch(batch)
+            _audit_retry.clear()
+            continue
+        except Exception:
+            _logger.exception("Failed to flush %d queued audit events; writing them one by one", len(batch))
+        failed = await _write_audit_events_individually(batch)
+        _audit_retry.clear()
+        if failed:
+            _logger.error("%d audit events could not be written; retrying", len(failed))
+            _audit_retry.extend(failed)
+
+
+async def enqueue_audit_event(**event: Any) -> None:
+    """
+    Queue an audit event for the batched writer.
+
+    Accepts the same keyword arguments as ``append_audit_event``. Context
+    (tenant/actor) is resolved at call time. When the writer is not running
+    (scripts, tests) the event is written immediately.
+    """
+    params = _audit_event_params(**event)
+    if _audit_queue is None:
+        await _write_audit_batch([params])
+        return
+    await _audit_queue.put(params)
+
+
+def start_audit_flusher() -> None:
+    global _audit_queue, _audit_flusher_task
+    if _audit_flusher_task is not None:
+        return
+    _audit_queue = asyncio.Queue()
+    _audit_flusher_task = asyncio.get_running_loop().create_task(_audit_flusher(_audit_queue))
+
+
+async def stop_audit_flusher() -> None:
+    """Cancel the batched writer and synchronously flush whatever is still queued."""
+    global _audit_queue, _audit_flusher_task
+    if _audit_flusher_task is None:
+        return
+    _audit_flusher_task.cancel()
+    try:
+        await _audit_flusher_task
+    except asyncio.CancelledError:
+        pass
+    queue = _audit_queue
+    _audit_queue = None
+    _audit_flusher_task = None
+    pending = _audit_retry[:]
+    _audit_retry.clear()
+    while queue is not None and not queue.empty():
+        pending.append(queue.get_nowait())
+    if not pending:
+        return
+    try:
+        await _write_audit_batch(pending)
+    except Exception:
+        _logger.exception("Failed to flush %d audit events at shutdown; writing them one by one", len(pending))
+        failed = await _write_audit_events_individually(pending)
+        if failed:
+            _logger.error("Lost %d audit events at shutdown", len(failed))
@@ -1,4 +1,7 @@
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from time import monotonic
 from uuid import UUID
 from typing import Optional
 from pydantic import BaseModel, EmailStr
@@ -7,7 +10,7 @@ import bcrypt
 from fastapi import Request, HTTPException, Depends, status
 from psycopg.rows import dict_row
 from .db import get_conn, set_actor_context, set_tenant_context
-from .ip_whitelist import check_tenant_ip_access, extract_client_ip
+from .ip_whitelist import CompiledWhitelist, extract_client_ip, get_tenant_compiled_whitelist, is_ip_allowed_compiled
 from .crypto import decrypt_value, encrypt_value
 
 
@@ -88,28 +91,74 @@ def verify_totp(secret: str, code: str) -> bool:
     totp = pyotp.TOTP(secret)
     return totp.verify(code)
 
+# Session user rows, cached briefly so UI requests do not re-read them on
+# every hit. invalidate_user_cache only clears this process, so on other
+# workers a role change or removal can take up to the TTL to apply; that
+# staleness is accepted. The tenant IP allowlist is deliberately not cached:
+# it is read per request so allowlist changes apply at once on every worker.
+_USER_CACHE_TTL_SECONDS = 30.0
+_USER_CACHE_MAX = 4096
+# Only these columns are cached: password hashes and MFA secrets never sit
+# in the process-wide cache.
+_SESSION_USER_FIELDS = ("id", "email", "role", "tenant_id", "created_at", "mfa_enabled")
+_user_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def invalidate_user_cache(user_id: str | None = None) -> None:
+    """Drop the cached session user ``user_id`` (or every user when None) in this process."""
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(str(user_id), None)
+
+
+def _cached_session_user(user_id: str) -> Optional[dict]:
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+        if cached is None:
+            return None
+        if cached[0] <= monotonic():
+            del _user_cache[user_id]
+            return None
+        _user_cache.move_to_end(user_id)
+        return cached[1]
+
+
+def _load_session_user(user_id: str) -> tuple[Optional[dict], Optional[CompiledWhitelist]]:
+    user_data = _cached_session_user(user_id)
+    with get_conn() as conn:
+        if user_data is None:
+            row = get_user_by_id(user_id, conn)
+            if not row:
+                return None, None
+            user_data = {field: row[field] for field in _SESSION_USER_FIELDS if field in row}
+            with _user_cache_lock:
+                _user_cache[user_id] = (monotonic() + _USER_CACHE_TTL_SECONDS, user_data)
+                _user_cache.move_to_end(user_id)
+                while len(_user_cache) > _USER_CACHE_MAX:
+                    _user_cache.popitem(last=False)
+        whitelist = get_tenant_compiled_whitelist(str(user_data["tenant_id"]), conn)
+    return user_data, whitelist
+
+
 def get_current_user(request: Request) -> User:
     user_id = request.session.get("user_id")
     # Check for partial auth for MFA flow? No, this dependency implies fully managed session.
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    
-    with get_conn() as conn:
-        user_data = get_user_by_id(user_id, conn)
-        if user_data:
-            tenant_id = str(user_data["tenant_id"])
-            client_ip = extract_client_ip(request)
-            access = check_tenant_ip_access(tenant_id, client_ip, conn)
-            if not access.get("allowed", False):
-                request.session.clear()
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied from this IP address",
-                )
-    
+
+    user_data, whitelist = _load_session_user(str(user_id))
     if not user_data:
         request.session.clear()
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not is_ip_allowed_compiled(extract_client_ip(request), whitelist):
+        request.session.clear()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied from this IP address",
+        )
     set_tenant_context(str(user_data["tenant_id"]))
     set_actor_context(str(user_data["id"]))
     return User(**user_data)
@@ -51,11 +51,15 @@ class Settings(BaseSettings):
     # DB settings
     db_pool_min_size: int = 1
     db_pool_max_size: int = 10
+    # Threads for blocking storage/OCR calls offloaded from async handlers.
+    blocking_io_workers: int = 32
     db_statement_timeout_ms: int = 15000
 
     # Embedding chunking
     chunk_size: int = 1200
     chunk_overlap: int = 200
+    # Chunks per embeddings request; larger documents are split and sent concurrently.
+    embedding_batch_size: int = 32
     aggregate_notes_max_chars: int = 8000
 
     # Rate limiting
@@ -89,12 +93,25 @@ class Settings(BaseSettings):
     job_queue_enabled: bool = False
     job_poll_interval_seconds: int = 5
     job_max_attempts: int = 3
+    # Jobs (OCR, LLM calls) run for seconds to minutes; claiming one at a time
+    # leaves the rest of the queue to idle workers. Raise only for cheap jobs.
+    job_claim_batch_size: int = 1
+    job_worker_heartbeat_ttl_seconds: int = 300
+    # Restrict a worker's database claims to one tenant (unset: all tenants).
+    job_worker_tenant_id: str | None = None
     redis_url: str | None = None
     redis_queue_name: str = "medchr:jobs"
+    redis_pool_size: int = 10
+    phi_egress_queue_name: str = "medchr:phi_egress"
+    phi_egress_batch_size: int = 500
+    phi_egress_flush_interval_seconds: float = 1.0
+    # Log an error once this many PHI egress events are waiting in Redis.
+    phi_egress_queue_alert_depth: int = 10000
 
     # Data retention
     audit_retention_days: int = 365
     job_retention_days: int = 30
+    embedding_cache_retention_days: int = 90
     retention_export_dir: str = "data/retention_exports"
     retention_immutable_dir: str = ""
 
@@ -1,19 +1,24 @@
+import asyncio
 import logging
 import re
 import threading
 import uuid
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
 
-from pgvector.psycopg import register_vector
+import orjson
+from pgvector.psycopg import register_vector, register_vector_async
 from psycopg import sql
 from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg.types.json import set_json_dumps, set_json_loads
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 from .config import get_settings
 
 _pool: ConnectionPool | None = None
 _pool_lock = threading.Lock()
+_async_pool: AsyncConnectionPool | None = None
+_async_pool_lock = asyncio.Lock()
 _tenant_id_var: ContextVar[str | None] = ContextVar("tenant_id", default=None)
 _actor_id_var: ContextVar[str | None] = ContextVar("actor_id", default=None)
 
@@ -21,6 +26,18 @@ _UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f
 _logger = logging.getLogger(__name__)
 
 
+def _orjson_dumps(obj) -> bytes:
+    # default=str and OPT_NON_STR_KEYS accept the datetimes, UUIDs and
+    # non-string keys that audit/extraction payloads carry.
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Every Json()/Jsonb() parameter and json/jsonb result column goes through
+# orjson instead of the stdlib json module.
+set_json_dumps(_orjson_dumps)
+set_json_loads(orjson.loads)
+
+
 def get_tenant_context() -> str | None:
     return _tenant_id_var.get()
 
@@ -50,6 +67,14 @@ def _configure_connection(conn) -> None:
     conn.commit()
 
 
+async def _configure_async_connection(conn) -> None:
+    settings = get_settings()
+    await register_vector_async(conn)
+    timeout_ms = int(settings.db_statement_timeout_ms)
+    await conn.execute(f"SET statement_timeout = {timeout_ms}")
+    await conn.commit()
+
+
 def _validate_context_id(value: str) -> str:
     """Validate that a context ID is a valid UUID or empty string."""
     if not value:
@@ -84,8 +109,43 @@ def get_conn():
         yield conn
 
 
+@asynccontextmanager
+async def get_async_conn():
+    """Async counterpart of ``get_conn`` for handlers running on the event loop."""
+    global _async_pool
+    settings = get_settings()
+    async with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = AsyncConnectionPool(
+                conninfo=settings.database_url,
+                min_size=settings.db_pool_min_size,
+                max_size=settings.db_pool_max_size,
+                kwargs={"row_factory": dict_row},
+                configure=_configure_async_connection,
+                open=False,
+            )
+            await _async_pool.open()
+    async with _async_pool.connection() as conn:
+        tenant_id = _validate_context_id(_tenant_id_var.get() or "")
+        actor_id = _validate_context_id(_actor_id_var.get() or "")
+        await conn.execute(
+            sql.SQL("SET app.tenant_id = {}").format(sql.Literal(tenant_id))
+        )
+        await conn.execute(
+            sql.SQL("SET app.actor_id = {}").format(sql.Literal(actor_id))
+        )
+        yield conn
+
+
 def close_pool() -> None:
     global _pool
     if _pool is not None:
         _pool.close()
         _pool = None
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
@@ -1,18 +1,49 @@
+import contextvars
+import math
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .config import get_settings
-from .llm_gateway import create_embedding, redact_if_enabled
+from .llm_gateway import create_embedding
+
+# Concurrent embedding requests per embed_texts() call.
+_EMBED_MAX_WORKERS = 4
 
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
     settings = get_settings()
     if not settings.openai_api_key:
         raise RuntimeError("OPENAI_API_KEY not configured.")
-    safe_texts = [redact_if_enabled(text) for text in texts]
-    resp = _create_embeddings(settings.openai_embedding_model, safe_texts)
-    return [item.embedding for item in resp.data]
+    # create_embedding applies PHI redaction (and records it in the egress log),
+    # so inputs are passed through as-is rather than scanned twice.
+    model = settings.openai_embedding_model
+    batch_size = max(1, settings.embedding_batch_size)
+    if len(texts) <= batch_size:
+        resp = _create_embeddings(model, list(texts))
+        return [_unit(item.embedding) for item in resp.data]
+
+    # Long documents: fixed-size batches sent concurrently. Each worker runs in
+    # a copy of the caller's context so tenant/actor context reaches the gateway.
+    batches = [list(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)]
+    with ThreadPoolExecutor(max_workers=min(_EMBED_MAX_WORKERS, len(batches))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, _create_embeddings, model, batch)
+            for batch in batches
+        ]
+        return [_unit(item.embedding) for future in futures for item in future.result().data]
+
+
+def _unit(vector: List[float]) -> List[float]:
+    """
+    Scale ``vector`` to unit length. Retrieval ranks by inner product (pgvector
+    ``<#>``), which equals cosine similarity only for normalized vectors.
+    """
+    norm = math.hypot(*vector)
+    if not norm:
+        return vector
+    return [x / norm for x in vector]
 
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=8), reraise=True)
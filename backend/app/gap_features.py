@@ -2,25 +2,28 @@
 Gap Features API Router
 Contains endpoints for: Trends, Timeline, Suggestions, Genetics, Rules
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from datetime import date
+from operator import itemgetter
 
-from .db import get_conn
+import orjson
+
+from .db import get_async_conn, get_conn
 from .auth import get_current_user, User
 from .normalizer import normalize_lab_list, get_loinc_code
 from .genetics_interpreter import interpret_patient_genetics, check_drug_gene_interactions, format_genetics_for_chr
 from .rules_engine import evaluate_rules, format_rules_for_chr
 from .diagnosis_suggester import generate_diagnosis_suggestions, format_suggestions_for_chr
 from .timeline import extract_events_from_document, format_timeline_for_display
-from .audit_events import append_audit_event
+from .audit_events import enqueue_audit_event
 
 router = APIRouter(prefix="/api/gap", tags=["Gap Features"])
 
 
-def _audit_gap_event(
-    conn,
+async def _audit_gap_event_bg(
     *,
     tenant_id: str,
     actor: str,
@@ -29,8 +32,8 @@ def _audit_gap_event(
     action: str,
     details: dict | None = None,
 ) -> None:
-    append_audit_event(
-        conn,
+    """Hand a gap audit event to the batched writer once the response is sent."""
+    await enqueue_audit_event(
         action=action,
         resource_type="patient",
         resource_id=patient_id,
@@ -41,6 +44,7 @@ def _audit_gap_event(
         actor_id=actor_id,
     )
 
+
 def _require_patient_in_tenant(conn, patient_id: str, tenant_id) -> None:
     row = conn.execute(
         "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
@@ -49,6 +53,14 @@ def _require_patient_in_tenant(conn, patient_id: str, tenant_id) -> None:
     if not row:
         raise HTTPException(status_code=404, detail="Patient not found")
 
+async def _require_patient_in_tenant_async(conn, patient_id: str, tenant_id) -> None:
+    cur = await conn.execute(
+        "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
+        (patient_id, tenant_id),
+    )
+    if not await cur.fetchone():
+        raise HTTPException(status_code=404, detail="Patient not found")
+
 
 # ============== GAP 1: LONGITUDINAL TRENDS ==============
 
@@ -67,15 +79,19 @@ class TrendData(BaseModel):
 
 
 @router.get("/patients/{patient_id}/trends", response_model=list[TrendData])
-async def get_patient_trends(patient_id: str, user: User = Depends(get_current_user)):
+async def get_patient_trends(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Get longitudinal lab trends for a patient.
     Groups lab values by canonical test name across all documents.
     """
-    with get_conn() as conn:
-        _require_patient_in_tenant(conn, patient_id, user.tenant_id)
+    async with get_async_conn() as conn:
+        await _require_patient_in_tenant_async(conn, patient_id, user.tenant_id)
         # Get all extractions for this patient
-        rows = conn.execute(
+        cur = await conn.execute(
             """
             SELECT 
                 d.id as document_id,
@@ -89,9 +105,10 @@ async def get_patient_trends(patient_id: str, user: User = Depends(get_current_u
             ORDER BY COALESCE(e.service_date, d.created_at::date) DESC
             """,
             (patient_id,)
-        ).fetchall()
-        _audit_gap_event(
-            conn,
+        )
+        rows = await cur.fetchall()
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
@@ -99,54 +116,64 @@ async def get_patient_trends(patient_id: str, user: User = Depends(get_current_u
             action="patient.gap_trends_view",
             details={"records": len(rows)},
         )
-        conn.commit()
-    
-    # Aggregate labs by canonical name
-    trends_map: dict[str, TrendData] = {}
     
+    # Flatten every row's labs so normalization runs as a single batch
+    row_labs: list[tuple[dict, str, dict]] = []
     for row in rows:
         structured = row.get("structured") or {}
         labs = structured.get("labs") or structured.get("biomarkers") or []
         
-        # Normalize lab names
-        normalized_labs = normalize_lab_list(labs)
-        
         event_date = row.get("service_date") or row.get("created_at")
         if hasattr(event_date, "strftime"):
             date_str = event_date.strftime("%Y-%m-%d")
         else:
             date_str = str(event_date)[:10] if event_date else ""
         
-        for lab in normalized_labs:
-            canonical = lab.get("canonical_name", lab.get("test", "Unknown"))
-            value_str = lab.get("value", "")
-            
-            # Try to parse numeric value
-            try:
-                numeric_val = float(''.join(c for c in str(value_str) if c.isdigit() or c == '.'))
-            except (ValueError, TypeError):
-                continue  # Skip non-numeric values
-            
-            if canonical not in trends_map:
-                trends_map[canonical] = TrendData(
-                    test_name=lab.get("original_name", canonical),
-                    canonical_name=canonical,
-                    unit=lab.get("unit", ""),
-                    data_points=[]
-                )
-            
-            trends_map[canonical].data_points.append(TrendPoint(
-                date=date_str,
-                value=numeric_val,
-                document_id=str(row.get("document_id", "")),
-                filename=row.get("filename", "")
-            ))
+        row_labs.extend((row, date_str, lab) for lab in labs)
+    
+    # Normalize lab names
+    normalized_labs = normalize_lab_list([lab for _, _, lab in row_labs])
     
-    # Sort data points within each trend
-    for trend in trends_map.values():
-        trend.data_points.sort(key=lambda x: x.date)
+    # Aggregate labs by canonical name (plain dicts; serialized per trend below)
+    trends_map: dict[str, dict] = {}
     
-    return list(trends_map.values())
+    for (row, date_str, _), lab in zip(row_labs, normalized_labs):
+        canonical = lab.get("canonical_name", lab.get("test", "Unknown"))
+        value_str = lab.get("value", "")
+        
+        # Try to parse numeric value
+        try:
+            numeric_val = float(''.join(c for c in str(value_str) if c.isdigit() or c == '.'))
+        except (ValueError, TypeError):
+            continue  # Skip non-numeric values
+        
+        if canonical not in trends_map:
+            trends_map[canonical] = {
+                "test_name": lab.get("original_name", canonical),
+                "canonical_name": canonical,
+                "unit": lab.get("unit", ""),
+                "data_points": [],
+            }
+        
+        trends_map[canonical]["data_points"].append({
+            "date": date_str,
+            "value": numeric_val,
+            "document_id": str(row.get("document_id", "")),
+            "filename": row.get("filename", ""),
+        })
+    
+    return StreamingResponse(_stream_trends(trends_map.values()), media_type="application/json")
+
+
+def _stream_trends(trends: Iterable[dict]) -> Iterator[bytes]:
+    """Yield a JSON array of trends, sorting and serializing one trend at a time."""
+    yield b"["
+    for index, trend in enumerate(trends):
+        trend["data_points"].sort(key=itemgetter("date"))
+        if index:
+            yield b","
+        yield orjson.dumps(trend)
+    yield b"]"
 
 
 # ============== GAP 4: GENETICS INTERPRETATION ==============
@@ -170,7 +197,11 @@ class DrugInteractionAlert(BaseModel):
 
 
 @router.get("/patients/{patient_id}/genetics", response_model=list[GeneticsInterpretation])
-async def get_genetics_interpretation(patient_id: str, user: User = Depends(get_current_user)):
+async def get_genetics_interpretation(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Get clinical interpretation of patient's genetic data.
     """
@@ -180,15 +211,14 @@ async def get_genetics_interpretation(patient_id: str, user: User = Depends(get_
             "SELECT genetics FROM patients WHERE id = %s",
             (patient_id,)
         ).fetchone()
-        _audit_gap_event(
-            conn,
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
             patient_id=patient_id,
             action="patient.gap_genetics_view",
         )
-        conn.commit()
     
     if not row:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -200,7 +230,11 @@ async def get_genetics_interpretation(patient_id: str, user: User = Depends(get_
 
 
 @router.get("/patients/{patient_id}/drug-interactions", response_model=list[DrugInteractionAlert])
-async def check_patient_drug_interactions(patient_id: str, user: User = Depends(get_current_user)):
+async def check_patient_drug_interactions(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Check for drug-gene interactions based on patient's genetics and current medications.
     """
@@ -223,8 +257,8 @@ async def check_patient_drug_interactions(patient_id: str, user: User = Depends(
             """,
             (patient_id,)
         ).fetchall()
-        _audit_gap_event(
-            conn,
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
@@ -232,22 +266,21 @@ async def check_patient_drug_interactions(patient_id: str, user: User = Depends(
             action="patient.gap_drug_interactions_view",
             details={"source_documents": len(meds_rows)},
         )
-        conn.commit()
     
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     genetics = patient.get("genetics") or {}
     
-    # Aggregate medications
-    medications = set()
+    # Aggregate medications (dict keys dedupe while keeping first-seen order)
+    medications: dict[str, None] = {}
     for row in meds_rows:
         structured = row.get("structured") or {}
         for med in structured.get("medications") or []:
             if isinstance(med, dict):
-                medications.add(med.get("name", ""))
+                medications[med.get("name", "")] = None
             else:
-                medications.add(str(med))
+                medications[str(med)] = None
     
     alerts = check_drug_gene_interactions(genetics, list(medications))
     
@@ -264,7 +297,11 @@ class DiagnosisSuggestion(BaseModel):
 
 
 @router.get("/patients/{patient_id}/suggested-diagnoses", response_model=list[DiagnosisSuggestion])
-async def get_diagnosis_suggestions(patient_id: str, user: User = Depends(get_current_user)):
+async def get_diagnosis_suggestions(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Get AI-generated diagnosis suggestions based on patient data.
     """
@@ -290,8 +327,8 @@ async def get_diagnosis_suggestions(patient_id: str, user: User = Depends(get_cu
             """,
             (patient_id,)
         ).fetchall()
-        _audit_gap_event(
-            conn,
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
@@ -299,7 +336,6 @@ async def get_diagnosis_suggestions(patient_id: str, user: User = Depends(get_cu
             action="patient.gap_suggested_diagnoses_view",
             details={"extractions": len(extractions)},
         )
-        conn.commit()
     
     # Aggregate data
     labs = []
@@ -325,9 +361,9 @@ async def get_diagnosis_suggestions(patient_id: str, user: User = Depends(get_cu
     suggestions = generate_diagnosis_suggestions(
         patient_summary=f"{patient.get('full_name', '')}. {patient.get('notes', '')}",
         labs=labs[:30],  # Limit
-        medications=list(set(medications)),
+        medications=list(dict.fromkeys(medications)),
         genetics=patient.get("genetics") or {},
-        existing_diagnoses=list(set(existing_diagnoses))
+        existing_diagnoses=list(dict.fromkeys(existing_diagnoses))
     )
     
     return [DiagnosisSuggestion(**s) for s in suggestions]
@@ -341,18 +377,23 @@ class TriggeredRule(BaseModel):
 
 
 @router.get("/patients/{patient_id}/clinical-insights", response_model=list[TriggeredRule])
-async def get_clinical_insights(patient_id: str, user: User = Depends(get_current_user)):
+async def get_clinical_insights(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Get clinical insights based on rule engine evaluation.
     """
-    with get_conn() as conn:
-        _require_patient_in_tenant(conn, patient_id, user.tenant_id)
-        patient = conn.execute(
+    async with get_async_conn() as conn:
+        await _require_patient_in_tenant_async(conn, patient_id, user.tenant_id)
+        cur = await conn.execute(
             "SELECT genetics FROM patients WHERE id = %s",
             (patient_id,)
-        ).fetchone()
+        )
+        patient = await cur.fetchone()
         
-        extractions = conn.execute(
+        cur = await conn.execute(
             """
             SELECT e.structured
             FROM documents d
@@ -360,9 +401,10 @@ async def get_clinical_insights(patient_id: str, user: User = Depends(get_curren
             WHERE d.patient_id = %s
             """,
             (patient_id,)
-        ).fetchall()
-        _audit_gap_event(
-            conn,
+        )
+        extractions = await cur.fetchall()
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
@@ -370,7 +412,6 @@ async def get_clinical_insights(patient_id: str, user: User = Depends(get_curren
             action="patient.gap_clinical_insights_view",
             details={"extractions": len(extractions)},
         )
-        conn.commit()
     
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -404,7 +445,11 @@ class TimelineEvent(BaseModel):
 
 
 @router.get("/patients/{patient_id}/timeline", response_model=list[TimelineEvent])
-async def get_patient_timeline(patient_id: str, user: User = Depends(get_current_user)):
+async def get_patient_timeline(
+    patient_id: str,
+    background: BackgroundTasks,
+    user: User = Depends(get_current_user),
+):
     """
     Get chronological timeline of patient events.
     """
@@ -420,8 +465,8 @@ async def get_patient_timeline(patient_id: str, user: User = Depends(get_current
             """,
             (patient_id,)
         ).fetchall()
-        _audit_gap_event(
-            conn,
+        background.add_task(
+            _audit_gap_event_bg,
             tenant_id=str(user.tenant_id),
             actor=user.email,
             actor_id=str(user.id),
@@ -429,7 +474,6 @@ async def get_patient_timeline(patient_id: str, user: User = Depends(get_current
             action="patient.gap_timeline_view",
             details={"stored_events": len(events_rows)},
         )
-        conn.commit()
         
         # Also generate events from documents if table is empty
         if not events_rows:
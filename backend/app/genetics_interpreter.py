@@ -2,10 +2,11 @@
 Genetics Interpreter - Gap 4: Genetics Clinical Interpretation
 Interprets genetic variants using PharmGKB reference data.
 """
-import json
 from pathlib import Path
 from functools import lru_cache
 
+import orjson
+
 DATA_PATH = Path(__file__).parent.parent / "data" / "pharmgkb_subset.json"
 
 
@@ -14,8 +15,7 @@ def _load_pharmgkb_data() -> dict:
     """Load PharmGKB reference data."""
     if not DATA_PATH.exists():
         return {"genes": []}
-    with open(DATA_PATH) as f:
-        return json.load(f)
+    return orjson.loads(DATA_PATH.read_bytes())
 
 
 def interpret_variant(gene: str, variant: str) -> dict | None:
@@ -108,10 +108,11 @@ def check_drug_gene_interactions(genetics_data: dict, medications: list[str]) ->
     med_names_lower = [m.lower() for m in medications]
     
     for interp in interpretations:
-        drugs_affected = interp.get("drugs_affected", [])
+        drugs_lower = [(drug, drug.lower()) for drug in interp.get("drugs_affected", [])]
         
-        for drug in drugs_affected:
-            if drug.lower() in med_names_lower or any(drug.lower() in m for m in med_names_lower):
+        for drug, drug_lower in drugs_lower:
+            # Substring match also covers exact matches (e.g. "warfarin" in "warfarin 5mg").
+            if any(drug_lower in m for m in med_names_lower):
                 alerts.append({
                     "severity": "high",
                     "gene": interp["gene"],
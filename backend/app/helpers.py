@@ -1,8 +1,16 @@
 """Shared helper functions used by both API routes and UI handlers."""
 
-from uuid import uuid4
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Iterable
+from uuid import UUID, uuid4
 
 from fastapi import UploadFile, HTTPException
+from pgvector.psycopg import HalfVector
 from psycopg.types.json import Json
 
 from .config import get_settings
@@ -12,11 +20,13 @@ from .schemas import (
     Document,
     SignedUploadResponse,
     SignedUploadRegistration,
+    ExtractionData,
     ExtractionResult,
     ChrDraft,
 )
 from .storage import (
     upload_bytes_via_signed_url,
+    delete_bytes,
     download_bytes,
     create_signed_upload_url,
 )
@@ -31,8 +41,10 @@ from .uploads import read_upload_bytes, sanitize_filename, resolve_content_type
 settings = get_settings()
 
 
+# Rows come from typed columns, so the models are built with model_construct
+# and skip per-field validation; list pages convert every row on the page.
 def _row_to_patient(row) -> Patient:
-    return Patient(
+    return Patient.model_construct(
         id=str(row["id"]),
         full_name=row["full_name"],
         dob=row.get("dob"),
@@ -50,7 +62,7 @@ def _row_to_patient(row) -> Patient:
 
 
 def _row_to_document(row) -> Document:
-    return Document(
+    return Document.model_construct(
         id=str(row["id"]),
         patient_id=str(row["patient_id"]),
         filename=row["filename"],
@@ -71,7 +83,10 @@ def _log_action(conn, patient_id: str | None, action: str, actor: str, details:
     else:
         resource_type = "system"
 
-    try:
+    # Pipeline mode sends both audit INSERTs back-to-back instead of waiting
+    # for the first to complete; results are synced when the block exits, and
+    # a failure in either aborts the caller's transaction.
+    with conn.pipeline():
         append_audit_event(
             conn,
             action=action,
@@ -81,25 +96,41 @@ def _log_action(conn, patient_id: str | None, action: str, actor: str, details:
             tenant_id=tenant_id,
             actor=actor,
         )
-    except Exception:
-        # Keep legacy audit_logs write path available for older schemas.
-        pass
-    conn.execute(
-        """
-        INSERT INTO audit_logs (patient_id, actor, action, details, tenant_id)
-        VALUES (%s, %s, %s, %s, %s)
-        """,
-        (patient_id, actor, action, Json(details) if details else None, tenant_id),
-    )
+        conn.execute(
+            """
+            INSERT INTO audit_logs (patient_id, actor, action, details, tenant_id)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (patient_id, actor, action, Json(details) if details else None, tenant_id),
+            prepare=True,
+        )
 
 
-def _upload_document(patient_id: str, file: UploadFile, actor: str = "system", tenant_id: str | None = None) -> Document:
+def _log_action_bg(
+    patient_id: str | None,
+    action: str,
+    actor: str,
+    details: dict | None = None,
+    tenant_id: str | None = None,
+) -> None:
+    """Write a read-path audit entry from BackgroundTasks, after the response is sent."""
+    with get_conn() as conn:
+        _log_action(conn, patient_id, action, actor, details, tenant_id=tenant_id)
+        conn.commit()
+
+
+def _read_upload(file: UploadFile) -> tuple[str, bytes, str]:
     filename = sanitize_filename(getattr(file, "filename", "upload.bin"))
     if hasattr(file, "file"):
         data, content_type, _size = read_upload_bytes(file)
     else:
         data = file
         content_type = resolve_content_type(filename, None)
+    return filename, data, content_type
+
+
+def _upload_document(patient_id: str, file: UploadFile, actor: str = "system", tenant_id: str | None = None) -> Document:
+    filename, data, content_type = _read_upload(file)
 
     with get_conn() as conn:
         query = "SELECT id FROM patients WHERE id = %s"
@@ -135,6 +166,84 @@ def _upload_document(patient_id: str, file: UploadFile, actor: str = "system", t
     return _row_to_document(row)
 
 
+def _upload_documents(
+    patient_id: str,
+    files: list[UploadFile],
+    actor: str = "system",
+    tenant_id: str | None = None,
+) -> list[Document]:
+    """
+    Store several uploads for one patient: one patient check, the storage
+    writes with no connection held, then one executemany for the document
+    rows and a single commit. Returns documents in the order of ``files``.
+    """
+    if not files:
+        return []
+    with get_conn() as conn:
+        query = "SELECT id FROM patients WHERE id = %s"
+        params: list[str] = [patient_id]
+        if tenant_id:
+            query += " AND tenant_id = %s"
+            params.append(tenant_id)
+        if not conn.execute(query, tuple(params)).fetchone():
+            raise HTTPException(status_code=404, detail="Patient not found")
+
+    stored: list[tuple[str, str, str, str]] = []
+    rows: list[dict] = []
+    try:
+        for file in files:
+            filename, data, content_type = _read_upload(file)
+            storage_path = f"{patient_id}/{uuid4()}_{filename}"
+            upload_bytes_via_signed_url(settings.storage_bucket, storage_path, data, content_type)
+            stored.append((patient_id, filename, content_type, storage_path))
+
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO documents (patient_id, filename, content_type, storage_path)
+                    VALUES (%s, %s, %s, %s)
+                    RETURNING id, patient_id, filename, content_type, storage_path
+                    """,
+                    stored,
+                    returning=True,
+                )
+                while True:
+                    rows.append(cur.fetchone())
+                    if not cur.nextset():
+                        break
+            for row in rows:
+                _log_action(
+                    conn,
+                    patient_id,
+                    "document.upload",
+                    actor,
+                    {"document_id": str(row["id"])},
+                    tenant_id=tenant_id,
+                )
+            conn.commit()
+    except Exception:
+        # A rejected file or a failed insert aborts the whole batch; remove
+        # the objects already written so no unreferenced PHI stays in storage.
+        if stored:
+            try:
+                delete_bytes(settings.storage_bucket, [path for *_, path in stored])
+            except Exception as exc:
+                with get_conn() as conn:
+                    _log_action(
+                        conn,
+                        patient_id,
+                        "storage.delete_failed",
+                        actor,
+                        {"files": len(stored), "error": str(exc)},
+                        tenant_id=tenant_id,
+                    )
+                    conn.commit()
+        raise
+
+    return [_row_to_document(row) for row in rows]
+
+
 def _validate_storage_path_for_patient(patient_id: str, storage_path: str) -> str:
     path = storage_path.strip().lstrip("/")
     if ".." in path:
@@ -224,32 +333,81 @@ def _register_signed_upload(
     return _row_to_document(row)
 
 
-def _extract_document(document_id: str, actor: str = "system", tenant_id: str | None = None) -> ExtractionResult:
+# OCR + structured extraction results keyed on (document_id, storage_path).
+# Storage paths embed a fresh UUID per upload, so an entry can never go stale;
+# the TTL only bounds how long extracted PHI stays in process memory.
+_OCR_CACHE_TTL_SECONDS = 3600.0
+_OCR_CACHE_MAX = 256
+_ocr_cache: "OrderedDict[tuple[str, str], tuple[float, str, dict[str, Any]]]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+
+def _ocr_cache_get(key: tuple[str, str]) -> tuple[str, dict[str, Any]] | None:
+    with _ocr_cache_lock:
+        cached = _ocr_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= monotonic():
+            del _ocr_cache[key]
+            return None
+        _ocr_cache.move_to_end(key)
+    # Callers own the returned dict; never hand out the cached instance.
+    return cached[1], copy.deepcopy(cached[2])
+
+
+def _ocr_cache_put(key: tuple[str, str], raw_text: str, structured: dict[str, Any]) -> None:
+    with _ocr_cache_lock:
+        _ocr_cache[key] = (monotonic() + _OCR_CACHE_TTL_SECONDS, raw_text, copy.deepcopy(structured))
+        _ocr_cache.move_to_end(key)
+        while len(_ocr_cache) > _OCR_CACHE_MAX:
+            _ocr_cache.popitem(last=False)
+
+
+def _is_cacheable_extraction(structured: dict[str, Any]) -> bool:
+    # extract_structured reports LLM errors and a missing API key as a failure
+    # note or an empty payload; caching those would replay them for an hour.
+    if str(structured.get("notes") or "").startswith("Extraction failed"):
+        return False
+    return structured != ExtractionData().dict()
+
+
+def _extract_document(
+    document_id: str,
+    actor: str = "system",
+    tenant_id: str | None = None,
+    *,
+    refresh: bool = False,
+) -> ExtractionResult:
+    # Document lookup and tenant check in one round-trip. The connection is
+    # released before download/OCR/LLM extraction so it is not held for seconds.
+    query = """
+        SELECT d.id, d.patient_id, d.storage_path, d.content_type
+        FROM documents d
+        JOIN patients p ON p.id = d.patient_id
+        WHERE d.id = %s
+        """
+    params: list[str] = [document_id]
+    if tenant_id:
+        query += " AND p.tenant_id = %s"
+        params.append(tenant_id)
     with get_conn() as conn:
-        doc = conn.execute(
-            """
-            SELECT id, patient_id, storage_path, content_type
-            FROM documents
-            WHERE id = %s
-            """,
-            (document_id,),
-        ).fetchone()
+        doc = conn.execute(query, tuple(params)).fetchone()
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    if tenant_id:
-        with get_conn() as conn:
-            allowed = conn.execute(
-                "SELECT 1 FROM patients WHERE id = %s AND tenant_id = %s",
-                (str(doc["patient_id"]), tenant_id),
-            ).fetchone()
-        if not allowed:
-            raise HTTPException(status_code=404, detail="Document not found")
 
-    data = download_bytes(settings.storage_bucket, doc["storage_path"])
-    raw_text = extract_text(data, doc["content_type"])
-    # structured is a dict (ExtractionData().dict())
-    structured = extract_structured(raw_text)
+    cache_key = (str(doc["id"]), doc["storage_path"])
+    # An explicit re-extract (refresh) always re-runs OCR and the LLM.
+    cached = None if refresh else _ocr_cache_get(cache_key)
+    if cached is not None:
+        raw_text, structured = cached
+    else:
+        data = download_bytes(settings.storage_bucket, doc["storage_path"])
+        raw_text = extract_text(data, doc["content_type"])
+        # structured is a dict (ExtractionData().dict())
+        structured = extract_structured(raw_text)
+        if _is_cacheable_extraction(structured):
+            _ocr_cache_put(cache_key, raw_text, structured)
 
     with get_conn() as conn:
         # 1. Insert into extractions (Legacy/Backup JSONB)
@@ -266,54 +424,64 @@ def _extract_document(document_id: str, actor: str = "system", tenant_id: str |
         # 2. Insert into structured tables
         patient_id = doc["patient_id"]
 
-        # Labs
-        if "labs" in structured and structured["labs"]:
-            for lab in structured["labs"]:
-                conn.execute(
+        # One executemany per table instead of one round-trip per row. The
+        # tables are independent, so pipeline mode streams all three batches
+        # without waiting on each other's results.
+        with conn.pipeline(), conn.cursor() as cur:
+            # Labs
+            if structured.get("labs"):
+                cur.executemany(
                     """
                     INSERT INTO lab_results
                     (patient_id, extraction_id, test_name, value, unit, flag, reference_range, test_date, panel)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (
-                        patient_id, extraction_id,
-                        lab.get("test_name"), lab.get("value"), lab.get("unit"),
-                        lab.get("flag"), lab.get("reference_range"),
-                        lab.get("date"), lab.get("panel")
-                    )
+                    [
+                        (
+                            patient_id, extraction_id,
+                            lab.get("test_name"), lab.get("value"), lab.get("unit"),
+                            lab.get("flag"), lab.get("reference_range"),
+                            lab.get("date"), lab.get("panel")
+                        )
+                        for lab in structured["labs"]
+                    ],
                 )
 
-        # Medications
-        if "medications" in structured and structured["medications"]:
-            for med in structured["medications"]:
-                conn.execute(
+            # Medications
+            if structured.get("medications"):
+                cur.executemany(
                     """
                     INSERT INTO medications
                     (patient_id, extraction_id, name, dosage, frequency, route, start_date, end_date, status)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (
-                        patient_id, extraction_id,
-                        med.get("name"), med.get("dosage"), med.get("frequency"),
-                        med.get("route"), med.get("start_date"), med.get("end_date"),
-                        med.get("status", "active")
-                    )
+                    [
+                        (
+                            patient_id, extraction_id,
+                            med.get("name"), med.get("dosage"), med.get("frequency"),
+                            med.get("route"), med.get("start_date"), med.get("end_date"),
+                            med.get("status", "active")
+                        )
+                        for med in structured["medications"]
+                    ],
                 )
 
-        # Diagnoses
-        if "diagnoses" in structured and structured["diagnoses"]:
-            for dx in structured["diagnoses"]:
-                conn.execute(
+            # Diagnoses
+            if structured.get("diagnoses"):
+                cur.executemany(
                     """
                     INSERT INTO diagnoses
                     (patient_id, extraction_id, condition, code, status, date_onset)
                     VALUES (%s, %s, %s, %s, %s, %s)
                     """,
-                    (
-                        patient_id, extraction_id,
-                        dx.get("condition"), dx.get("code"), dx.get("status"),
-                        dx.get("date_onset")
-                    )
+                    [
+                        (
+                            patient_id, extraction_id,
+                            dx.get("condition"), dx.get("code"), dx.get("status"),
+                            dx.get("date_onset")
+                        )
+                        for dx in structured["diagnoses"]
+                    ],
                 )
 
         _log_action(
@@ -347,95 +515,203 @@ def _chunk_text(text: str):
     if not text:
         return []
     chunks = []
+    # Bound methods hoisted out of the loop; this runs once per chunk of
+    # every embedded document.
+    append = chunks.append
+    rfind = text.rfind
     start = 0
     length = len(text)
-    chunk_index = 0
+    min_break = size * 0.6
     while start < length:
-        end = min(start + size, length)
-        raw_chunk = text[start:end]
+        end = start + size
         if end < length:
-            last_space = raw_chunk.rfind(" ")
-            if last_space > 0 and last_space > size * 0.6:
+            # Search the window in place rather than on a sliced copy.
+            last_space = rfind(" ", start, end) - start
+            if last_space > 0 and last_space > min_break:
                 end = start + last_space
-                raw_chunk = text[start:end]
-        leading_ws = len(raw_chunk) - len(raw_chunk.lstrip())
-        trailing_ws = len(raw_chunk) - len(raw_chunk.rstrip())
-        chunk = raw_chunk.strip()
+        else:
+            end = length
+        left_stripped = text[start:end].lstrip()
+        chunk = left_stripped.rstrip()
         if chunk:
-            chunk_start = start + leading_ws
-            chunk_end = end - trailing_ws
-            chunks.append(
+            chunk_start = end - len(left_stripped)
+            append(
                 {
                     "chunk_text": chunk,
-                    "chunk_index": chunk_index,
+                    "chunk_index": len(chunks),
                     "chunk_start": chunk_start,
-                    "chunk_end": chunk_end,
+                    "chunk_end": chunk_start + len(chunk),
                 }
             )
-            chunk_index += 1
         next_start = end - overlap
-        if next_start <= start:
-            next_start = end
-        start = next_start
+        start = next_start if next_start > start else end
     return chunks
 
 
-def _embed_document(document_id: str, actor: str = "system", tenant_id: str | None = None):
+_COPY_EMBEDDINGS_SQL = (
+    "COPY embeddings (document_id, extraction_id, chunk_index, chunk_start, chunk_end, chunk_text, embedding) "
+    "FROM STDIN WITH (FORMAT BINARY)"
+)
+_EMBEDDING_COPY_TYPES = ["uuid", "uuid", "int4", "int4", "int4", "text", "halfvec"]
+
+
+@contextmanager
+def _borrow_conn(conn=None):
+    """Yield ``conn`` if the caller already holds one, else a pooled connection."""
+    if conn is not None:
+        yield conn
+        return
+    with get_conn() as pooled:
+        yield pooled
+
+
+def _embed_with_cache(texts: list[str], tenant_id: str | None) -> tuple[list, list[tuple]]:
+    """
+    Look up ``texts`` in the tenant's embedding_cache (keyed by SHA-256 of the
+    chunk text and the model) and embed only the misses.
+
+    Each distinct text is embedded at most once. The lookup uses its own
+    short checkout, so no connection is held while the embeddings API call is
+    in flight. Returns the vectors in input order plus the cache rows for the
+    caller to insert in its write transaction.
+    """
+    if not tenant_id:
+        # No cache without a tenant, but repeated chunks (boilerplate lines,
+        # page headers) within the document are still embedded once.
+        unique_texts = list(dict.fromkeys(texts))
+        if len(unique_texts) == len(texts):
+            return embed_texts(texts), []
+        vectors_by_text = dict(zip(unique_texts, embed_texts(unique_texts), strict=True))
+        return [vectors_by_text[text] for text in texts], []
+    model = settings.openai_embedding_model
+    digests = [hashlib.sha256(text.encode("utf-8")).digest() for text in texts]
     with get_conn() as conn:
-        row = conn.execute(
+        rows = conn.execute(
             """
-            SELECT e.id as extraction_id, e.raw_text, d.patient_id
-            FROM extractions e
-            JOIN documents d ON d.id = e.document_id
-            JOIN patients p ON p.id = d.patient_id
-            WHERE e.document_id = %s
-              AND (%s IS NULL OR p.tenant_id = %s)
-            ORDER BY e.created_at DESC
-            LIMIT 1
+            SELECT chunk_sha256, embedding
+            FROM embedding_cache
+            WHERE tenant_id = %s AND model = %s AND chunk_sha256 = ANY(%s)
             """,
-            (document_id, tenant_id, tenant_id),
-        ).fetchone()
+            (tenant_id, model, list(set(digests))),
+        ).fetchall()
+    vectors_by_digest = {bytes(r["chunk_sha256"]): r["embedding"] for r in rows}
+
+    misses: dict[bytes, str] = {}
+    for digest, text in zip(digests, texts):
+        if digest not in vectors_by_digest:
+            misses.setdefault(digest, text)
+    cache_rows: list[tuple] = []
+    if misses:
+        fresh = dict(zip(misses, embed_texts(list(misses.values())), strict=True))
+        cache_rows = [(tenant_id, model, digest, HalfVector(vector)) for digest, vector in fresh.items()]
+        vectors_by_digest.update(fresh)
+    return [vectors_by_digest[digest] for digest in digests], cache_rows
 
-    if not row or not row.get("raw_text"):
+
+def _embed_document(document_id: str, actor: str = "system", tenant_id: str | None = None):
+    """
+    Chunk and embed the latest extraction of ``document_id``.
+
+    The document read, the cache lookup and the writes each take a short
+    checkout; no connection is held across the embeddings API call.
+    """
+    with get_conn() as read_conn:
+        row, chunks = _load_document_chunks(read_conn, document_id, tenant_id)
+    vectors, cache_rows = _embed_with_cache([chunk["chunk_text"] for chunk in chunks], tenant_id)
+    with get_conn() as write_conn:
+        _store_document_embeddings(write_conn, document_id, row, chunks, vectors, cache_rows, actor, tenant_id)
+    return {"document_id": document_id, "chunks": len(chunks)}
+
+
+def _load_document_chunks(conn, document_id: str, tenant_id: str | None):
+    # One tenant-scoped lookup doubles as the access check: no row means the
+    # document is missing or belongs to another tenant.
+    query = """
+        SELECT d.patient_id, e.id as extraction_id, e.raw_text
+        FROM documents d
+        JOIN patients p ON p.id = d.patient_id
+        LEFT JOIN LATERAL (
+            SELECT id, raw_text
+            FROM extractions
+            WHERE document_id = d.id
+            ORDER BY created_at DESC
+            LIMIT 1
+        ) e ON true
+        WHERE d.id = %s
+        """
+    params: list[str] = [document_id]
+    if tenant_id:
+        query += " AND p.tenant_id = %s"
+        params.append(tenant_id)
+    row = conn.execute(query, tuple(params), prepare=True).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not row.get("raw_text"):
         raise HTTPException(status_code=404, detail="No extraction found for document")
 
     chunks = _chunk_text(row["raw_text"])
     if not chunks:
         raise HTTPException(status_code=400, detail="No text available for embedding")
-    vectors = embed_texts([chunk["chunk_text"] for chunk in chunks])
+    return row, chunks
 
-    with get_conn() as conn:
-        conn.execute("DELETE FROM embeddings WHERE document_id = %s", (document_id,))
-        for chunk, vector in zip(chunks, vectors, strict=False):
-            conn.execute(
+
+def _store_document_embeddings(
+    conn,
+    document_id: str,
+    row: dict,
+    chunks: list[dict],
+    vectors: list,
+    cache_rows: list[tuple],
+    actor: str,
+    tenant_id: str | None,
+) -> None:
+    if cache_rows:
+        with conn.cursor() as cur:
+            cur.executemany(
                 """
-                INSERT INTO embeddings (document_id, extraction_id, chunk_index, chunk_start, chunk_end, chunk_text, embedding)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO embedding_cache (tenant_id, model, chunk_sha256, embedding, document_id)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
                 """,
+                [(*cache_row, document_id) for cache_row in cache_rows],
+            )
+    # Binary COPY dumps by declared type: ids must be UUID objects, and the
+    # pgvector halfvec dumper registered on pool connections encodes the float
+    # lists as float16 (migration 021).
+    doc_uuid = UUID(str(document_id))
+    extraction_id = row["extraction_id"]
+    conn.execute("DELETE FROM embeddings WHERE document_id = %s", (document_id,), prepare=True)
+    with conn.cursor() as cur, cur.copy(_COPY_EMBEDDINGS_SQL) as copy:
+        copy.set_types(_EMBEDDING_COPY_TYPES)
+        for chunk, vector in zip(chunks, vectors, strict=False):
+            copy.write_row(
                 (
-                    document_id,
-                    row["extraction_id"],
+                    doc_uuid,
+                    extraction_id,
                     chunk["chunk_index"],
                     chunk["chunk_start"],
                     chunk["chunk_end"],
                     chunk["chunk_text"],
                     vector,
-                ),
+                )
             )
-        _log_action(
-            conn,
-            str(row["patient_id"]),
-            "document.embed",
-            actor,
-            {"document_id": document_id},
-            tenant_id=tenant_id,
-        )
-        conn.commit()
-
-    return {"document_id": document_id, "chunks": len(chunks)}
+    _log_action(
+        conn,
+        str(row["patient_id"]),
+        "document.embed",
+        actor,
+        {"document_id": document_id},
+        tenant_id=tenant_id,
+    )
+    conn.commit()
 
 
-def _draft_chr(patient_id: str, notes: str | None, actor: str = "system", tenant_id: str | None = None) -> ChrDraft:
+def _draft_chr(
+    patient_id: str,
+    notes: str | None,
+    actor: str = "system",
+    tenant_id: str | None = None,
+) -> ChrDraft:
     structured, _sources = _aggregate_structured(patient_id, tenant_id=tenant_id)
     if not structured:
         raise HTTPException(status_code=404, detail="No extraction found for patient")
@@ -446,16 +722,16 @@ def _draft_chr(patient_id: str, notes: str | None, actor: str = "system", tenant
     context_chunks = retrieve_hybrid(patient_id, query, top_k=5)
     draft = generate_chr_draft(query_payload, notes, context_chunks)
 
-    with get_conn() as conn:
-        conn.execute(
+    with get_conn() as write_conn:
+        write_conn.execute(
             """
             INSERT INTO chr_versions (patient_id, draft, status)
             VALUES (%s, %s, %s)
             """,
             (patient_id, Json(draft), "draft"),
         )
-        _log_action(conn, patient_id, "chr.draft", actor, {"chunks": len(context_chunks)}, tenant_id=tenant_id)
-        conn.commit()
+        _log_action(write_conn, patient_id, "chr.draft", actor, {"chunks": len(context_chunks)}, tenant_id=tenant_id)
+        write_conn.commit()
 
     return ChrDraft(
         patient_id=patient_id,
@@ -464,24 +740,104 @@ def _draft_chr(patient_id: str, notes: str | None, actor: str = "system", tenant
     )
 
 
-def _aggregate_structured(patient_id: str, tenant_id: str | None = None) -> tuple[dict | None, list[dict]]:
-    with get_conn() as conn:
+# Aggregated structured data per (patient_id, tenant_id), tagged with the
+# patient's extraction fingerprint (count, latest created_at). A new extraction
+# or a deleted document changes the fingerprint, so stale entries are never
+# served; the TTL bounds how long PHI stays in process memory.
+_AGGREGATE_CACHE_TTL_SECONDS = 300.0
+_AGGREGATE_CACHE_MAX = 512
+# Patients with more extractions than this are aggregated through a
+# server-side cursor fetching _AGGREGATE_STREAM_ITERSIZE rows per round-trip.
+_AGGREGATE_STREAM_THRESHOLD = 64
+_AGGREGATE_STREAM_ITERSIZE = 64
+_aggregate_cache: "OrderedDict[tuple[str, str | None], tuple[float, tuple, tuple[dict, list[dict]]]]" = OrderedDict()
+_aggregate_cache_lock = threading.Lock()
+
+
+def _aggregate_cache_get(key: tuple[str, str | None], fingerprint: tuple) -> tuple[dict, list[dict]] | None:
+    with _aggregate_cache_lock:
+        cached = _aggregate_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= monotonic() or cached[1] != fingerprint:
+            del _aggregate_cache[key]
+            return None
+        _aggregate_cache.move_to_end(key)
+    # Callers own the returned structures; never hand out the cached instances.
+    return copy.deepcopy(cached[2])
+
+
+def _aggregate_cache_put(key: tuple[str, str | None], fingerprint: tuple, value: tuple[dict, list[dict]]) -> None:
+    with _aggregate_cache_lock:
+        _aggregate_cache[key] = (monotonic() + _AGGREGATE_CACHE_TTL_SECONDS, fingerprint, copy.deepcopy(value))
+        _aggregate_cache.move_to_end(key)
+        while len(_aggregate_cache) > _AGGREGATE_CACHE_MAX:
+            _aggregate_cache.popitem(last=False)
+
+
+def _aggregate_structured(
+    patient_id: str, tenant_id: str | None = None, conn=None
+) -> tuple[dict | None, list[dict]]:
+    cache_key = (str(patient_id), tenant_id)
+    with _borrow_conn(conn) as conn:
         if tenant_id:
-            rows = conn.execute(
+            probe = conn.execute(
+                """
+                SELECT COUNT(e.id) AS extraction_count, MAX(e.created_at) AS latest_extraction
+                FROM extractions e
+                JOIN documents d ON d.id = e.document_id
+                JOIN patients p ON p.id = d.patient_id
+                WHERE d.patient_id = %s
+                  AND p.tenant_id = %s
+                """,
+                (patient_id, tenant_id),
+                prepare=True,
+            ).fetchone()
+        else:
+            probe = conn.execute(
                 """
+                SELECT COUNT(e.id) AS extraction_count, MAX(e.created_at) AS latest_extraction
+                FROM extractions e
+                JOIN documents d ON d.id = e.document_id
+                WHERE d.patient_id = %s
+                """,
+                (patient_id,),
+                prepare=True,
+            ).fetchone()
+        if not probe or not probe["extraction_count"]:
+            return None, []
+        fingerprint = (probe["extraction_count"], probe["latest_extraction"])
+        cached = _aggregate_cache_get(cache_key, fingerprint)
+        if cached is not None:
+            return cached
+
+        if tenant_id:
+            query = """
                 SELECT
                     d.id as document_id,
                     d.filename,
                     d.content_type,
                     d.created_at as document_created_at,
                     e.id as extraction_id,
-                    e.structured,
-                    e.raw_text,
+                    e.structured_labs as labs,
+                    e.structured_diagnoses as diagnoses,
+                    e.structured_medications as medications,
+                    e.structured_procedures as procedures,
+                    e.structured_genetics as genetics,
+                    e.structured_notes as notes,
                     e.created_at as extracted_at
                 FROM documents d
                 JOIN patients p ON p.id = d.patient_id
                 JOIN LATERAL (
-                    SELECT id, structured, raw_text, created_at
+                    SELECT
+                        id,
+                        structured_labs,
+                        structured_diagnoses,
+                        structured_medications,
+                        structured_procedures,
+                        structured_genetics,
+                        structured_notes,
+                        created_at
                     FROM extractions
                     WHERE document_id = d.id
                     ORDER BY created_at DESC
@@ -490,24 +846,34 @@ def _aggregate_structured(patient_id: str, tenant_id: str | None = None) -> tupl
                 WHERE d.patient_id = %s
                   AND p.tenant_id = %s
                 ORDER BY d.created_at DESC
-                """,
-                (patient_id, tenant_id),
-            ).fetchall()
-        else:
-            rows = conn.execute(
                 """
+            params: tuple = (patient_id, tenant_id)
+        else:
+            query = """
                 SELECT
                     d.id as document_id,
                     d.filename,
                     d.content_type,
                     d.created_at as document_created_at,
                     e.id as extraction_id,
-                    e.structured,
-                    e.raw_text,
+                    e.structured_labs as labs,
+                    e.structured_diagnoses as diagnoses,
+                    e.structured_medications as medications,
+                    e.structured_procedures as procedures,
+                    e.structured_genetics as genetics,
+                    e.structured_notes as notes,
                     e.created_at as extracted_at
                 FROM documents d
                 JOIN LATERAL (
-                    SELECT id, structured, raw_text, created_at
+                    SELECT
+                        id,
+                        structured_labs,
+                        structured_diagnoses,
+                        structured_medications,
+                        structured_procedures,
+                        structured_genetics,
+                        structured_notes,
+                        created_at
                     FROM extractions
                     WHERE document_id = d.id
                     ORDER BY created_at DESC
@@ -515,29 +881,45 @@ def _aggregate_structured(patient_id: str, tenant_id: str | None = None) -> tupl
                 ) e ON true
                 WHERE d.patient_id = %s
                 ORDER BY d.created_at DESC
-                """,
-                (patient_id,),
-            ).fetchall()
-
-    if not rows:
-        return None, []
-
-    labs: list[dict] = []
-    diagnoses: list[str] = []
-    medications: list[str] = []
-    procedures: list[str] = []
-    genetics: list[dict] = []
+                """
+            params = (patient_id,)
+
+        if probe["extraction_count"] > _AGGREGATE_STREAM_THRESHOLD:
+            # Server-side cursor: the structured JSON arrives itersize rows at
+            # a time instead of every extraction being resident at once.
+            with conn.cursor(name="aggregate_structured") as cur:
+                cur.itersize = _AGGREGATE_STREAM_ITERSIZE
+                cur.execute(query, params)
+                result = _fold_extraction_rows(cur)
+        else:
+            result = _fold_extraction_rows(conn.execute(query, params, prepare=True).fetchall())
+
+    if result[0] is not None:
+        _aggregate_cache_put(cache_key, fingerprint, result)
+    return result
+
+
+def _fold_extraction_rows(rows: Iterable[dict]) -> tuple[dict | None, list[dict]]:
+    """
+    Merge the latest extraction of each document into one deduplicated
+    aggregate. Rows carry the extractions' generated section columns
+    (labs, diagnoses, medications, procedures, genetics, notes).
+    """
+    # Each category maps its dedupe key to the first value seen; dicts keep
+    # insertion order, so one structure serves as both seen-set and result.
+    labs_by_key: dict[tuple, dict] = {}
+    dx_by_key: dict[str, str] = {}
+    meds_by_key: dict[str, str] = {}
+    procs_by_key: dict[str, str] = {}
+    genes_by_key: dict[tuple, dict] = {}
     notes_parts: list[str] = []
     sources: list[dict] = []
 
-    seen_labs: set[tuple] = set()
-    seen_dx: set[str] = set()
-    seen_meds: set[str] = set()
-    seen_proc: set[str] = set()
-    seen_gen: set[tuple] = set()
+    # Diagnosis, medication and procedure strings recur across documents;
+    # each distinct spelling is stripped and lower-cased once.
+    norm_keys: dict[str, str] = {}
 
     for row in rows:
-        structured = row.get("structured") or {}
         sources.append(
             {
                 "document_id": str(row["document_id"]),
@@ -548,7 +930,7 @@ def _aggregate_structured(patient_id: str, tenant_id: str | None = None) -> tupl
             }
         )
 
-        for lab in structured.get("labs") or structured.get("biomarkers") or []:
+        for lab in row.get("labs") or []:
             if not isinstance(lab, dict):
                 continue
             key = (
@@ -559,64 +941,61 @@ def _aggregate_structured(patient_id: str, tenant_id: str | None = None) -> tupl
                 lab.get("range"),
                 lab.get("flag"),
             )
-            if key in seen_labs:
-                continue
-            seen_labs.add(key)
-            labs.append(lab)
+            labs_by_key.setdefault(key, lab)
 
-        for dx in structured.get("diagnoses") or []:
+        for dx in row.get("diagnoses") or []:
             dx_str = dx.get("condition") if isinstance(dx, dict) else dx if isinstance(dx, str) else None
             if not dx_str:
                 continue
-            key = dx_str.strip().lower()
-            if not key or key in seen_dx:
-                continue
-            seen_dx.add(key)
-            diagnoses.append(dx_str)
+            key = norm_keys.get(dx_str)
+            if key is None:
+                key = norm_keys[dx_str] = dx_str.strip().lower()
+            if key:
+                dx_by_key.setdefault(key, dx_str)
 
-        for med in structured.get("medications") or []:
+        for med in row.get("medications") or []:
             med_str = med.get("name") if isinstance(med, dict) else med if isinstance(med, str) else None
             if not med_str:
                 continue
-            key = med_str.strip().lower()
-            if not key or key in seen_meds:
-                continue
-            seen_meds.add(key)
-            medications.append(med_str)
+            key = norm_keys.get(med_str)
+            if key is None:
+                key = norm_keys[med_str] = med_str.strip().lower()
+            if key:
+                meds_by_key.setdefault(key, med_str)
 
-        for proc in structured.get("procedures") or []:
+        for proc in row.get("procedures") or []:
             if not isinstance(proc, str):
                 continue
-            key = proc.strip().lower()
-            if not key or key in seen_proc:
-                continue
-            seen_proc.add(key)
-            procedures.append(proc)
+            key = norm_keys.get(proc)
+            if key is None:
+                key = norm_keys[proc] = proc.strip().lower()
+            if key:
+                procs_by_key.setdefault(key, proc)
 
-        for gene in structured.get("genetics") or []:
+        for gene in row.get("genetics") or []:
             if not isinstance(gene, dict):
                 continue
-            key = (gene.get("gene"), gene.get("variant"), gene.get("impact"))
-            if key in seen_gen:
-                continue
-            seen_gen.add(key)
-            genetics.append(gene)
+            genes_by_key.setdefault((gene.get("gene"), gene.get("variant"), gene.get("impact")), gene)
 
-        note = structured.get("notes") or ""
+        note = row.get("notes") or ""
         if note:
             notes_parts.append(f"{row['filename']}: {note}")
 
+    if not sources:
+        return None, []
+
     combined_notes = "\n".join(notes_parts)
     if len(combined_notes) > settings.aggregate_notes_max_chars:
         combined_notes = combined_notes[: settings.aggregate_notes_max_chars] + "\u2026"
 
+    labs = list(labs_by_key.values())
     aggregated = {
         "labs": labs,
         "biomarkers": labs,
-        "diagnoses": diagnoses,
-        "medications": medications,
-        "procedures": procedures,
-        "genetics": genetics,
+        "diagnoses": list(dx_by_key.values()),
+        "medications": list(meds_by_key.values()),
+        "procedures": list(procs_by_key.values()),
+        "genetics": list(genes_by_key.values()),
         "notes": combined_notes,
         "documents": sources,
     }
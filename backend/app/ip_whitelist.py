@@ -7,8 +7,12 @@ Gap Reference: S04
 """
 
 import ipaddress
+import json
 from contextlib import contextmanager
-from typing import List, Optional
+from typing import Iterable, List, NamedTuple, Optional
+
+# Address width in bytes per IP version, used by the compiled whitelist encoding.
+_IP_VERSION_WIDTH = {4: 4, 6: 16}
 
 
 def _split_csv(value: str | None) -> list[str]:
@@ -145,6 +149,109 @@ def is_ip_allowed(
     return False
 
 
+class CompiledWhitelist(NamedTuple):
+    """
+    Pre-parsed tenant whitelist.
+
+    ``ips`` holds exact addresses as ``(version, int)`` pairs for O(1) lookup;
+    ``networks`` holds ``(version, network_int, mask_int)`` triples for CIDR blocks.
+    """
+    ips: frozenset
+    networks: tuple
+
+    def __len__(self) -> int:
+        return len(self.ips) + len(self.networks)
+
+
+def compile_whitelist(whitelist: Iterable[str]) -> CompiledWhitelist:
+    """
+    Parse whitelist entries once into integer form. Invalid entries are skipped.
+    """
+    ips = set()
+    networks = set()
+    for entry in whitelist:
+        entry = str(entry).strip()
+        ip = parse_ip(entry)
+        if ip:
+            ips.add((ip.version, int(ip)))
+            continue
+        network = parse_cidr(entry)
+        if not network:
+            continue
+        if network.prefixlen == network.max_prefixlen:
+            ips.add((network.version, int(network.network_address)))
+        else:
+            networks.add((network.version, int(network.network_address), int(network.netmask)))
+    return CompiledWhitelist(frozenset(ips), tuple(sorted(networks)))
+
+
+def encode_compiled_whitelist(compiled: CompiledWhitelist) -> bytes:
+    """
+    Serialize a compiled whitelist for the ``tenants.allowed_ips_compiled`` column.
+
+    Each entry is ``version | prefixlen | address`` (1 + 1 + 4/16 bytes).
+    """
+    out = bytearray()
+    for version, address in sorted(compiled.ips):
+        width = _IP_VERSION_WIDTH[version]
+        out += bytes((version, width * 8))
+        out += address.to_bytes(width, "big")
+    for version, address, mask in compiled.networks:
+        width = _IP_VERSION_WIDTH[version]
+        out += bytes((version, mask.bit_count()))
+        out += address.to_bytes(width, "big")
+    return bytes(out)
+
+
+def decode_compiled_whitelist(blob: bytes) -> CompiledWhitelist:
+    """
+    Inverse of ``encode_compiled_whitelist``.
+    """
+    ips = []
+    networks = []
+    offset = 0
+    data = bytes(blob)
+    while offset < len(data):
+        version, prefixlen = data[offset], data[offset + 1]
+        width = _IP_VERSION_WIDTH.get(version)
+        if width is None:
+            raise ValueError(f"Invalid compiled whitelist entry version: {version}")
+        address = int.from_bytes(data[offset + 2:offset + 2 + width], "big")
+        offset += 2 + width
+        bits = width * 8
+        if prefixlen == bits:
+            ips.append((version, address))
+        else:
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            networks.append((version, address, mask))
+    return CompiledWhitelist(frozenset(ips), tuple(networks))
+
+
+def is_ip_allowed_compiled(
+    client_ip: str,
+    compiled: CompiledWhitelist,
+    allow_empty: bool = True
+) -> bool:
+    """
+    Same semantics as ``is_ip_allowed`` against a pre-parsed whitelist.
+    """
+    if not compiled:
+        return allow_empty
+    
+    ip = parse_ip(client_ip)
+    if not ip:
+        return False
+    
+    version = ip.version
+    address = int(ip)
+    if (version, address) in compiled.ips:
+        return True
+    for net_version, network, mask in compiled.networks:
+        if net_version == version and address & mask == network:
+            return True
+    return False
+
+
 def get_tenant_whitelist(tenant_id: str, conn = None) -> List[str]:
     """
     Get IP whitelist for a tenant.
@@ -167,8 +274,6 @@ def get_tenant_whitelist(tenant_id: str, conn = None) -> List[str]:
         return []
 
     if isinstance(whitelist, str):
-        import json
-
         try:
             parsed = json.loads(whitelist)
             whitelist = parsed
@@ -192,15 +297,38 @@ def update_tenant_whitelist(
         if not parse_ip(entry) and not parse_cidr(entry):
             raise ValueError(f"Invalid IP or CIDR: {entry}")
     
+    compiled = encode_compiled_whitelist(compile_whitelist(whitelist))
     with _connection_scope(conn) as db_conn:
         db_conn.execute(
-            "UPDATE tenants SET allowed_ips = %s WHERE id = %s",
-            (whitelist, tenant_id)
+            "UPDATE tenants SET allowed_ips = %s, allowed_ips_compiled = %s WHERE id = %s",
+            (whitelist, compiled, tenant_id)
         )
         if conn is None:
             db_conn.commit()
 
 
+def get_tenant_compiled_whitelist(tenant_id: str, conn = None) -> CompiledWhitelist:
+    """
+    Get the pre-parsed IP whitelist for a tenant.
+    Reads 'allowed_ips_compiled' and falls back to compiling 'allowed_ips'
+    when it is NULL: rows never written by update_tenant_whitelist, or whose
+    allowed_ips changed elsewhere (a trigger clears the blob, migration 030).
+    """
+    with _connection_scope(conn) as db_conn:
+        row = db_conn.execute(
+            "SELECT allowed_ips, allowed_ips_compiled FROM tenants WHERE id = %s",
+            (tenant_id,)
+        ).fetchone()
+
+    if not row:
+        return CompiledWhitelist(frozenset(), ())
+
+    blob = row.get("allowed_ips_compiled")
+    if blob is not None:
+        return decode_compiled_whitelist(blob)
+    return compile_whitelist(row.get("allowed_ips") or [])
+
+
 def check_tenant_ip_access(
     tenant_id: str,
     client_ip: str,
@@ -211,8 +339,8 @@ def check_tenant_ip_access(
     
     Returns dict with allowed status and details.
     """
-    whitelist = get_tenant_whitelist(tenant_id, conn)
-    allowed = is_ip_allowed(client_ip, whitelist)
+    whitelist = get_tenant_compiled_whitelist(tenant_id, conn)
+    allowed = is_ip_allowed_compiled(client_ip, whitelist)
     
     return {
         "allowed": allowed,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from typing import Any
 
@@ -9,8 +10,10 @@ from psycopg.types.json import Json
 from .config import get_settings
 from .db import get_conn
 
+settings = get_settings()
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Job:
     id: str
     tenant_id: str | None
@@ -22,28 +25,77 @@ class Job:
     attempts: int
 
 
+def _row_to_job(row: dict[str, Any]) -> Job:
+    return Job(
+        id=str(row["id"]),
+        tenant_id=str(row["tenant_id"]) if row.get("tenant_id") else None,
+        job_type=row["job_type"],
+        status=row["status"],
+        payload=row.get("payload") or {},
+        patient_id=str(row["patient_id"]) if row.get("patient_id") else None,
+        document_id=str(row["document_id"]) if row.get("document_id") else None,
+        attempts=row.get("attempts", 0),
+    )
+
+
+_redis_pool: redis.ConnectionPool | None = None
+_redis_pool_url: str | None = None
+_redis_pool_lock = threading.Lock()
+
+
 def _redis_client() -> redis.Redis | None:
-    settings = get_settings()
+    global _redis_pool, _redis_pool_url
     if not settings.redis_url:
         return None
     try:
-        return redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        with _redis_pool_lock:
+            # Rebuild the shared pool only when the configured URL changes.
+            if _redis_pool is None or _redis_pool_url != settings.redis_url:
+                if _redis_pool is not None:
+                    _redis_pool.disconnect()
+                _redis_pool = redis.ConnectionPool.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    max_connections=settings.redis_pool_size,
+                )
+                _redis_pool_url = settings.redis_url
+        return redis.Redis(connection_pool=_redis_pool)
     except Exception:
         return None
 
 
-def _queue_job_id(job_id: str) -> None:
+def get_redis_client() -> redis.Redis | None:
+    """Return a client on the shared job-queue pool, or None when Redis is not configured."""
+    return _redis_client()
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    job_type: str
+    payload: dict[str, Any]
+    tenant_id: str | None = None
+    patient_id: str | None = None
+    document_id: str | None = None
+
+
+def _queue_job_ids(job_ids: list[str]) -> None:
+    if not job_ids:
+        return
     client = _redis_client()
     if not client:
         return
-    settings = get_settings()
     try:
-        # LPUSH + BRPOP yields FIFO semantics.
-        client.lpush(settings.redis_queue_name, job_id)
+        # LPUSH + BRPOP yields FIFO semantics; a multi-value LPUSH keeps
+        # the ids in order and costs one round-trip for the whole batch.
+        client.lpush(settings.redis_queue_name, *job_ids)
     except Exception:
         return
 
 
+def _queue_job_id(job_id: str) -> None:
+    _queue_job_ids([job_id])
+
+
 def enqueue_job(
     job_type: str,
     payload: dict[str, Any],
@@ -67,6 +119,38 @@ def enqueue_job(
     return job_id
 
 
+def enqueue_jobs(specs: list[JobSpec]) -> list[str]:
+    """
+    Insert several jobs in one executemany and push their ids to Redis in one LPUSH.
+
+    Returns job ids in the same order as ``specs``.
+    """
+    if not specs:
+        return []
+    with get_conn() as conn:
+        job_ids: list[str] = []
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                INSERT INTO jobs (tenant_id, job_type, payload, patient_id, document_id)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                [
+                    (spec.tenant_id, spec.job_type, Json(spec.payload), spec.patient_id, spec.document_id)
+                    for spec in specs
+                ],
+                returning=True,
+            )
+            while True:
+                job_ids.append(str(cur.fetchone()["id"]))
+                if not cur.nextset():
+                    break
+        conn.commit()
+    _queue_job_ids(job_ids)
+    return job_ids
+
+
 def get_job(job_id: str) -> Job | None:
     with get_conn() as conn:
         row = conn.execute(
@@ -79,16 +163,7 @@ def get_job(job_id: str) -> Job | None:
         ).fetchone()
     if not row:
         return None
-    return Job(
-        id=str(row["id"]),
-        tenant_id=str(row["tenant_id"]) if row.get("tenant_id") else None,
-        job_type=row["job_type"],
-        status=row["status"],
-        payload=row.get("payload") or {},
-        patient_id=str(row["patient_id"]) if row.get("patient_id") else None,
-        document_id=str(row["document_id"]) if row.get("document_id") else None,
-        attempts=row.get("attempts", 0),
-    )
+    return _row_to_job(row)
 
 
 def list_jobs(
@@ -97,6 +172,7 @@ def list_jobs(
     tenant_id: str | None = None,
     statuses: list[str] | None = None,
     limit: int = 50,
+    conn=None,
 ) -> list[Job]:
     clauses = []
     params: list[Any] = []
@@ -118,61 +194,58 @@ def list_jobs(
         LIMIT %s
     """
     params.append(limit)
-    with get_conn() as conn:
+    if conn is not None:
         rows = conn.execute(sql, params).fetchall()
-    return [
-        Job(
-            id=str(row["id"]),
-            tenant_id=str(row["tenant_id"]) if row.get("tenant_id") else None,
-            job_type=row["job_type"],
-            status=row["status"],
-            payload=row.get("payload") or {},
-            patient_id=str(row["patient_id"]) if row.get("patient_id") else None,
-            document_id=str(row["document_id"]) if row.get("document_id") else None,
-            attempts=row.get("attempts", 0),
-        )
-        for row in rows
-    ]
+    else:
+        with get_conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+    return [_row_to_job(row) for row in rows]
 
 
-def claim_next_job() -> Job | None:
+_CLAIM_NEXT_JOB_TEMPLATE = """
+    WITH next_job AS (
+        SELECT id
+        FROM jobs
+        WHERE status = 'pending'{tenant_filter}
+        ORDER BY created_at ASC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE jobs
+    SET status = 'running', started_at = NOW(), updated_at = NOW(), attempts = attempts + 1
+    WHERE id IN (SELECT id FROM next_job)
+    RETURNING id, tenant_id, job_type, status, payload, patient_id, document_id, attempts
+"""
+# Two separate statements (rather than "tenant_id = %s OR %s IS NULL") keep
+# each prepared plan on its matching partial index.
+_CLAIM_NEXT_JOB_SQL = _CLAIM_NEXT_JOB_TEMPLATE.format(tenant_filter="")
+_CLAIM_NEXT_TENANT_JOB_SQL = _CLAIM_NEXT_JOB_TEMPLATE.format(tenant_filter=" AND tenant_id = %s")
+
+
+def claim_next_job(tenant_id: str | None = None) -> Job | None:
+    """
+    Claim the oldest pending job, optionally restricted to one tenant.
+
+    A tenant-scoped claim probes idx_jobs_pending_tenant_created_at, so
+    workers pinned to different tenants do not contend on the same rows.
+    """
+    # Claim and mark_job_* statements are prepared explicitly: workers run them
+    # in a tight loop, so skip waiting for psycopg's automatic prepare threshold.
     with get_conn() as conn:
-        row = conn.execute(
-            """
-            WITH next_job AS (
-                SELECT id
-                FROM jobs
-                WHERE status = 'pending'
-                ORDER BY created_at ASC
-                LIMIT 1
-                FOR UPDATE SKIP LOCKED
-            )
-            UPDATE jobs
-            SET status = 'running', started_at = NOW(), updated_at = NOW(), attempts = attempts + 1
-            WHERE id IN (SELECT id FROM next_job)
-            RETURNING id, tenant_id, job_type, status, payload, patient_id, document_id, attempts
-            """
-        ).fetchone()
+        if tenant_id:
+            row = conn.execute(_CLAIM_NEXT_TENANT_JOB_SQL, (tenant_id,), prepare=True).fetchone()
+        else:
+            row = conn.execute(_CLAIM_NEXT_JOB_SQL, prepare=True).fetchone()
         conn.commit()
     if not row:
         return None
-    return Job(
-        id=str(row["id"]),
-        tenant_id=str(row["tenant_id"]) if row.get("tenant_id") else None,
-        job_type=row["job_type"],
-        status=row["status"],
-        payload=row.get("payload") or {},
-        patient_id=str(row["patient_id"]) if row.get("patient_id") else None,
-        document_id=str(row["document_id"]) if row.get("document_id") else None,
-        attempts=row.get("attempts", 0),
-    )
+    return _row_to_job(row)
 
 
 def claim_next_job_from_queue(timeout_seconds: int = 1) -> Job | None:
     client = _redis_client()
     if not client:
         return None
-    settings = get_settings()
     try:
         popped = client.brpop(settings.redis_queue_name, timeout=max(1, int(timeout_seconds)))
     except Exception:
@@ -191,23 +264,201 @@ def claim_next_job_from_queue(timeout_seconds: int = 1) -> Job | None:
             RETURNING id, tenant_id, job_type, status, payload, patient_id, document_id, attempts
             """,
             (job_id,),
+            prepare=True,
         ).fetchone()
         conn.commit()
     if not row:
         return None
-    return Job(
-        id=str(row["id"]),
-        tenant_id=str(row["tenant_id"]) if row.get("tenant_id") else None,
-        job_type=row["job_type"],
-        status=row["status"],
-        payload=row.get("payload") or {},
-        patient_id=str(row["patient_id"]) if row.get("patient_id") else None,
-        document_id=str(row["document_id"]) if row.get("document_id") else None,
-        attempts=row.get("attempts", 0),
-    )
+    return _row_to_job(row)
+
+
+def _processing_key(worker_id: str) -> str:
+    return f"{settings.redis_queue_name}:proc:{worker_id}"
+
+
+def _heartbeat_key(worker_id: str) -> str:
+    return f"{settings.redis_queue_name}:heartbeat:{worker_id}"
+
+
+def heartbeat_worker(worker_id: str) -> None:
+    """Mark a worker as alive so its processing list is not treated as orphaned."""
+    client = _redis_client()
+    if not client:
+        return
+    try:
+        client.set(_heartbeat_key(worker_id), "1", ex=settings.job_worker_heartbeat_ttl_seconds)
+    except Exception:
+        return
+
+
+def is_worker_alive(worker_id: str) -> bool:
+    """True while ``worker_id`` has an unexpired heartbeat (or Redis is unavailable)."""
+    client = _redis_client()
+    if not client:
+        return True
+    try:
+        return bool(client.exists(_heartbeat_key(worker_id)))
+    except Exception:
+        return True
+
+
+def start_heartbeat(worker_id: str, interval_seconds: float | None = None) -> threading.Event:
+    """
+    Refresh the worker heartbeat from a daemon thread until the returned event is set.
+
+    The job loop blocks while a job runs, so beating from the loop alone lets
+    the heartbeat expire under jobs longer than its TTL and another worker
+    re-queues them. The thread dies with the process, so a dead worker's
+    heartbeat still expires. Defaults to a third of the TTL between beats.
+    """
+    interval = interval_seconds or max(1.0, settings.job_worker_heartbeat_ttl_seconds / 3)
+    stop = threading.Event()
+
+    def _beat() -> None:
+        while True:
+            heartbeat_worker(worker_id)
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=_beat, name=f"heartbeat-{worker_id}", daemon=True).start()
+    return stop
+
+
+def _release_job_ids(job_ids: list[str], worker_id: str | None) -> None:
+    if not worker_id or not job_ids:
+        return
+    client = _redis_client()
+    if not client:
+        return
+    key = _processing_key(worker_id)
+    try:
+        pipe = client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.lrem(key, 0, job_id)
+        pipe.execute()
+    except Exception:
+        return
+
+
+def _move_job_ids(client, queue: str, processing: str, batch_size: int, timeout_seconds: int) -> list[str]:
+    # Each id is atomically moved into the worker's processing list, so a crash
+    # after the pop leaves it recoverable instead of lost.
+    if timeout_seconds > 0:
+        first = client.blmove(queue, processing, int(timeout_seconds), "RIGHT", "LEFT")
+    else:
+        first = client.lmove(queue, processing, "RIGHT", "LEFT")
+    if first is None:
+        return []
+    if batch_size == 1:
+        return [first]
+    pipe = client.pipeline(transaction=False)
+    for _ in range(batch_size - 1):
+        pipe.lmove(queue, processing, "RIGHT", "LEFT")
+    return [first] + [job_id for job_id in pipe.execute() if job_id is not None]
+
+
+def claim_next_jobs_from_queue(
+    batch_size: int,
+    timeout_seconds: int = 1,
+    *,
+    worker_id: str | None = None,
+) -> list[Job]:
+    """
+    Pop up to ``batch_size`` job ids from Redis and claim them in one UPDATE.
+
+    Blocks for up to ``timeout_seconds`` (BLMPOP, Redis >= 7); a timeout of 0
+    polls without blocking (RPOP with COUNT). With ``worker_id`` the ids are
+    moved into that worker's processing list instead (BLMOVE/LMOVE) and stay
+    there until ``mark_job_done``/``mark_job_failed`` release them. Jobs come
+    back in queue order; stale ids whose rows are no longer pending are dropped.
+    """
+    client = _redis_client()
+    if not client:
+        return []
+    batch_size = max(1, int(batch_size))
+    try:
+        if worker_id:
+            job_ids = _move_job_ids(
+                client,
+                settings.redis_queue_name,
+                _processing_key(worker_id),
+                batch_size,
+                timeout_seconds,
+            )
+        elif timeout_seconds > 0:
+            # LPUSH + pop from the RIGHT keeps FIFO semantics.
+            popped = client.blmpop(
+                int(timeout_seconds),
+                1,
+                settings.redis_queue_name,
+                direction="RIGHT",
+                count=batch_size,
+            )
+            job_ids = popped[1] if popped else []
+        else:
+            job_ids = client.rpop(settings.redis_queue_name, batch_size) or []
+    except Exception:
+        return []
+    if not job_ids:
+        return []
+
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'running', started_at = NOW(), updated_at = NOW(), attempts = attempts + 1
+            WHERE id = ANY(%s::uuid[])
+              AND status = 'pending'
+            RETURNING id, tenant_id, job_type, status, payload, patient_id, document_id, attempts
+            """,
+            (job_ids,),
+            prepare=True,
+        ).fetchall()
+        conn.commit()
+    claimed = {job.id: job for job in map(_row_to_job, rows)}
+    _release_job_ids([job_id for job_id in job_ids if job_id not in claimed], worker_id)
+    return [claimed[job_id] for job_id in job_ids if job_id in claimed]
+
+
+def recover_orphaned_jobs() -> int:
+    """
+    Re-queue job ids left in the processing lists of workers whose heartbeat expired.
+
+    Their rows are reset from 'running' to 'pending' first so the next claim
+    accepts them. Returns the number of ids moved back to the queue.
+    """
+    client = _redis_client()
+    if not client:
+        return 0
+    prefix = f"{settings.redis_queue_name}:proc:"
+    recovered = 0
+    try:
+        for key in client.scan_iter(match=f"{prefix}*"):
+            worker_id = key[len(prefix):]
+            if client.exists(_heartbeat_key(worker_id)):
+                continue
+            job_ids = client.lrange(key, 0, -1)
+            if job_ids:
+                with get_conn() as conn:
+                    conn.execute(
+                        """
+                        UPDATE jobs
+                        SET status = 'pending', updated_at = NOW()
+                        WHERE id = ANY(%s::uuid[])
+                          AND status = 'running'
+                        """,
+                        (job_ids,),
+                    )
+                    conn.commit()
+            # Push back onto the consuming end so recovered jobs run next.
+            while client.lmove(key, settings.redis_queue_name, "RIGHT", "RIGHT") is not None:
+                recovered += 1
+    except Exception:
+        return recovered
+    return recovered
 
 
-def mark_job_done(job_id: str) -> None:
+def mark_job_done(job_id: str, *, worker_id: str | None = None) -> None:
     with get_conn() as conn:
         conn.execute(
             """
@@ -216,11 +467,13 @@ def mark_job_done(job_id: str) -> None:
             WHERE id = %s
             """,
             (job_id,),
+            prepare=True,
         )
         conn.commit()
+    _release_job_ids([job_id], worker_id)
 
 
-def mark_job_failed(job_id: str, error: str) -> None:
+def mark_job_failed(job_id: str, error: str, *, worker_id: str | None = None) -> None:
     with get_conn() as conn:
         conn.execute(
             """
@@ -229,5 +482,7 @@ def mark_job_failed(job_id: str, error: str) -> None:
             WHERE id = %s
             """,
             (error[:800], job_id),
+            prepare=True,
         )
         conn.commit()
+    _release_job_ids([job_id], worker_id)
@@ -1,37 +1,59 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
 from time import monotonic
 from typing import Any
 
+import httpx
+import orjson
 from openai import OpenAI
-from psycopg.types.json import Json
 
 from .config import get_settings
-from .db import get_actor_context, get_conn, get_tenant_context
-from .phi import ensure_phi_processor, redact_text
+from .db import get_actor_context, get_conn, get_tenant_context, set_tenant_context
+from .jobs import get_redis_client, is_worker_alive, start_heartbeat
+from .observability import metrics
+from .phi import contains_phi, ensure_phi_processor, redact_text
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=8)
+def _cached_openai_client(api_key: str, timeout: int, base_url: str | None) -> OpenAI:
+    # One client (and one keep-alive HTTP pool) per configuration, so TLS
+    # handshakes are paid once instead of on every LLM call.
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+        timeout=timeout,
+    )
+    kwargs: dict[str, Any] = {"api_key": api_key, "timeout": timeout, "http_client": http_client}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return OpenAI(**kwargs)
 
 
 def get_openai_client(*, timeout_seconds: int | None = None) -> OpenAI:
     """
-    Create an OpenAI client with HIPAA/PHI policy enforcement.
+    Return the shared OpenAI client with HIPAA/PHI policy enforcement.
 
     - In HIPAA mode, requires OpenAI to be listed in `PHI_PROCESSORS`.
     - Uses the configured request timeout.
+    - Clients are reused per (api key, timeout, base URL).
     """
-    settings = get_settings()
     if not settings.mistral_api_key:
         raise RuntimeError("MISTRAL_API_KEY not configured.")
     if settings.hipaa_mode:
         ensure_phi_processor("openai")
     timeout = timeout_seconds if timeout_seconds is not None else settings.openai_timeout_seconds
-    kwargs = {"api_key": settings.mistral_api_key, "timeout": timeout}
-    if settings.openai_base_url:
-        kwargs["base_url"] = settings.openai_base_url
-    return OpenAI(**kwargs)
+    return _cached_openai_client(settings.mistral_api_key, timeout, settings.openai_base_url)
 
 
 def redact_if_enabled(text: str) -> str:
-    settings = get_settings()
     if not settings.phi_redaction_enabled:
         return text
     return redact_text(text)
@@ -40,30 +62,44 @@ def redact_if_enabled(text: str) -> str:
 def redact_messages_if_enabled(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """
     Redact PHI from chat messages while preserving non-text payloads (e.g., vision image_url parts).
+
+    Messages without PHI are passed through uncopied; when nothing matches,
+    the original list is returned.
     """
-    settings = get_settings()
     if not settings.phi_redaction_enabled:
         return messages
 
-    redacted_messages: list[dict[str, Any]] = []
-    for message in messages:
-        new_message = dict(message)
-        content = new_message.get("content")
+    redacted_messages: list[dict[str, Any]] | None = None
+    for index, message in enumerate(messages):
+        new_message = message
+        content = message.get("content")
         if isinstance(content, str):
-            new_message["content"] = redact_text(content)
+            if contains_phi(content):
+                new_message = dict(message)
+                new_message["content"] = redact_text(content)
         elif isinstance(content, list):
-            new_parts: list[Any] = []
-            for part in content:
-                if isinstance(part, dict) and part.get("type") == "text" and isinstance(part.get("text"), str):
+            new_parts: list[Any] | None = None
+            for part_index, part in enumerate(content):
+                if (
+                    isinstance(part, dict)
+                    and part.get("type") == "text"
+                    and isinstance(part.get("text"), str)
+                    and contains_phi(part["text"])
+                ):
+                    if new_parts is None:
+                        new_parts = list(content)
                     new_part = dict(part)
                     new_part["text"] = redact_text(part["text"])
-                    new_parts.append(new_part)
-                else:
-                    new_parts.append(part)
-            new_message["content"] = new_parts
-        redacted_messages.append(new_message)
+                    new_parts[part_index] = new_part
+            if new_parts is not None:
+                new_message = dict(message)
+                new_message["content"] = new_parts
+        if new_message is not message and redacted_messages is None:
+            redacted_messages = list(messages[:index])
+        if redacted_messages is not None:
+            redacted_messages.append(new_message)
 
-    return redacted_messages
+    return redacted_messages if redacted_messages is not None else messages
 
 
 def _as_processor_set(raw: Any) -> set[str]:
@@ -76,9 +112,30 @@ def _as_processor_set(raw: Any) -> set[str]:
     return set()
 
 
+# Tenant policies change rarely; cache them per tenant so every LLM call does
+# not pay a Postgres round-trip. Entries are (expires_at, policy).
+_PHI_POLICY_TTL_SECONDS = 60.0
+_PHI_POLICY_CACHE_MAX = 4096
+_phi_policy_cache: dict[str, tuple[float, dict[str, Any] | None]] = {}
+_phi_policy_lock = threading.Lock()
+
+
 def _load_tenant_phi_policy(tenant_id: str | None) -> dict[str, Any] | None:
+    """
+    Return the tenant's row from ``tenant_phi_policies`` (None when absent).
+
+    Policies are edited directly in the database, with no application write
+    path to invalidate from, so a change takes up to ``_PHI_POLICY_TTL_SECONDS``
+    to apply in each process.
+    """
     if not tenant_id:
         return None
+    key = str(tenant_id)
+    now = monotonic()
+    with _phi_policy_lock:
+        cached = _phi_policy_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
     try:
         with get_conn() as conn:
             row = conn.execute(
@@ -89,13 +146,18 @@ def _load_tenant_phi_policy(tenant_id: str | None) -> dict[str, Any] | None:
                 """,
                 (tenant_id,),
             ).fetchone()
-        return row if row else None
     except Exception:
+        # Do not cache lookup failures; retry on the next call.
         return None
+    policy = row if row else None
+    with _phi_policy_lock:
+        if len(_phi_policy_cache) >= _PHI_POLICY_CACHE_MAX:
+            _phi_policy_cache.clear()
+        _phi_policy_cache[key] = (now + _PHI_POLICY_TTL_SECONDS, policy)
+    return policy
 
 
 def _enforce_phi_policy(*, processor: str, operation: str, tenant_id: str | None) -> None:
-    settings = get_settings()
     if settings.hipaa_mode and not tenant_id:
         raise RuntimeError(f"Tenant context is required for PHI egress operation '{operation}' in HIPAA mode.")
 
@@ -119,6 +181,199 @@ def _enforce_phi_policy(*, processor: str, operation: str, tenant_id: str | None
         )
 
 
+_logger = logging.getLogger(__name__)
+
+_PHI_EGRESS_COLUMNS = (
+    "event_time",
+    "tenant_id",
+    "actor_id",
+    "processor",
+    "operation",
+    "model",
+    "request_id",
+    "allowed",
+    "redaction_applied",
+    "reason",
+    "metadata",
+)
+_COPY_PHI_EGRESS_SQL = f"COPY phi_egress_events ({', '.join(_PHI_EGRESS_COLUMNS)}) FROM STDIN"
+
+
+def _write_phi_egress_events(events: list[dict[str, Any]]) -> None:
+    # RLS checks tenant_id against app.tenant_id, so each tenant's rows are
+    # copied on a connection scoped to that tenant.
+    by_tenant: dict[str | None, list[dict[str, Any]]] = {}
+    for event in events:
+        by_tenant.setdefault(event.get("tenant_id"), []).append(event)
+    previous_tenant = get_tenant_context()
+    try:
+        for tenant_id, rows in by_tenant.items():
+            set_tenant_context(tenant_id)
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    with cur.copy(_COPY_PHI_EGRESS_SQL) as copy:
+                        for event in rows:
+                            copy.write_row(
+                                [
+                                    orjson.dumps(event.get("metadata") or {}, default=str).decode()
+                                    if column == "metadata"
+                                    else event.get(column)
+                                    for column in _PHI_EGRESS_COLUMNS
+                                ]
+                            )
+                conn.commit()
+    finally:
+        set_tenant_context(previous_tenant)
+
+
+# Identifies this process's processing list; matches the worker id format so
+# the job heartbeat doubles as the liveness signal for orphan recovery.
+PHI_EGRESS_CONSUMER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _phi_egress_processing_key(consumer_id: str) -> str:
+    return f"{settings.phi_egress_queue_name}:proc:{consumer_id}"
+
+
+def drain_phi_egress_events(max_events: int | None = None, *, consumer_id: str | None = None) -> int:
+    """
+    Bulk-write PHI egress events queued in Redis by ``_log_phi_egress``.
+
+    Moves up to ``max_events`` (default ``PHI_EGRESS_BATCH_SIZE``) into the
+    consumer's processing list with LMOVE and COPYs them into
+    ``phi_egress_events``; they are removed from that list only after the
+    commit. A failed write leaves them there for the next drain to retry, and
+    a crash leaves them for ``recover_phi_egress_events``. Returns the number
+    of events written.
+    """
+    client = get_redis_client()
+    if not client:
+        return 0
+    count = max(1, int(max_events or settings.phi_egress_batch_size))
+    processing = _phi_egress_processing_key(consumer_id or PHI_EGRESS_CONSUMER_ID)
+    try:
+        # A batch left behind by a failed write is retried before taking more.
+        raw_events = client.lrange(processing, 0, -1)
+        if not raw_events:
+            # LPUSH + move from the RIGHT keeps events in emission order.
+            pipe = client.pipeline(transaction=False)
+            for _ in range(count):
+                pipe.lmove(settings.phi_egress_queue_name, processing, "RIGHT", "LEFT")
+            raw_events = [raw for raw in pipe.execute() if raw is not None]
+    except Exception:
+        return 0
+    if not raw_events:
+        return 0
+    try:
+        _write_phi_egress_events([orjson.loads(raw) for raw in raw_events])
+    except Exception:
+        _logger.exception("Failed to write %d queued PHI egress events", len(raw_events))
+        return 0
+    try:
+        pipe = client.pipeline(transaction=False)
+        for raw in raw_events:
+            pipe.lrem(processing, 1, raw)
+        pipe.execute()
+    except Exception:
+        _logger.exception("Failed to release %d written PHI egress events", len(raw_events))
+    return len(raw_events)
+
+
+def recover_phi_egress_events() -> int:
+    """
+    Re-queue PHI egress events left in the processing lists of dead consumers.
+
+    A consumer counts as dead once its heartbeat (see ``jobs.start_heartbeat``)
+    has expired. Returns the number of events moved back to the queue.
+    """
+    client = get_redis_client()
+    if not client:
+        return 0
+    prefix = _phi_egress_processing_key("")
+    recovered = 0
+    try:
+        for key in client.scan_iter(match=f"{prefix}*"):
+            if is_worker_alive(key[len(prefix):]):
+                continue
+            # Push back onto the consuming end so recovered events are written next.
+            while client.lmove(key, settings.phi_egress_queue_name, "RIGHT", "RIGHT") is not None:
+                recovered += 1
+    except Exception:
+        return recovered
+    return recovered
+
+
+def phi_egress_queue_depth() -> int:
+    """Number of PHI egress events waiting in Redis (0 without Redis)."""
+    client = get_redis_client()
+    if not client:
+        return 0
+    try:
+        return int(client.llen(settings.phi_egress_queue_name))
+    except Exception:
+        return 0
+
+
+_phi_egress_flusher_task: asyncio.Task | None = None
+_phi_egress_heartbeat: threading.Event | None = None
+# How often the flusher scans for processing lists left by dead consumers.
+_PHI_EGRESS_RECOVERY_INTERVAL_SECONDS = 60.0
+
+
+async def _phi_egress_flusher() -> None:
+    # The API drains its own queue so egress records reach Postgres even when
+    # no worker is running; workers drain the same list between job claims.
+    last_recovery = 0.0
+    while True:
+        try:
+            if monotonic() - last_recovery >= _PHI_EGRESS_RECOVERY_INTERVAL_SECONDS:
+                recovered = await asyncio.to_thread(recover_phi_egress_events)
+                if recovered:
+                    _logger.warning("Re-queued %d orphaned PHI egress events", recovered)
+                last_recovery = monotonic()
+            written = await asyncio.to_thread(drain_phi_egress_events)
+            depth = await asyncio.to_thread(phi_egress_queue_depth)
+        except Exception:
+            _logger.exception("PHI egress flush failed")
+            written, depth = 0, 0
+        metrics.set_gauge("phi_egress_queue_depth", depth)
+        if depth >= settings.phi_egress_queue_alert_depth:
+            _logger.error(
+                "PHI egress queue backlog: %d events waiting in %s",
+                depth,
+                settings.phi_egress_queue_name,
+            )
+        if written < settings.phi_egress_batch_size:
+            await asyncio.sleep(settings.phi_egress_flush_interval_seconds)
+
+
+def start_phi_egress_flusher() -> None:
+    global _phi_egress_flusher_task, _phi_egress_heartbeat
+    if _phi_egress_flusher_task is not None or not settings.redis_url:
+        return
+    # Keeps this process's processing list from being recovered while it lives.
+    _phi_egress_heartbeat = start_heartbeat(PHI_EGRESS_CONSUMER_ID)
+    _phi_egress_flusher_task = asyncio.get_running_loop().create_task(_phi_egress_flusher())
+
+
+async def stop_phi_egress_flusher() -> None:
+    """Cancel the flusher and write whatever is still queued."""
+    global _phi_egress_flusher_task, _phi_egress_heartbeat
+    if _phi_egress_flusher_task is None:
+        return
+    _phi_egress_flusher_task.cancel()
+    try:
+        await _phi_egress_flusher_task
+    except asyncio.CancelledError:
+        pass
+    _phi_egress_flusher_task = None
+    while await asyncio.to_thread(drain_phi_egress_events):
+        pass
+    if _phi_egress_heartbeat is not None:
+        _phi_egress_heartbeat.set()
+        _phi_egress_heartbeat = None
+
+
 def _log_phi_egress(
     *,
     tenant_id: str | None,
@@ -132,38 +387,35 @@ def _log_phi_egress(
     reason: str | None = None,
     metadata: dict[str, Any] | None = None,
 ) -> None:
+    """
+    Record an outbound PHI processing event.
+
+    With Redis configured the event is queued for ``drain_phi_egress_events``
+    (run by the API's flusher and by workers) so the INSERT stays off the LLM
+    call path; otherwise, or if the push fails, it is written directly.
+    """
+    event = {
+        "event_time": datetime.now(timezone.utc).isoformat(),
+        "tenant_id": tenant_id,
+        "actor_id": actor_id,
+        "processor": processor,
+        "operation": operation,
+        "model": model,
+        "request_id": request_id,
+        "allowed": allowed,
+        "redaction_applied": redaction_applied,
+        "reason": reason,
+        "metadata": metadata or {},
+    }
+    client = get_redis_client()
+    if client:
+        try:
+            client.lpush(settings.phi_egress_queue_name, orjson.dumps(event, default=str))
+            return
+        except Exception:
+            pass
     try:
-        with get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO phi_egress_events (
-                    tenant_id,
-                    actor_id,
-                    processor,
-                    operation,
-                    model,
-                    request_id,
-                    allowed,
-                    redaction_applied,
-                    reason,
-                    metadata
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    tenant_id,
-                    actor_id,
-                    processor,
-                    operation,
-                    model,
-                    request_id,
-                    allowed,
-                    redaction_applied,
-                    reason,
-                    Json(metadata or {}),
-                ),
-            )
-            conn.commit()
+        _write_phi_egress_events([event])
     except Exception:
         return
 
@@ -177,7 +429,6 @@ def create_chat_completion(
     metadata: dict[str, Any] | None = None,
     **kwargs: Any,
 ):
-    settings = get_settings()
     target_model = model or settings.openai_model
     tenant_id = get_tenant_context()
     actor_id = get_actor_context()
@@ -199,7 +450,8 @@ def create_chat_completion(
         raise
 
     safe_messages = redact_messages_if_enabled(messages)
-    redaction_applied = safe_messages != messages
+    # Only redaction copies the list, so identity is an exact change flag.
+    redaction_applied = safe_messages is not messages
     start = monotonic()
     response = get_openai_client().chat.completions.create(
         model=target_model,
@@ -208,14 +460,15 @@ def create_chat_completion(
     )
     duration_ms = int((monotonic() - start) * 1000)
     usage = getattr(response, "usage", None)
-    usage_meta = {
+    merged_meta = {
+        **(metadata or {}),
         "duration_ms": duration_ms,
-        "prompt_tokens": getattr(usage, "prompt_tokens", None) if usage else None,
-        "completion_tokens": getattr(usage, "completion_tokens", None) if usage else None,
-        "total_tokens": getattr(usage, "total_tokens", None) if usage else None,
+        **{
+            key: value
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+            if (value := getattr(usage, key, None)) is not None
+        },
     }
-    merged_meta = dict(metadata or {})
-    merged_meta.update({k: v for k, v in usage_meta.items() if v is not None})
     _log_phi_egress(
         tenant_id=tenant_id,
         actor_id=actor_id,
@@ -239,7 +492,6 @@ def create_embedding(
     metadata: dict[str, Any] | None = None,
     **kwargs: Any,
 ):
-    settings = get_settings()
     target_model = model or settings.openai_embedding_model
     tenant_id = get_tenant_context()
     actor_id = get_actor_context()
@@ -260,11 +512,13 @@ def create_embedding(
         )
         raise
 
+    # redact_if_enabled hands back the same str object when nothing matched.
     if isinstance(inputs, list):
         safe_inputs = [redact_if_enabled(text) for text in inputs]
+        redaction_applied = any(safe is not text for safe, text in zip(safe_inputs, inputs))
     else:
         safe_inputs = redact_if_enabled(inputs)
-    redaction_applied = safe_inputs != inputs
+        redaction_applied = safe_inputs is not inputs
     start = monotonic()
     response = get_openai_client().embeddings.create(
         model=target_model,
@@ -272,13 +526,12 @@ def create_embedding(
         **kwargs,
     )
     duration_ms = int((monotonic() - start) * 1000)
-    usage = getattr(response, "usage", None)
-    merged_meta = dict(metadata or {})
-    merged_meta["duration_ms"] = duration_ms
-    if usage:
-        tokens = getattr(usage, "total_tokens", None)
-        if tokens is not None:
-            merged_meta["total_tokens"] = tokens
+    tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    merged_meta = {
+        **(metadata or {}),
+        "duration_ms": duration_ms,
+        **({"total_tokens": tokens} if tokens is not None else {}),
+    }
     _log_phi_egress(
         tenant_id=tenant_id,
         actor_id=actor_id,
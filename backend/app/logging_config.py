@@ -11,14 +11,16 @@ Gap Reference: M01
 """
 
 import logging
-import json
 import re
 import sys
+import time
 import uuid
-from datetime import datetime
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
+from itertools import islice
 from typing import Any, Optional
 
+import orjson
+
 # Context variable for request correlation
 request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 user_id_var: ContextVar[Optional[str]] = ContextVar('user_id', default=None)
@@ -30,19 +32,20 @@ class StructuredFormatter(logging.Formatter):
     JSON formatter for structured logging.
     """
     
-    SENSITIVE_KEYS = {
+    SENSITIVE_KEYS = frozenset({
         'password', 'token', 'api_key', 'secret', 'authorization',
         'ssn', 'dob', 'mrn', 'patient_id', 'email', 'phone'
-    }
-    MESSAGE_PATTERNS = (
-        re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN
-        re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),  # email
-        re.compile(r"\b\+?\d[\d\-\s()]{8,}\d\b"),  # phone-like
+    })
+    # Merged into one alternation so each message is scanned once.
+    MESSAGE_PATTERN = re.compile(
+        r"(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)"
+        r"|(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+        r"|(?P<phone>\b\+?\d[\d\-\s()]{8,}\d\b)"
     )
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._format_timestamp(record),
             "level": record.levelname,
             "logger": record.name,
             "message": self._redact_message(record.getMessage()),
@@ -67,30 +70,45 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, 'extra_data'):
             log_data["data"] = self._redact_sensitive(record.extra_data)
         
-        return json.dumps(log_data, default=str)
+        return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
     
+    @staticmethod
+    def _format_timestamp(record: logging.LogRecord) -> str:
+        # Built from record.created so no datetime object is allocated per record.
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
     def _redact_sensitive(self, data: Any, depth: int = 0) -> Any:
         """Redact sensitive fields from log data."""
-        if depth > 5:  # Prevent infinite recursion
-            return "[DEPTH_LIMIT]"
-        
-        if isinstance(data, dict):
-            return {
-                k: "[REDACTED]" if k.lower() in self.SENSITIVE_KEYS 
-                else self._redact_sensitive(v, depth + 1)
-                for k, v in data.items()
-            }
-        elif isinstance(data, list):
-            return [self._redact_sensitive(item, depth + 1) for item in data[:10]]
-        elif isinstance(data, str) and len(data) > 1000:
-            return data[:500] + "... [TRUNCATED]"
-        return data
+        # Walk with an explicit stack instead of recursion. Each entry writes its
+        # result into parent[key]; containers are pre-filled so order is kept.
+        root: list[Any] = [None]
+        stack: list[tuple[Any, Any, Any, int]] = [(root, 0, data, depth)]
+        while stack:
+            parent, key, value, level = stack.pop()
+            if level > 5:  # Prevent infinite recursion
+                parent[key] = "[DEPTH_LIMIT]"
+            elif isinstance(value, dict):
+                redacted: dict[Any, Any] = {}
+                parent[key] = redacted
+                for k, v in value.items():
+                    if isinstance(k, str) and (k if k.islower() else k.lower()) in self.SENSITIVE_KEYS:
+                        redacted[k] = "[REDACTED]"
+                    else:
+                        redacted[k] = None
+                        stack.append((redacted, k, v, level + 1))
+            elif isinstance(value, list):
+                items: list[Any] = [None] * min(len(value), 10)
+                parent[key] = items
+                for index, item in enumerate(islice(value, 10)):
+                    stack.append((items, index, item, level + 1))
+            elif isinstance(value, str) and len(value) > 1000:
+                parent[key] = value[:500] + "... [TRUNCATED]"
+            else:
+                parent[key] = value
+        return root[0]
 
     def _redact_message(self, message: str) -> str:
-        redacted = message
-        for pattern in self.MESSAGE_PATTERNS:
-            redacted = pattern.sub("[REDACTED]", redacted)
-        return redacted
+        return self.MESSAGE_PATTERN.sub("[REDACTED]", message)
 
 
 def setup_logging(
@@ -106,6 +124,11 @@ def setup_logging(
         json_output: If True, use JSON format; otherwise, human-readable
         log_file: Optional file path for file logging
     """
+    # Records never read thread/process names; skip collecting them.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     
@@ -147,6 +170,9 @@ def log_with_context(
     **extra
 ):
     """Log a message with extra context data."""
+    # logger.handle() skips the level check done by logger.info() & co.
+    if not logger.isEnabledFor(level):
+        return
     record = logger.makeRecord(
         logger.name,
         level,
@@ -175,25 +201,43 @@ def log_debug(logger: logging.Logger, message: str, **extra):
 
 
 # Request context helpers
+RequestContextTokens = tuple[Optional[Token], Optional[Token], Optional[Token]]
+
+
 def set_request_context(
     request_id: Optional[str] = None,
     user_id: Optional[str] = None,
     tenant_id: Optional[str] = None
-):
-    """Set context variables for the current request."""
-    if request_id:
-        request_id_var.set(request_id)
-    if user_id:
-        user_id_var.set(user_id)
-    if tenant_id:
-        tenant_id_var.set(tenant_id)
+) -> RequestContextTokens:
+    """
+    Set context variables for the current request.
+
+    Returns the tokens to pass to ``clear_request_context`` so the previous
+    values are restored rather than overwritten with None. Unset values get
+    a None token.
+    """
+    return (
+        request_id_var.set(request_id) if request_id else None,
+        user_id_var.set(user_id) if user_id else None,
+        tenant_id_var.set(tenant_id) if tenant_id else None,
+    )
 
 def generate_request_id() -> str:
     """Generate a unique request ID."""
     return str(uuid.uuid4())[:8]
 
-def clear_request_context():
-    """Clear context variables after request."""
-    request_id_var.set(None)
-    user_id_var.set(None)
-    tenant_id_var.set(None)
+def clear_request_context(tokens: Optional[RequestContextTokens] = None):
+    """
+    Clear context variables after request.
+
+    With the tokens from ``set_request_context`` each variable is reset to
+    the value it had before; without them all three are set to None.
+    """
+    if tokens is None:
+        request_id_var.set(None)
+        user_id_var.set(None)
+        tenant_id_var.set(None)
+        return
+    for var, token in zip((request_id_var, user_id_var, tenant_id_var), tokens):
+        if token is not None:
+            var.reset(token)
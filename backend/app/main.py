@@ -1,17 +1,23 @@
 from pathlib import Path
-from uuid import uuid4
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import io
 import logging
 import re
-import secrets
 from urllib.parse import quote
 
 import math
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Form, status
+import orjson
+import qrcode
+from fastapi import BackgroundTasks, FastAPI, UploadFile, File, HTTPException, Query, Request, Form, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from psycopg.types.json import Json
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.trustedhost import TrustedHostMiddleware
@@ -21,7 +27,7 @@ from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 
 from .config import get_settings
-from .db import get_conn, close_pool, clear_tenant_context, set_tenant_context, set_actor_context
+from .db import get_conn, close_pool, close_async_pool, set_tenant_context, set_actor_context
 from .schemas import (
     PatientCreate,
     Patient,
@@ -35,8 +41,16 @@ from .storage import (
 )
 from .rag import build_query, retrieve_top_chunks
 from .chr import query_chr
-from .jobs import enqueue_job, list_jobs
-from .observability import metrics, record_request
+from .jobs import JobSpec, enqueue_job, enqueue_jobs, list_jobs
+from .observability import metrics
+from .middleware import (
+    DbContextMiddleware,
+    MetricsMiddleware,
+    RequestIdMiddleware,
+    SecurityHeadersMiddleware,
+    SessionTimeoutMiddleware,
+    csp_nonce,
+)
 from . import clinical
 from . import gap_features
 from .api_routes import router as api_router
@@ -44,7 +58,8 @@ from .helpers import (
     _row_to_patient,
     _row_to_document,
     _log_action,
-    _upload_document,
+    _log_action_bg,
+    _upload_documents,
     _extract_document,
     _embed_document,
     _draft_chr,
@@ -58,8 +73,9 @@ from .security import (
     allowed_hosts,
     cors_origins,
 )
-from .auth import authenticate_user, get_current_user, User, get_password_hash
-from .audit_events import append_audit_event
+from .auth import authenticate_user, get_current_user, invalidate_user_cache, User, get_password_hash
+from .audit_events import append_audit_event, start_audit_flusher, stop_audit_flusher
+from .llm_gateway import start_phi_egress_flusher, stop_phi_egress_flusher
 from .authz import (
     require_permission,
     mark_step_up_verified,
@@ -78,6 +94,10 @@ TEMPLATES_DIR = BASE_DIR.parent.parent / "frontend" / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 settings = get_settings()
+# Compiled templates persist in a per-user temp dir across restarts, and only
+# dev re-stats template files on every render.
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+templates.env.auto_reload = settings.app_env == "dev"
 docs_enabled = settings.api_docs_enabled and settings.app_env != "prod" and not settings.hipaa_mode
 app = FastAPI(
     title="MedCHR API",
@@ -264,121 +284,26 @@ app.include_router(api_router, prefix="/api/v1", include_in_schema=False)
 app.mount("/static", StaticFiles(directory=str(BASE_DIR.parent.parent / "frontend" / "static")), name="static")
 
 
-@app.middleware("http")
-async def db_context_middleware(request: Request, call_next):
-    clear_tenant_context()
-    try:
-        return await call_next(request)
-    finally:
-        clear_tenant_context()
-
-
-@app.middleware("http")
-async def request_id_middleware(request: Request, call_next):
-    request_id = request.headers.get("x-request-id") or str(uuid4())
-    request.state.request_id = request_id
-    response = await call_next(request)
-    return response
-
-
+# Pure ASGI middleware; add_middleware wraps outward, so the first one added
+# runs innermost (DbContextMiddleware) and MetricsMiddleware runs outermost.
+app.add_middleware(DbContextMiddleware)
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(SessionTimeoutMiddleware, auto_login=settings.app_env == "dev")
+app.add_middleware(
+    SecurityHeadersMiddleware,
+    referrer_policy=settings.referrer_policy,
+    hsts=settings.app_env == "prod" or settings.hipaa_mode,
+)
+app.add_middleware(MetricsMiddleware)
 
 
-@app.middleware("http")
-async def session_timeout_middleware(request: Request, call_next):
-    """
-    Session management middleware. Auto-authenticates in non-prod environments.
-    """
-    import time
-    
-    # Session timeout policy applies to UI surface only.
-    if not request.url.path.startswith("/ui"):
-        return await call_next(request)
-    
-    session = request.session
-    current_time = int(time.time())
-    
-    # Auto-login: inject admin user_id if no session exists (dev only)
-    if settings.app_env == "dev" and not session.get("user_id"):
+def _warm_templates() -> None:
+    """Compile every UI template at startup instead of on its first request."""
+    for name in templates.env.list_templates(extensions=["html"]):
         try:
-            with get_conn() as conn:
-                row = conn.execute(
-                    "SELECT id FROM users WHERE role = 'admin' LIMIT 1"
-                ).fetchone()
-                if row:
-                    session["user_id"] = str(row["id"])
+            templates.env.get_template(name)
         except Exception:
-            pass
-    
-    # Update last activity timestamp
-    session["_last_activity"] = current_time
-    
-    response = await call_next(request)
-    return response
-
-
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    csp_nonce = secrets.token_urlsafe(16)
-    request.state.csp_nonce = csp_nonce
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["Referrer-Policy"] = settings.referrer_policy
-    response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-    response.headers["Cache-Control"] = "no-store"
-
-    # Swagger/ReDoc pages use inline scripts and CDN CSS that the strict
-    # nonce-based CSP blocks.  Use a relaxed policy for the docs paths only.
-    _docs_paths = ("/docs", "/redoc", "/openapi.json")
-    if request.url.path in _docs_paths:
-        csp = (
-            "default-src 'self'; "
-            "img-src 'self' data: https://fastapi.tiangolo.com; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "connect-src 'self'; "
-            "object-src 'none'; "
-            "frame-ancestors 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'"
-        )
-    else:
-        csp = (
-            "default-src 'self'; "
-            "img-src 'self' data:; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            f"script-src 'self' 'nonce-{csp_nonce}' https://cdn.jsdelivr.net; "
-            "connect-src 'self'; "
-            "object-src 'none'; "
-            "frame-ancestors 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'"
-        )
-
-    response.headers["Content-Security-Policy"] = csp
-    if settings.app_env == "prod" or settings.hipaa_mode:
-        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
-    return response
-
-
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    import time
-
-    start = time.perf_counter()
-    response = await call_next(request)
-    duration = time.perf_counter() - start
-    path = request.url.path
-    if path.startswith("/ui/patients/"):
-        path = "/ui/patients/:id"
-    elif path.startswith("/patients/"):
-        path = "/patients/:id"
-    elif path.startswith("/documents/"):
-        path = "/documents/:id"
-    record_request(request.method, path, response.status_code, duration)
-    return response
+            logger.exception("Failed to precompile template %s", name)
 
 
 @app.on_event("startup")
@@ -400,11 +325,30 @@ def startup() -> None:
             )
         else:
             raise
+    _warm_templates()
+
+
+@app.on_event("startup")
+async def start_background_writers() -> None:
+    loop = asyncio.get_running_loop()
+    # Served with --loop uvloop --http httptools; log the loop so a fallback
+    # to the default asyncio loop is visible in deployments.
+    logger.info("Event loop: %s.%s", type(loop).__module__, type(loop).__name__)
+    # asyncio.to_thread() runs on the default executor; size it for uploads
+    # and extractions that block on storage and OCR.
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.blocking_io_workers, thread_name_prefix="blocking-io")
+    )
+    start_audit_flusher()
+    start_phi_egress_flusher()
 
 
 @app.on_event("shutdown")
-def shutdown() -> None:
+async def shutdown() -> None:
+    await stop_audit_flusher()
+    await stop_phi_egress_flusher()
     close_pool()
+    await close_async_pool()
 
 
 @limiter.exempt
@@ -477,22 +421,22 @@ def _require_ui_user(request: Request) -> User | None:
     return None
 
 
-def _sso_enabled() -> bool:
-    return bool(settings.oidc_enabled or settings.azure_ad_enabled or settings.google_workspace_enabled)
-
-
-def _default_sso_provider() -> str:
-    if settings.oidc_enabled:
-        return "oidc"
-    if settings.azure_ad_enabled:
-        return "azure"
-    if settings.google_workspace_enabled:
-        return "google"
-    return "oidc"
+# Settings are fixed for the life of the process; resolve these flags once
+# instead of on every SSO and step-up check.
+_SSO_ENABLED = bool(settings.oidc_enabled or settings.azure_ad_enabled or settings.google_workspace_enabled)
+if settings.oidc_enabled:
+    _DEFAULT_SSO_PROVIDER = "oidc"
+elif settings.azure_ad_enabled:
+    _DEFAULT_SSO_PROVIDER = "azure"
+elif settings.google_workspace_enabled:
+    _DEFAULT_SSO_PROVIDER = "google"
+else:
+    _DEFAULT_SSO_PROVIDER = "oidc"
+_HIPAA_STRICT = settings.app_env == "prod" or settings.hipaa_mode
 
 
 def _require_step_up_for_sensitive_action(request: Request, user: User, next_path: str):
-    if settings.app_env != "prod" and not settings.hipaa_mode:
+    if not _HIPAA_STRICT:
         return None
     if not user.mfa_enabled:
         return RedirectResponse("/ui/profile/mfa", status_code=303)
@@ -506,7 +450,7 @@ def _render_template(request: Request, template: str, context: dict, status_code
     payload = dict(context)
     payload["request"] = request
     payload["csrf_token"] = get_csrf_token(request)
-    payload["csp_nonce"] = getattr(request.state, "csp_nonce", "")
+    payload["csp_nonce"] = csp_nonce(request)
     # Ensure sidebar always has user and dev_mode context
     if "dev_mode" not in payload:
         payload["dev_mode"] = request.session.get("dev_mode", False)
@@ -569,6 +513,7 @@ def mfa_verify(
 
     if verify_totp(user["mfa_secret"], code):
         clear_mfa_failures(str(user["id"]), "login")
+        invalidate_user_cache(str(user["id"]))
         request.session.clear()
         renew_session(request)
         request.session["user_id"] = str(user["id"])
@@ -599,6 +544,16 @@ def mfa_verify(
     return _render_template(request, "mfa_challenge.html", {"error": "Invalid code", "email": user["email"]}, status_code=401)
 
 
+def _mfa_qr_b64(uri: str) -> str:
+    """Render the TOTP provisioning URI as a base64 PNG (never cached: the URI holds the secret)."""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=5)
+    qr.add_data(uri)
+    qr.make(fit=True)
+    buf = io.BytesIO()
+    qr.make_image().save(buf)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
 @app.get("/ui/profile/mfa", response_class=HTMLResponse, include_in_schema=False)
 def mfa_setup_page(request: Request):
     user = _require_ui_user(request)
@@ -610,16 +565,8 @@ def mfa_setup_page(request: Request):
     secret = generate_totp_secret()
     uri = get_totp_uri(user.email, secret)
     
-    # Generate QR code as base64
-    import qrcode
-    import io
-    import base64
-    
-    img = qrcode.make(uri)
-    buf = io.BytesIO()
-    img.save(buf)
-    img_b64 = base64.b64encode(buf.getvalue()).decode()
-    
+    img_b64 = _mfa_qr_b64(uri)
+
     # Store secret server-side; only keep token id in the cookie session.
     token_id = create_mfa_setup_token(str(user.id), str(user.tenant_id), secret, ttl_minutes=10)
     request.session["mfa_setup_token_id"] = token_id
@@ -664,21 +611,16 @@ def mfa_enable(
             )
             _log_action(conn, None, "auth.mfa_enabled", user.email, {"ip": request.client.host}, tenant_id=str(user.tenant_id))
             conn.commit()
+        invalidate_user_cache(str(user.id))
         consume_mfa_setup_token(token_id, str(user.id))
         request.session.pop("mfa_setup_token_id", None)
         return RedirectResponse("/ui", status_code=303)
 
     # Re-render setup page with the same secret/QR for retries.
     from .auth import get_totp_uri
-    import qrcode
-    import io
-    import base64
 
     uri = get_totp_uri(user.email, secret)
-    img = qrcode.make(uri)
-    buf = io.BytesIO()
-    img.save(buf)
-    img_b64 = base64.b64encode(buf.getvalue()).decode()
+    img_b64 = _mfa_qr_b64(uri)
 
     return _render_template(
         request,
@@ -695,7 +637,7 @@ def login_page(request: Request):
         return RedirectResponse("/ui", status_code=303)
     return templates.TemplateResponse(
         "login.html",
-        {"request": request, "csrf_token": get_csrf_token(request), "csp_nonce": getattr(request.state, "csp_nonce", "")},
+        {"request": request, "csrf_token": get_csrf_token(request), "csp_nonce": csp_nonce(request)},
     )
 
 
@@ -716,6 +658,9 @@ def login_submit(request: Request, email: str = Form(...), password: str = Form(
 
 @app.get("/ui/logout", include_in_schema=False)
 def logout(request: Request):
+    user_id = request.session.get("user_id")
+    if user_id:
+        invalidate_user_cache(user_id)
     request.session.clear()
     return RedirectResponse("/ui/login", status_code=303)
 
@@ -747,9 +692,12 @@ def step_up_verify(
     if not user:
         return RedirectResponse("/ui/login", status_code=303)
     validate_csrf_token(request, csrf_token)
-    if not user.mfa_secret:
+    from .auth import verify_totp, get_user_by_id
+    # The session user is cached without credentials; read the TOTP secret here.
+    with get_conn() as conn:
+        mfa_secret = (get_user_by_id(str(user.id), conn) or {}).get("mfa_secret")
+    if not mfa_secret:
         return RedirectResponse("/ui/profile/mfa", status_code=303)
-    from .auth import verify_totp
     from .mfa import (
         clear_mfa_failures,
         consume_mfa_lockout_expiry,
@@ -783,7 +731,7 @@ def step_up_verify(
             },
             status_code=429,
         )
-    if verify_totp(user.mfa_secret, code):
+    if verify_totp(mfa_secret, code):
         clear_mfa_failures(str(user.id), "step_up")
         mark_step_up_verified(request)
         with get_conn() as conn:
@@ -838,21 +786,21 @@ def step_up_verify(
 
 @app.get("/ui/sso/{provider}/login", include_in_schema=False)
 async def sso_login(request: Request, provider: str):
-    if not _sso_enabled():
+    if not _SSO_ENABLED:
         raise HTTPException(status_code=404, detail="SSO is not enabled")
     return await initiate_sso_login(request, provider=provider)
 
 
 @app.get("/ui/sso/login", include_in_schema=False)
 async def sso_login_default(request: Request):
-    if not _sso_enabled():
+    if not _SSO_ENABLED:
         raise HTTPException(status_code=404, detail="SSO is not enabled")
-    return await initiate_sso_login(request, provider=_default_sso_provider())
+    return await initiate_sso_login(request, provider=_DEFAULT_SSO_PROVIDER)
 
 
 @app.get("/auth/callback/{provider}", include_in_schema=False)
 async def sso_callback(request: Request, provider: str):
-    if not _sso_enabled():
+    if not _SSO_ENABLED:
         raise HTTPException(status_code=404, detail="SSO is not enabled")
     try:
         user_info = await handle_sso_callback(request, provider=provider)
@@ -897,39 +845,86 @@ def ui_patients(request: Request, page: int = Query(1, ge=1)):
     per_page = 25
 
     with get_conn() as conn:
-        # Total patient count and aggregate stats (for stats cards)
-        totals = conn.execute(
-            """
-            SELECT
-                COUNT(DISTINCT p.id) AS total_patients,
-                COUNT(d.id) AS total_docs
-            FROM patients p
-            LEFT JOIN documents d ON p.id = d.patient_id
-            WHERE p.tenant_id = %s
-            """,
-            (user.tenant_id,),
-        ).fetchone()
+        # Stats cards and the featured multimodal section do not depend on the
+        # page, so their three reads share one pipelined round-trip.
+        with conn.pipeline():
+            # Total patient count and aggregate stats (for stats cards)
+            totals_cur = conn.execute(
+                """
+                SELECT
+                    COUNT(DISTINCT p.id) AS total_patients,
+                    COUNT(d.id) AS total_docs
+                FROM patients p
+                LEFT JOIN documents d ON p.id = d.patient_id
+                WHERE p.tenant_id = %s
+                """,
+                (user.tenant_id,),
+            )
+
+            # Total reports count
+            report_count_cur = conn.execute(
+                """
+                SELECT COUNT(DISTINCT cv.patient_id) AS report_count
+                FROM chr_versions cv
+                JOIN patients p ON p.id = cv.patient_id
+                WHERE p.tenant_id = %s
+                """,
+                (user.tenant_id,),
+            )
+
+            # Multimodal patients (featured demo section) — always fetched in full
+            multimodal_cur = conn.execute(
+                """
+                SELECT
+                       p.id,
+                       p.full_name,
+                       COUNT(d.id) AS doc_count,
+                       COUNT(*) FILTER (
+                         WHERE POSITION('pdf' IN COALESCE(lower(d.content_type), '')) > 0
+                            OR RIGHT(lower(COALESCE(d.filename, '')), 4) = '.pdf'
+                       ) AS pdf_count,
+                       COUNT(*) FILTER (
+                         WHERE LEFT(COALESCE(lower(d.content_type), ''), 6) = 'image/'
+                            OR lower(COALESCE(d.filename, '')) ~ '\\.(png|jpg|jpeg|gif|bmp|webp|tif|tiff)$'
+                       ) AS image_count,
+                       COUNT(*) FILTER (
+                         WHERE LEFT(COALESCE(lower(d.content_type), ''), 5) = 'text/'
+                            OR lower(COALESCE(d.filename, '')) ~ '\\.(txt|md|rtf|csv|tsv|json|xml)$'
+                       ) AS text_count
+                FROM patients p
+                LEFT JOIN documents d ON p.id = d.patient_id
+                WHERE p.tenant_id = %s
+                GROUP BY p.id, p.full_name
+                HAVING
+                       COUNT(*) FILTER (
+                         WHERE POSITION('pdf' IN COALESCE(lower(d.content_type), '')) > 0
+                            OR RIGHT(lower(COALESCE(d.filename, '')), 4) = '.pdf'
+                       ) > 0
+                       AND COUNT(*) FILTER (
+                         WHERE LEFT(COALESCE(lower(d.content_type), ''), 6) = 'image/'
+                            OR lower(COALESCE(d.filename, '')) ~ '\\.(png|jpg|jpeg|gif|bmp|webp|tif|tiff)$'
+                       ) > 0
+                       AND COUNT(*) FILTER (
+                         WHERE LEFT(COALESCE(lower(d.content_type), ''), 5) = 'text/'
+                            OR lower(COALESCE(d.filename, '')) ~ '\\.(txt|md|rtf|csv|tsv|json|xml)$'
+                       ) > 0
+                ORDER BY doc_count DESC
+                """,
+                (user.tenant_id,),
+            )
+            totals = totals_cur.fetchone()
+            report_count_row = report_count_cur.fetchone()
+            multimodal_rows = multimodal_cur.fetchall()
         total_patients = int(totals["total_patients"] or 0)
         total_docs = int(totals["total_docs"] or 0)
         total_pages = max(1, math.ceil(total_patients / per_page))
+        report_count = int(report_count_row["report_count"] or 0)
 
         # Clamp page to valid range
         if page > total_pages:
             page = total_pages
         offset = (page - 1) * per_page
 
-        # Total reports count
-        report_count_row = conn.execute(
-            """
-            SELECT COUNT(DISTINCT cv.patient_id) AS report_count
-            FROM chr_versions cv
-            JOIN patients p ON p.id = cv.patient_id
-            WHERE p.tenant_id = %s
-            """,
-            (user.tenant_id,),
-        ).fetchone()
-        report_count = int(report_count_row["report_count"] or 0)
-
         # Paginated patient rows (same query + LIMIT/OFFSET)
         rows = conn.execute(
             """
@@ -980,46 +975,19 @@ def ui_patients(request: Request, page: int = Query(1, ge=1)):
             (user.tenant_id, per_page, offset),
         ).fetchall()
 
-        # Multimodal patients (featured demo section) — always fetched in full
-        multimodal_rows = conn.execute(
+        # Latest report status for every patient on the page in one query
+        # instead of one lookup per row.
+        status_rows = conn.execute(
             """
-            SELECT
-                   p.id,
-                   p.full_name,
-                   COUNT(d.id) AS doc_count,
-                   COUNT(*) FILTER (
-                     WHERE POSITION('pdf' IN COALESCE(lower(d.content_type), '')) > 0
-                        OR RIGHT(lower(COALESCE(d.filename, '')), 4) = '.pdf'
-                   ) AS pdf_count,
-                   COUNT(*) FILTER (
-                     WHERE LEFT(COALESCE(lower(d.content_type), ''), 6) = 'image/'
-                        OR lower(COALESCE(d.filename, '')) ~ '\\.(png|jpg|jpeg|gif|bmp|webp|tif|tiff)$'
-                   ) AS image_count,
-                   COUNT(*) FILTER (
-                     WHERE LEFT(COALESCE(lower(d.content_type), ''), 5) = 'text/'
-                        OR lower(COALESCE(d.filename, '')) ~ '\\.(txt|md|rtf|csv|tsv|json|xml)$'
-                   ) AS text_count
-            FROM patients p
-            LEFT JOIN documents d ON p.id = d.patient_id
-            WHERE p.tenant_id = %s
-            GROUP BY p.id, p.full_name
-            HAVING
-                   COUNT(*) FILTER (
-                     WHERE POSITION('pdf' IN COALESCE(lower(d.content_type), '')) > 0
-                        OR RIGHT(lower(COALESCE(d.filename, '')), 4) = '.pdf'
-                   ) > 0
-                   AND COUNT(*) FILTER (
-                     WHERE LEFT(COALESCE(lower(d.content_type), ''), 6) = 'image/'
-                        OR lower(COALESCE(d.filename, '')) ~ '\\.(png|jpg|jpeg|gif|bmp|webp|tif|tiff)$'
-                   ) > 0
-                   AND COUNT(*) FILTER (
-                     WHERE LEFT(COALESCE(lower(d.content_type), ''), 5) = 'text/'
-                        OR lower(COALESCE(d.filename, '')) ~ '\\.(txt|md|rtf|csv|tsv|json|xml)$'
-                   ) > 0
-            ORDER BY doc_count DESC
+            SELECT DISTINCT ON (patient_id) patient_id, status
+            FROM chr_versions
+            WHERE patient_id = ANY(%s)
+            ORDER BY patient_id, created_at DESC
             """,
-            (user.tenant_id,),
+            ([r["id"] for r in rows],),
         ).fetchall()
+        latest_status = {str(sr["patient_id"]): sr["status"] for sr in status_rows}
+
         multimodal_patients = [
             {
                 "id": str(mr["id"]),
@@ -1032,28 +1000,24 @@ def ui_patients(request: Request, page: int = Query(1, ge=1)):
             for mr in multimodal_rows
         ]
 
-        # Get report status and data profiles for the current page
-        report_statuses = {}
-        doc_counts = {}
-        data_profiles = {}
-        for r in rows:
-            pid = str(r["id"])
-            pdf_count = int(r.get("pdf_count") or 0)
-            image_count = int(r.get("image_count") or 0)
-            text_count = int(r.get("text_count") or 0)
-            has_all_data_types = pdf_count > 0 and image_count > 0 and text_count > 0
-            data_profiles[pid] = {
-                "pdf": pdf_count,
-                "image": image_count,
-                "text": text_count,
-                "has_all": has_all_data_types,
-            }
-            draft = conn.execute(
-                "SELECT status FROM chr_versions WHERE patient_id = %s ORDER BY created_at DESC LIMIT 1",
-                (pid,)
-            ).fetchone()
-            report_statuses[pid] = draft["status"] if draft else None
-            doc_counts[pid] = int(r["doc_count"] or 0)
+    # Get report status and data profiles for the current page
+    report_statuses = {}
+    doc_counts = {}
+    data_profiles = {}
+    for r in rows:
+        pid = str(r["id"])
+        pdf_count = int(r.get("pdf_count") or 0)
+        image_count = int(r.get("image_count") or 0)
+        text_count = int(r.get("text_count") or 0)
+        has_all_data_types = pdf_count > 0 and image_count > 0 and text_count > 0
+        data_profiles[pid] = {
+            "pdf": pdf_count,
+            "image": image_count,
+            "text": text_count,
+            "has_all": has_all_data_types,
+        }
+        report_statuses[pid] = latest_status.get(pid)
+        doc_counts[pid] = int(r["doc_count"] or 0)
 
     patients = [_row_to_patient(r) for r in rows]
     dev_mode = request.session.get("dev_mode", False)
@@ -1260,35 +1224,6 @@ def ui_create_patient(
     return RedirectResponse("/ui", status_code=303)
 
 
-@app.get("/ui/embeddings", response_class=HTMLResponse, include_in_schema=False)
-def ui_embeddings(request: Request):
-    user = _require_ui_user(request)
-    if not user:
-        return RedirectResponse("/ui/login", status_code=303)
-
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT p.full_name, d.filename, COUNT(e.id) AS chunk_count, MAX(e.created_at) AS created_at
-            FROM documents d
-            JOIN patients p ON p.id = d.patient_id
-            LEFT JOIN embeddings e ON e.document_id = d.id
-            WHERE p.tenant_id = %s
-            GROUP BY p.full_name, d.filename
-            ORDER BY created_at DESC NULLS LAST
-            LIMIT 100
-            """,
-            (user.tenant_id,)
-        ).fetchall()
-
-    dev_mode = request.session.get("dev_mode", False)
-    return _render_template(
-        request,
-        "embeddings.html",
-        {"rows": rows, "user": user, "dev_mode": dev_mode},
-    )
-
-
 def _get_patient(patient_id: str, tenant_id: str | None = None):
     with get_conn() as conn:
         query = "SELECT id, full_name, dob, notes FROM patients WHERE id = %s"
@@ -1296,15 +1231,16 @@ def _get_patient(patient_id: str, tenant_id: str | None = None):
         if tenant_id:
             query += " AND tenant_id = %s"
             params.append(tenant_id)
-        return conn.execute(query, tuple(params)).fetchone()
+        return conn.execute(query, tuple(params), prepare=True).fetchone()
 
 
 def _list_documents(patient_id: str, tenant_id: str | None = None):
+    # Report pages only list filenames and types; storage paths stay server-side.
     with get_conn() as conn:
         if tenant_id:
             return conn.execute(
                 """
-                SELECT d.id, d.patient_id, d.filename, d.content_type, d.storage_path
+                SELECT d.id, d.filename, d.content_type
                 FROM documents d
                 JOIN patients p ON p.id = d.patient_id
                 WHERE d.patient_id = %s
@@ -1312,16 +1248,18 @@ def _list_documents(patient_id: str, tenant_id: str | None = None):
                 ORDER BY d.created_at DESC
                 """,
                 (patient_id, tenant_id),
+                prepare=True,
             ).fetchall()
         else:
             return conn.execute(
                 """
-                SELECT d.id, d.patient_id, d.filename, d.content_type, d.storage_path
+                SELECT d.id, d.filename, d.content_type
                 FROM documents d
                 WHERE d.patient_id = %s
                 ORDER BY d.created_at DESC
                 """,
                 (patient_id,),
+                prepare=True,
             ).fetchall()
 
 
@@ -1336,23 +1274,10 @@ def _latest_draft(patient_id: str):
             LIMIT 1
             """,
             (patient_id,),
+            prepare=True,
         ).fetchone()
 
 
-def _audit_logs(patient_id: str):
-    with get_conn() as conn:
-        return conn.execute(
-            """
-            SELECT actor, action, details, created_at
-            FROM audit_logs
-            WHERE patient_id = %s
-            ORDER BY created_at DESC
-            LIMIT 50
-            """,
-            (patient_id,),
-        ).fetchall()
-
-
 def _latest_extraction(patient_id: str, tenant_id: str | None = None):
     with get_conn() as conn:
         if tenant_id:
@@ -1392,136 +1317,274 @@ def _draft_payload(draft_row) -> dict:
     return {}
 
 
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+
+
+def _link_citations(text: str, anchor_prefix: str = "cite") -> str:
+    """Convert [#] references to clickable anchor links."""
+    return _CITATION_RE.sub(
+        rf'<a href="#{anchor_prefix}-\1" class="citation-link" title="View source">[\1]</a>', text
+    )
+
+
+@lru_cache(maxsize=256)
+def _render_report_markdown(text: str, anchor_prefix: str = "cite") -> str:
+    """
+    Sanitized HTML for report markdown with linked citations. Drafts change
+    rarely between page views, so repeat renders are a cache lookup instead of
+    a markdown parse and bleach pass.
+    """
+    return render_markdown(_link_citations(text, anchor_prefix))
+
+
+_LAB_FLAG_LABELS = {"H": "High", "HIGH": "High", "L": "Low", "LOW": "Low"}
+# Exact spellings extractors emit ("H", "high", "Normal", ...), resolved without
+# building an upper-cased copy; anything else falls back to _LAB_FLAG_LABELS.
+_LAB_FLAG_SPELLINGS = {
+    spelling: label
+    for flag, label in {**_LAB_FLAG_LABELS, "N": "Normal", "NORMAL": "Normal"}.items()
+    for spelling in (flag, flag.lower(), flag.capitalize())
+}
+_ABNORMAL_FLAG_LABELS = frozenset(("High", "Low"))
+
+
 def _normalize_labs(structured: dict | None) -> list[dict]:
     if not structured:
         return []
-    labs = structured.get("labs") or structured.get("biomarkers") or []
-    normalized = []
-    for lab in labs:
-        if not isinstance(lab, dict):
-            continue
-        flag = (lab.get("flag") or "").strip()
-        flag_upper = flag.upper()
-        if flag_upper in {"H", "HIGH"}:
-            flag_label = "High"
-        elif flag_upper in {"L", "LOW"}:
-            flag_label = "Low"
-        else:
-            flag_label = "Normal" if flag else ""
-        normalized.append(
-            {
-                "panel": lab.get("panel"),
-                "test": lab.get("test") or lab.get("test_name") or lab.get("name"),
-                "value": lab.get("value"),
-                "unit": lab.get("unit"),
-                "range": lab.get("range"),
-                "flag": flag_label,
-                "abnormal": flag_label in {"High", "Low"},
-            }
-        )
-    return normalized
+    labs = structured.get("labs") or structured.get("biomarkers")
+    if not labs:
+        return []
+    # Extracted labs may omit any key (and name the test three ways), so the
+    # lookups stay .get(); the flag label is bound once per lab for "abnormal".
+    return [
+        {
+            "panel": lab.get("panel"),
+            "test": lab.get("test") or lab.get("test_name") or lab.get("name"),
+            "value": lab.get("value"),
+            "unit": lab.get("unit"),
+            "range": lab.get("range"),
+            "flag": (
+                flag_label := _LAB_FLAG_SPELLINGS.get(flag := (lab.get("flag") or "").strip())
+                or _LAB_FLAG_LABELS.get(flag.upper())
+                or ("Normal" if flag else "")
+            ),
+            "abnormal": flag_label in _ABNORMAL_FLAG_LABELS,
+        }
+        for lab in labs
+        if isinstance(lab, dict)
+    ]
 
 
 def _key_findings(labs: list[dict]) -> list[str]:
-    findings = []
-    for lab in labs:
-        if not lab.get("abnormal"):
-            continue
-        test = lab.get("test") or lab.get("test_name") or lab.get("name") or lab.get("panel") or "Unlabeled Test"
-        value = lab.get("value") or ""
-        unit = lab.get("unit") or ""
-        flag = lab.get("flag") or ""
-        findings.append(f"{test}: {value} {unit} ({flag})")
-    return findings
+    if not labs:
+        return []
+    # Labs may come from saved report edits, so keep the tolerant lookups.
+    return [
+        f"{lab.get('test') or lab.get('test_name') or lab.get('name') or lab.get('panel') or 'Unlabeled Test'}: "
+        f"{lab.get('value') or ''} {lab.get('unit') or ''} ({lab.get('flag') or ''})"
+        for lab in labs
+        if lab.get("abnormal")
+    ]
 
 
-def _has_extractions(patient_id: str) -> bool:
-    """Check if patient has any extracted documents."""
+def _report_view(patient_id: str, tenant_id: str) -> dict:
+    """
+    Aggregated labs/meds/diagnoses, latest draft and document list shared by
+    the report page and the report query handler, read on one connection with
+    the draft and document reads pipelined. Report edits saved on the draft
+    override the extracted labs and diagnoses.
+    """
     with get_conn() as conn:
-        row = conn.execute(
+        structured, _sources = _aggregate_structured(patient_id, tenant_id=tenant_id, conn=conn)
+        with conn.pipeline():
+            draft_cur = conn.execute(
+                """
+                SELECT id, draft, status, created_at
+                FROM chr_versions
+                WHERE patient_id = %s
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                (patient_id,),
+                prepare=True,
+            )
+            documents_cur = conn.execute(
+                """
+                SELECT d.id, d.filename, d.content_type
+                FROM documents d
+                JOIN patients p ON p.id = d.patient_id
+                WHERE d.patient_id = %s
+                  AND p.tenant_id = %s
+                ORDER BY d.created_at DESC
+                """,
+                (patient_id, tenant_id),
+                prepare=True,
+            )
+            draft_row = draft_cur.fetchone()
+            documents = documents_cur.fetchall()
+
+    labs = _normalize_labs(structured)
+    meds = (structured.get("medications") or []) if structured else []
+    diagnoses = (structured.get("diagnoses") or []) if structured else []
+    report_edits = draft_row.get("report_edits") if draft_row else {}
+    edited_interpretation = report_edits.get("interpretation") if isinstance(report_edits, dict) else None
+    edited_by = report_edits.get("edited_by") if isinstance(report_edits, dict) else None
+    if isinstance(report_edits, dict):
+        if isinstance(report_edits.get("labs"), list):
+            labs = report_edits.get("labs") or labs
+        if isinstance(report_edits.get("diagnoses"), list):
+            diagnoses = report_edits.get("diagnoses") or diagnoses
+    draft_payload = _draft_payload(draft_row)
+    summary = draft_payload.get("summary", "")
+
+    # Convert markdown to HTML and make citations clickable
+    return {
+        "structured": structured,
+        "draft": draft_row,
+        "summary": summary,
+        "summary_html": _render_report_markdown(summary) if summary else "",
+        "edited_interpretation_html": (
+            _render_report_markdown(edited_interpretation) if edited_interpretation else ""
+        ),
+        "edited_by": edited_by,
+        "citations": draft_payload.get("citations", []),
+        "labs": labs,
+        "medications": meds,
+        "diagnoses": diagnoses,
+        "documents": documents,
+        "findings": _key_findings(labs),
+    }
+
+
+def _patient_detail_bundle(conn, patient_id: str, tenant_id: str) -> dict | None:
+    """
+    Patient row, documents, latest draft, audit trail and extraction flag for
+    the patient detail page, pipelined so the five reads cost one round-trip.
+    Returns None when the patient is not in ``tenant_id``.
+    """
+    with conn.pipeline():
+        patient_cur = conn.execute(
+            "SELECT id, full_name, dob, notes FROM patients WHERE id = %s AND tenant_id = %s",
+            (patient_id, tenant_id),
+        )
+        documents_cur = conn.execute(
             """
-            SELECT COUNT(*) as cnt
-            FROM extractions e
-            JOIN documents d ON d.id = e.document_id
+            SELECT d.id, d.patient_id, d.filename, d.content_type, d.storage_path
+            FROM documents d
+            JOIN patients p ON p.id = d.patient_id
             WHERE d.patient_id = %s
+              AND p.tenant_id = %s
+            ORDER BY d.created_at DESC
+            """,
+            (patient_id, tenant_id),
+        )
+        draft_cur = conn.execute(
+            """
+            SELECT id, draft, status, created_at
+            FROM chr_versions
+            WHERE patient_id = %s
+            ORDER BY created_at DESC
+            LIMIT 1
             """,
             (patient_id,),
-        ).fetchone()
-    return row and row["cnt"] > 0
+        )
+        logs_cur = conn.execute(
+            """
+            SELECT actor, action, details, created_at
+            FROM audit_logs
+            WHERE patient_id = %s
+            ORDER BY created_at DESC
+            LIMIT 50
+            """,
+            (patient_id,),
+        )
+        extractions_cur = conn.execute(
+            """
+            SELECT EXISTS (
+                SELECT 1
+                FROM extractions e
+                JOIN documents d ON d.id = e.document_id
+                WHERE d.patient_id = %s
+            ) AS has_extractions
+            """,
+            (patient_id,),
+        )
+        patient = patient_cur.fetchone()
+        if not patient:
+            return None
+        return {
+            "patient": patient,
+            "documents": documents_cur.fetchall(),
+            "draft": draft_cur.fetchone(),
+            "logs": logs_cur.fetchall(),
+            "has_extractions": extractions_cur.fetchone()["has_extractions"],
+        }
 
 
 @app.get("/ui/patients/{patient_id}", response_class=HTMLResponse, include_in_schema=False)
-def ui_patient_detail(request: Request, patient_id: str):
+def ui_patient_detail(request: Request, patient_id: str, background_tasks: BackgroundTasks):
     user = _require_ui_user(request)
     if not user:
         return RedirectResponse("/ui/login", status_code=303)
 
-    patient_row = _get_patient(patient_id, tenant_id=str(user.tenant_id))
-    if not patient_row:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    tenant_id = str(user.tenant_id)
+    # One connection for the whole page: the bundle reads, then the clinical
+    # record reads pipelined into a single round-trip.
+    with get_conn() as conn:
+        bundle = _patient_detail_bundle(conn, patient_id, tenant_id)
+        if not bundle:
+            raise HTTPException(status_code=404, detail="Patient not found")
 
-    documents = [_row_to_document(r) for r in _list_documents(patient_id, tenant_id=str(user.tenant_id))]
-    draft = _latest_draft(patient_id)
-    logs = _audit_logs(patient_id)
-    has_extractions = _has_extractions(patient_id)
-    dev_mode = request.session.get("dev_mode", False)
-    pending_jobs = (
-        list_jobs(patient_id=patient_id, tenant_id=str(user.tenant_id), statuses=["pending", "running"])
-        if settings.job_queue_enabled
-        else []
+        with conn.pipeline():
+            vitals_cur = conn.execute(
+                "SELECT type, value_1, value_2, unit, recorded_at FROM vitals WHERE patient_id = %s ORDER BY recorded_at DESC LIMIT 100",
+                (patient_id,),
+            )
+            lab_results_cur = conn.execute(
+                "SELECT test_name, value, unit, flag, reference_range, test_date, panel FROM lab_results WHERE patient_id = %s ORDER BY test_date DESC NULLS LAST LIMIT 200",
+                (patient_id,),
+            )
+            medications_cur = conn.execute(
+                "SELECT name, dosage, frequency, route, start_date, end_date, status FROM medications WHERE patient_id = %s ORDER BY status ASC, start_date DESC NULLS LAST",
+                (patient_id,),
+            )
+            diagnoses_cur = conn.execute(
+                "SELECT condition, code, status, date_onset FROM diagnoses WHERE patient_id = %s ORDER BY date_onset DESC NULLS LAST",
+                (patient_id,),
+            )
+            allergies_cur = conn.execute(
+                "SELECT substance, reaction, severity, status FROM allergies WHERE patient_id = %s ORDER BY created_at DESC",
+                (patient_id,),
+            )
+            immunizations_cur = conn.execute(
+                "SELECT vaccine_name, date_administered, status FROM immunizations WHERE patient_id = %s ORDER BY date_administered DESC NULLS LAST",
+                (patient_id,),
+            )
+            pending_jobs = (
+                list_jobs(patient_id=patient_id, tenant_id=tenant_id, statuses=["pending", "running"], conn=conn)
+                if settings.job_queue_enabled
+                else []
+            )
+            vitals = vitals_cur.fetchall()
+            lab_results = lab_results_cur.fetchall()
+            medications = medications_cur.fetchall()
+            diagnoses_list = diagnoses_cur.fetchall()
+            allergies = allergies_cur.fetchall()
+            immunizations = immunizations_cur.fetchall()
+
+    background_tasks.add_task(
+        _log_action_bg, patient_id, "patient.view", user.email, {"ip": request.client.host}, tenant_id=tenant_id
     )
 
-    # Fetch clinical records for past data display and visualizations
-    vitals = []
-    lab_results = []
-    medications = []
-    diagnoses_list = []
-    allergies = []
-    immunizations = []
+    patient_row = bundle["patient"]
+    documents = [_row_to_document(r) for r in bundle["documents"]]
+    draft = bundle["draft"]
+    logs = bundle["logs"]
+    has_extractions = bundle["has_extractions"]
+    dev_mode = request.session.get("dev_mode", False)
     chart_data = {}
     trend_summary = {}
 
-    with get_conn() as conn:
-        _log_action(conn, patient_id, "patient.view", user.email, {"ip": request.client.host}, tenant_id=str(user.tenant_id))
-
-        # Vitals
-        vitals = conn.execute(
-            "SELECT type, value_1, value_2, unit, recorded_at FROM vitals WHERE patient_id = %s ORDER BY recorded_at DESC LIMIT 100",
-            (patient_id,),
-        ).fetchall()
-
-        # Lab results
-        lab_results = conn.execute(
-            "SELECT test_name, value, unit, flag, reference_range, test_date, panel FROM lab_results WHERE patient_id = %s ORDER BY test_date DESC NULLS LAST LIMIT 200",
-            (patient_id,),
-        ).fetchall()
-
-        # Medications
-        medications = conn.execute(
-            "SELECT name, dosage, frequency, route, start_date, end_date, status FROM medications WHERE patient_id = %s ORDER BY status ASC, start_date DESC NULLS LAST",
-            (patient_id,),
-        ).fetchall()
-
-        # Diagnoses
-        diagnoses_list = conn.execute(
-            "SELECT condition, code, status, date_onset FROM diagnoses WHERE patient_id = %s ORDER BY date_onset DESC NULLS LAST",
-            (patient_id,),
-        ).fetchall()
-
-        # Allergies
-        allergies = conn.execute(
-            "SELECT substance, reaction, severity, status FROM allergies WHERE patient_id = %s ORDER BY created_at DESC",
-            (patient_id,),
-        ).fetchall()
-
-        # Immunizations
-        immunizations = conn.execute(
-            "SELECT vaccine_name, date_administered, status FROM immunizations WHERE patient_id = %s ORDER BY date_administered DESC NULLS LAST",
-            (patient_id,),
-        ).fetchall()
-
-        conn.commit()
-
     # Build chart data from lab results for visualization
     try:
         from .trends import analyze_patient_trends, generate_trend_chart_data
@@ -1599,7 +1662,7 @@ def ui_patient_detail(request: Request, patient_id: str):
 
 
 @app.get("/ui/patients/{patient_id}/report", response_class=HTMLResponse, include_in_schema=False)
-def ui_patient_report(request: Request, patient_id: str):
+def ui_patient_report(request: Request, patient_id: str, background_tasks: BackgroundTasks):
     user = _require_ui_user(request)
     if not user:
         return RedirectResponse("/ui/login", status_code=303)
@@ -1609,10 +1672,9 @@ def ui_patient_report(request: Request, patient_id: str):
         raise HTTPException(status_code=404, detail="Patient not found")
 
     tenant_id = str(user.tenant_id)
-    structured, _sources = _aggregate_structured(patient_id, tenant_id=tenant_id)
-    labs = _normalize_labs(structured)
-    meds = (structured.get("medications") or []) if structured else []
-    diagnoses = (structured.get("diagnoses") or []) if structured else []
+    report = _report_view(patient_id, tenant_id)
+    structured = report["structured"]
+    meds = report["medications"]
     allergies_raw = (structured.get("allergies") or []) if structured else []
     vitals_raw = (structured.get("vitals") or []) if structured else []
     extraction_quality = structured.get("extraction_quality") if structured else None
@@ -1689,39 +1751,6 @@ def ui_patient_report(request: Request, patient_id: str):
     if extraction_quality and isinstance(extraction_quality, dict):
         overall_confidence = extraction_quality.get("overall_confidence")
 
-    draft_row = _latest_draft(patient_id)
-    report_edits = draft_row.get("report_edits") if draft_row else {}
-    edited_interpretation = report_edits.get("interpretation") if isinstance(report_edits, dict) else None
-    edited_by = report_edits.get("edited_by") if isinstance(report_edits, dict) else None
-    if isinstance(report_edits, dict):
-        if isinstance(report_edits.get("labs"), list):
-            labs = report_edits.get("labs") or labs
-        if isinstance(report_edits.get("diagnoses"), list):
-            diagnoses = report_edits.get("diagnoses") or diagnoses
-    draft_payload = _draft_payload(draft_row)
-    summary = draft_payload.get("summary", "")
-    citations = draft_payload.get("citations", [])
-    
-    # Convert markdown to HTML and make citations clickable
-    def process_citations(text):
-        """Convert [#] references to clickable anchor links."""
-        def replace_citation(match):
-            num = match.group(1)
-            return f'<a href="#cite-{num}" class="citation-link" title="View source">[{num}]</a>'
-        return re.sub(r'\[(\d+)\]', replace_citation, text)
-    
-    if summary:
-        summary_html = render_markdown(process_citations(summary))
-    else:
-        summary_html = ""
-
-    edited_interpretation_html = (
-        render_markdown(process_citations(edited_interpretation)) if edited_interpretation else ""
-    )
-
-    documents = _list_documents(patient_id, tenant_id=tenant_id)
-    findings = _key_findings(labs)
-
     # Build patient social/lifestyle context
     patient_obj = _row_to_patient(patient_row)
     lifestyle = patient_obj.lifestyle or {}
@@ -1771,9 +1800,9 @@ def ui_patient_report(request: Request, patient_id: str):
         # Tables may not exist yet if migration hasn't run
         pass
 
-    with get_conn() as conn:
-        _log_action(conn, patient_id, "report.view", user.email, {"ip": request.client.host}, tenant_id=tenant_id)
-        conn.commit()
+    background_tasks.add_task(
+        _log_action_bg, patient_id, "report.view", user.email, {"ip": request.client.host}, tenant_id=tenant_id
+    )
 
     # Available specialty templates
     specialty_templates = list_templates()
@@ -1796,17 +1825,17 @@ def ui_patient_report(request: Request, patient_id: str):
         {
             "user": user.email if user else "System",
             "patient": patient_obj,
-            "draft": draft_row,
-            "summary": summary,
-            "summary_html": summary_html,
-            "citations": citations,
-            "labs": labs,
+            "draft": report["draft"],
+            "summary": report["summary"],
+            "summary_html": report["summary_html"],
+            "citations": report["citations"],
+            "labs": report["labs"],
             "medications": meds,
-            "diagnoses": diagnoses,
-            "documents": documents,
-            "findings": findings,
-            "edited_interpretation_html": edited_interpretation_html,
-            "edited_by": edited_by,
+            "diagnoses": report["diagnoses"],
+            "documents": report["documents"],
+            "findings": report["findings"],
+            "edited_interpretation_html": report["edited_interpretation_html"],
+            "edited_by": report["edited_by"],
             # Phase 1 additions
             "allergies": combined_allergies,
             "vitals": combined_vitals,
@@ -1863,7 +1892,7 @@ def ui_patient_report_pdf(request: Request, patient_id: str):
 
 
 @app.get("/ui/patients/{patient_id}/report/share", response_class=HTMLResponse, include_in_schema=False)
-def ui_patient_report_share(request: Request, patient_id: str):
+def ui_patient_report_share(request: Request, patient_id: str, background_tasks: BackgroundTasks):
     """Patient-friendly shareable report view with plain language."""
     user = _require_ui_user(request)
     if not user:
@@ -1897,9 +1926,14 @@ def ui_patient_report_share(request: Request, patient_id: str):
     documents = _list_documents(patient_id, tenant_id=str(user.tenant_id))
     findings = _key_findings(labs)
 
-    with get_conn() as conn:
-        _log_action(conn, patient_id, "report.share", user.email, {"ip": request.client.host}, tenant_id=str(user.tenant_id))
-        conn.commit()
+    background_tasks.add_task(
+        _log_action_bg,
+        patient_id,
+        "report.share",
+        user.email,
+        {"ip": request.client.host},
+        tenant_id=str(user.tenant_id),
+    )
 
     return _render_template(
         request,
@@ -2007,7 +2041,6 @@ def ui_download_document_raw(request: Request, patient_id: str, document_id: str
 
     try:
         data = download_bytes(settings.storage_bucket, doc["storage_path"])
-        from starlette.responses import Response
         return Response(
             content=data,
             media_type=doc["content_type"],
@@ -2023,6 +2056,7 @@ def ui_download_document_raw(request: Request, patient_id: str, document_id: str
 def ui_query_report(
     request: Request,
     patient_id: str,
+    background_tasks: BackgroundTasks,
     query: str = Form(""),
     csrf_token: str = Form(...),
 ):
@@ -2036,16 +2070,12 @@ def ui_query_report(
     if not patient_row:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    patient = _row_to_patient(patient_row)
-    draft_row = _latest_draft(patient_id)
-    report_edits = draft_row.get("report_edits") if draft_row else {}
-    edited_interpretation = report_edits.get("interpretation") if isinstance(report_edits, dict) else None
-    edited_by = report_edits.get("edited_by") if isinstance(report_edits, dict) else None
-    
     # Handle empty query - redirect back to report
     if not query or not query.strip():
         return RedirectResponse(f"/ui/patients/{patient_id}/report", status_code=303)
-    
+
+    patient = _row_to_patient(patient_row)
+
     # Retrieve relevant chunks using RAG
     try:
         context_chunks = retrieve_top_chunks(patient_id, query.strip(), top_k=5)
@@ -2066,76 +2096,37 @@ def ui_query_report(
             "query": query,
         }
     
-    def process_citations(text):
-        """Convert [#] references to clickable anchor links."""
-        def replace_citation(match):
-            num = match.group(1)
-            return f'<a href="#cite-{num}" class="citation-link" title="View source">[{num}]</a>'
-        return re.sub(r'\[(\d+)\]', replace_citation, text)
-
-    # Process citations to make them clickable
-    def process_query_citations(text):
-        def replace_citation(match):
-            num = match.group(1)
-            return f'<a href="#query-cite-{num}" class="citation-link" title="View source">[{num}]</a>'
-        return re.sub(r'\[(\d+)\]', replace_citation, text)
-    
-    answer_html = render_markdown(process_query_citations(result["answer"]))
+    answer_html = render_markdown(_link_citations(result["answer"], "query-cite"))
     
     # Render the same report page with query results
-    structured, _sources = _aggregate_structured(patient_id, tenant_id=str(user.tenant_id))
-    labs = _normalize_labs(structured)
-    meds = (structured.get("medications") or []) if structured else []
-    diagnoses = (structured.get("diagnoses") or []) if structured else []
-    if isinstance(report_edits, dict):
-        if isinstance(report_edits.get("labs"), list):
-            labs = report_edits.get("labs") or labs
-        if isinstance(report_edits.get("diagnoses"), list):
-            diagnoses = report_edits.get("diagnoses") or diagnoses
-    draft_payload = _draft_payload(draft_row)
-    summary = draft_payload.get("summary", "")
-    citations = draft_payload.get("citations", [])
-    
-    if summary:
-        summary_html = render_markdown(process_citations(summary))
-    else:
-        summary_html = ""
-
-    edited_interpretation_html = (
-        render_markdown(process_citations(edited_interpretation)) if edited_interpretation else ""
+    report = _report_view(patient_id, str(user.tenant_id))
+
+    background_tasks.add_task(
+        _log_action_bg,
+        patient_id,
+        "report.query",
+        user.email,
+        {"query": query.strip()[:120], "ip": request.client.host},
+        tenant_id=str(user.tenant_id),
     )
 
-    documents = _list_documents(patient_id, tenant_id=str(user.tenant_id))
-    findings = _key_findings(labs)
-
-    with get_conn() as conn:
-        _log_action(
-            conn,
-            patient_id,
-            "report.query",
-            user.email,
-            {"query": query.strip()[:120], "ip": request.client.host},
-            tenant_id=str(user.tenant_id),
-        )
-        conn.commit()
-
     return _render_template(
         request,
         "report.html",
         {
             "user": user,
             "patient": patient,
-            "draft": draft_row,
-            "summary": summary,
-            "summary_html": summary_html,
-            "edited_interpretation_html": edited_interpretation_html,
-            "edited_by": edited_by,
-            "citations": citations,
-            "labs": labs,
-            "medications": meds,
-            "diagnoses": diagnoses,
-            "documents": documents,
-            "findings": findings,
+            "draft": report["draft"],
+            "summary": report["summary"],
+            "summary_html": report["summary_html"],
+            "edited_interpretation_html": report["edited_interpretation_html"],
+            "edited_by": report["edited_by"],
+            "citations": report["citations"],
+            "labs": report["labs"],
+            "medications": report["medications"],
+            "diagnoses": report["diagnoses"],
+            "documents": report["documents"],
+            "findings": report["findings"],
             # Query results
             "query_result": {
                 "query": query,
@@ -2195,33 +2186,40 @@ async def ui_upload_document(
         return RedirectResponse("/ui/login", status_code=303)
     validate_csrf_token(request, csrf_token)
 
-    for upload in files:
-        if not upload.filename:
-            continue
-        # Upload document
-        doc = _upload_document(patient_id, upload, actor=user.email, tenant_id=str(user.tenant_id))
+    uploads = [upload for upload in files if upload.filename]
+    # Storage I/O and the batched document insert run off the event loop.
+    docs = await asyncio.to_thread(
+        _upload_documents, patient_id, uploads, actor=user.email, tenant_id=str(user.tenant_id)
+    )
 
+    job_specs: list[JobSpec] = []
+    for doc in docs:
         if settings.job_queue_enabled:
-            enqueue_job(
-                "extract",
-                {"document_id": doc.id, "actor": user.email, "tenant_id": str(user.tenant_id), "auto_embed": True},
-                tenant_id=str(user.tenant_id),
-                document_id=doc.id,
+            job_specs.append(
+                JobSpec(
+                    "extract",
+                    {"document_id": doc.id, "actor": user.email, "tenant_id": str(user.tenant_id), "auto_embed": True},
+                    tenant_id=str(user.tenant_id),
+                    document_id=doc.id,
+                )
             )
         else:
             # Auto-process: Extract text from document
             try:
-                _extract_document(doc.id, actor=user.email, tenant_id=str(user.tenant_id))
+                await asyncio.to_thread(_extract_document, doc.id, actor=user.email, tenant_id=str(user.tenant_id))
                 # Auto-process: Generate embeddings after extraction
                 try:
-                    _embed_document(doc.id, actor=user.email, tenant_id=str(user.tenant_id))
+                    await asyncio.to_thread(_embed_document, doc.id, actor=user.email, tenant_id=str(user.tenant_id))
                 except Exception:
                     # Embedding may fail if extraction didn't produce text
                     pass
             except Exception:
                 # Extraction may fail for some document types
                 pass
-            
+
+    # Queue extraction for every uploaded file in one batch.
+    if job_specs:
+        await asyncio.to_thread(enqueue_jobs, job_specs)
     return RedirectResponse(f"/ui/patients/{patient_id}", status_code=303)
 
 
@@ -2240,12 +2238,13 @@ def ui_extract_document(
     if settings.job_queue_enabled:
         enqueue_job(
             "extract",
-            {"document_id": document_id, "actor": user.email, "tenant_id": str(user.tenant_id)},
+            {"document_id": document_id, "actor": user.email, "tenant_id": str(user.tenant_id), "refresh": True},
             tenant_id=str(user.tenant_id),
             document_id=document_id,
         )
     else:
-        _extract_document(document_id, actor=user.email, tenant_id=str(user.tenant_id))
+        # The button re-runs extraction, so it never reuses a cached result.
+        _extract_document(document_id, actor=user.email, tenant_id=str(user.tenant_id), refresh=True)
     return RedirectResponse(f"/ui/patients/{patient_id}", status_code=303)
 
 
@@ -2355,14 +2354,13 @@ def ui_save_report_edits(
     if not _get_patient(patient_id, tenant_id=str(user.tenant_id)):
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    import json
     try:
-        labs_data = json.loads(labs) if labs else []
-    except json.JSONDecodeError:
+        labs_data = orjson.loads(labs) if labs else []
+    except orjson.JSONDecodeError:
         labs_data = []
     try:
-        diagnoses_data = json.loads(diagnoses) if diagnoses else []
-    except json.JSONDecodeError:
+        diagnoses_data = orjson.loads(diagnoses) if diagnoses else []
+    except orjson.JSONDecodeError:
         diagnoses_data = []
 
     edits = {
@@ -2376,19 +2374,17 @@ def ui_save_report_edits(
         # Update the latest chr_version with edits
         conn.execute(
             """
-            WITH latest AS (
+            UPDATE chr_versions
+            SET report_edits = %s
+            WHERE id = (
                 SELECT id
                 FROM chr_versions
                 WHERE patient_id = %s
                 ORDER BY created_at DESC
                 LIMIT 1
             )
-            UPDATE chr_versions
-            SET report_edits = %s
-            FROM latest
-            WHERE chr_versions.id = latest.id
             """,
-            (patient_id, Json(edits)),
+            (Json(edits), patient_id),
         )
         _log_action(conn, patient_id, "report.edited", user.email, {"fields_edited": list(edits.keys())}, tenant_id=str(user.tenant_id))
         conn.commit()
@@ -2417,7 +2413,9 @@ def ui_finalize_report(request: Request, patient_id: str, csrf_token: str = Form
     with get_conn() as conn:
         conn.execute(
             """
-            WITH latest AS (
+            UPDATE chr_versions
+            SET status = 'finalized', finalized_at = NOW()
+            WHERE id = (
                 SELECT id
                 FROM chr_versions
                 WHERE patient_id = %s
@@ -2425,10 +2423,6 @@ def ui_finalize_report(request: Request, patient_id: str, csrf_token: str = Form
                 ORDER BY created_at DESC
                 LIMIT 1
             )
-            UPDATE chr_versions
-            SET status = 'finalized', finalized_at = NOW()
-            FROM latest
-            WHERE chr_versions.id = latest.id
             """,
             (patient_id,),
         )
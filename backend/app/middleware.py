@@ -1,79 +1,312 @@
 """
 Middleware for MedCHR.ai FastAPI application.
-Handles security headers, CSRF protection, and other HTTP middleware.
+Handles request context, UI session policy, security headers, metrics and CSRF.
+
+All middleware here is pure ASGI: headers are added by wrapping ``send``
+instead of going through BaseHTTPMiddleware, which runs every hop in its
+own task and rebuilds Request/Response objects.
 """
 
-import secrets
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Adds security headers to all responses."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-        response.headers["Cache-Control"] = "no-store"
-        
-        # Content Security Policy
-        csp_nonce = secrets.token_urlsafe(16)
-        request.state.csp_nonce = csp_nonce
-
-        # Swagger/ReDoc use inline scripts and CDN CSS — relax CSP for docs paths.
-        _docs_paths = ("/docs", "/redoc", "/openapi.json")
-        if request.url.path in _docs_paths:
-            csp = (
-                "default-src 'self'; "
-                "img-src 'self' data: https://fastapi.tiangolo.com; "
-                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net; "
-                "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "connect-src 'self'; "
-                "object-src 'none'; "
-                "frame-ancestors 'none'; "
-                "base-uri 'self'; "
-                "form-action 'self'"
-            )
-        else:
-            csp = (
-                "default-src 'self'; "
-                "img-src 'self' data:; "
-                "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-                "font-src 'self' https://fonts.gstatic.com; "
-                f"script-src 'self' 'nonce-{csp_nonce}' https://cdn.jsdelivr.net; "
-                "connect-src 'self'; "
-                "object-src 'none'; "
-                "frame-ancestors 'none'; "
-                "base-uri 'self'; "
-                "form-action 'self'"
-            )
-
-        response.headers["Content-Security-Policy"] = csp
-        
-        return response
-
-
-class CSRFMiddleware(BaseHTTPMiddleware):
+import base64
+import os
+import threading
+import time
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .db import clear_tenant_context, get_conn
+from .logging_config import clear_request_context, set_request_context
+from .observability import record_request
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# Probe and static paths never set tenant context. /metrics is not listed:
+# in prod it authenticates the caller, which sets tenant context.
+_NO_DB_CONTEXT_PATHS = frozenset({"/health", "/ready"})
+_STATIC_PREFIX = "/static/"
+_UI_PREFIX = "/ui"
+
+
+class DbContextMiddleware:
+    """Clears the tenant context before and after every request that may set it."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] in _NO_DB_CONTEXT_PATHS
+            or scope["path"].startswith(_STATIC_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+        clear_tenant_context()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            clear_tenant_context()
+
+
+class RequestIdMiddleware:
+    """
+    Exposes the caller's X-Request-ID (or a fresh UUID) as ``request.state.request_id``
+    and as the request id on structured log records.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = _header(scope, b"x-request-id") or str(uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        tokens = set_request_context(request_id=request_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            clear_request_context(tokens)
+
+
+class SessionTimeoutMiddleware:
+    """
+    Session management middleware. Auto-authenticates in non-prod environments.
+
+    Must sit inside the session middleware, which populates ``scope["session"]``.
+    """
+
+    def __init__(self, app: ASGIApp, *, auto_login: bool = False) -> None:
+        self.app = app
+        self.auto_login = auto_login
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Session timeout policy applies to UI surface only.
+        if scope["type"] != "http" or not scope["path"].startswith(_UI_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        session = scope["session"]
+        current_time = int(time.time())
+
+        # Auto-login: inject admin user_id if no session exists (dev only)
+        if self.auto_login and not session.get("user_id"):
+            try:
+                with get_conn() as conn:
+                    row = conn.execute(
+                        "SELECT id FROM users WHERE role = 'admin' LIMIT 1"
+                    ).fetchone()
+                    if row:
+                        session["user_id"] = str(row["id"])
+            except Exception:
+                pass
+
+        # Update last activity timestamp
+        session["_last_activity"] = current_time
+
+        await self.app(scope, receive, send)
+
+
+# CSP values are built once at import; only the nonce varies per request.
+_CSP_DIRECTIVES_TAIL = (
+    "connect-src 'self'; "
+    "object-src 'none'; "
+    "frame-ancestors 'none'; "
+    "base-uri 'self'; "
+    "form-action 'self'"
+)
+_CSP_PREFIX = (
+    "default-src 'self'; "
+    "img-src 'self' data:; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "script-src 'self' 'nonce-"
+).encode()
+_CSP_SUFFIX = ("' https://cdn.jsdelivr.net; " + _CSP_DIRECTIVES_TAIL).encode()
+# Swagger/ReDoc pages use inline scripts and CDN CSS that the strict
+# nonce-based CSP blocks.  Use a relaxed policy for the docs paths only.
+_DOCS_CSP = (
+    "default-src 'self'; "
+    "img-src 'self' data: https://fastapi.tiangolo.com; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "font-src 'self' https://fonts.gstatic.com https://cdn.jsdelivr.net; "
+    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    + _CSP_DIRECTIVES_TAIL
+).encode()
+_DOCS_PATHS = frozenset({"/docs", "/redoc", "/openapi.json"})
+
+_STATIC_SECURITY_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"permissions-policy", b"camera=(), microphone=(), geolocation=()"),
+    (b"cache-control", b"no-store"),
+)
+_HSTS_HEADER = (b"strict-transport-security", b"max-age=63072000; includeSubDomains; preload")
+_CSP_HEADER_NAME = b"content-security-policy"
+
+
+class _NonceBuffer:
+    """
+    Hands out CSP nonces from a block of CSPRNG bytes.
+
+    One os.urandom() call covers ``block_size // nonce_bytes`` requests instead
+    of one getrandom syscall per response; every slice is handed out once.
+    """
+
+    def __init__(self, nonce_bytes: int = 16, block_size: int = 4096) -> None:
+        self.nonce_bytes = nonce_bytes
+        self.block_size = block_size - block_size % nonce_bytes
+        self._buffer = b""
+        self._offset = self.block_size
+        self._lock = threading.Lock()
+
+    def token(self) -> str:
+        with self._lock:
+            if self._offset >= self.block_size:
+                self._buffer = os.urandom(self.block_size)
+                self._offset = 0
+            start = self._offset
+            self._offset = start + self.nonce_bytes
+            raw = self._buffer[start:self._offset]
+        # Same encoding as secrets.token_urlsafe(16).
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+_nonces = _NonceBuffer()
+
+
+def _csp_value(path: str, csp_nonce: str) -> bytes:
+    if path in _DOCS_PATHS:
+        return _DOCS_CSP
+    return _CSP_PREFIX + csp_nonce.encode() + _CSP_SUFFIX
+
+
+class SecurityHeadersMiddleware:
+    """Adds security headers (including a per-request CSP nonce) to all responses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        referrer_policy: str = "no-referrer",
+        hsts: bool = False,
+    ) -> None:
+        self.app = app
+        # Encoded once; appended as-is onto every response's raw header list.
+        self.raw_headers = [*_STATIC_SECURITY_HEADERS, (b"referrer-policy", referrer_policy.encode("latin-1"))]
+        if hsts:
+            self.raw_headers.append(_HSTS_HEADER)
+        self.header_names = frozenset(name for name, _ in self.raw_headers) | {_CSP_HEADER_NAME}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        csp_nonce = _nonces.token()
+        # Kept on the scope itself; only HTML handlers read it (see csp_nonce()).
+        scope["csp_nonce"] = csp_nonce
+        path = scope["path"]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # These headers replace any value the app already set.
+                headers = [
+                    header for header in message.get("headers", ()) if header[0].lower() not in self.header_names
+                ]
+                headers.extend(self.raw_headers)
+                headers.append((_CSP_HEADER_NAME, _csp_value(path, csp_nonce)))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def csp_nonce(request) -> str:
+    """Return the CSP nonce SecurityHeadersMiddleware issued for ``request`` ("" if none)."""
+    return request.scope.get("csp_nonce", "")
+
+
+# Fallback bucketing for requests that did not match a route.
+_ID_PATH_TEMPLATES = {
+    "/ui/patients/": "/ui/patients/:id",
+    "/patients/": "/patients/:id",
+    "/documents/": "/documents/:id",
+}
+_ID_PATH_PREFIXES = tuple(_ID_PATH_TEMPLATES)
+
+
+class MetricsMiddleware:
+    """Records request count and latency per method, normalized path and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _metric_path(scope: Scope) -> str:
+        # The router records the matched route in the scope; its template
+        # (e.g. /ui/patients/{patient_id}) keeps label cardinality bounded.
+        route = scope.get("route")
+        route_path = getattr(route, "path", None)
+        if route_path:
+            return route_path
+        path = scope["path"]
+        if path.startswith(_ID_PATH_PREFIXES):
+            for prefix, template in _ID_PATH_TEMPLATES.items():
+                if path.startswith(prefix):
+                    return template
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        duration = time.perf_counter() - start
+        record_request(scope["method"], self._metric_path(scope), status_code, duration)
+
+
+class CSRFMiddleware:
     """CSRF protection middleware."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # CSRF protection logic would go here
         # For now, just pass through
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 
 def add_security_headers(app):
     """Add security headers middleware to the FastAPI app."""
-    app.add_middleware(SecurityHeadersMiddleware)
+    settings = get_settings()
+    app.add_middleware(
+        SecurityHeadersMiddleware,
+        referrer_policy=settings.referrer_policy,
+        hsts=settings.app_env == "prod" or settings.hipaa_mode,
+    )
 
 
 def add_csrf_protection(app):
     """Add CSRF protection middleware to the FastAPI app."""
-    app.add_middleware(CSRFMiddleware)
\ No newline at end of file
+    app.add_middleware(CSRFMiddleware)
@@ -84,6 +84,8 @@ def normalize_lab_list(labs: list[dict]) -> list[dict]:
         List with normalized test names and original names preserved.
     """
     normalized = []
+    # Lab panels repeat the same test names across documents; resolve each once.
+    canonical_by_name: dict[str, str] = {}
     for lab in labs:
         lab_copy = lab.copy()
         # Handle different key names
@@ -91,7 +93,9 @@ def normalize_lab_list(labs: list[dict]) -> list[dict]:
         original_name = lab.get(test_key, "")
         
         lab_copy["original_name"] = original_name
-        lab_copy[test_key] = normalize_lab_name(original_name)
+        if original_name not in canonical_by_name:
+            canonical_by_name[original_name] = normalize_lab_name(original_name)
+        lab_copy[test_key] = canonical_by_name[original_name]
         lab_copy["canonical_name"] = lab_copy[test_key]
         
         normalized.append(lab_copy)
@@ -12,6 +12,31 @@ _REDACTION_RULES: list[tuple[re.Pattern[str], str]] = [
 ]
 
 
+# Flags a scoped group can carry; str patterns always have re.UNICODE set.
+_SCOPED_FLAG_LETTERS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
+_SUPPORTED_FLAGS = re.UNICODE | re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE
+_LEADING_INLINE_FLAGS = re.compile(r"^\(\?[aiLmsux]+\)")
+
+
+def _scoped_pattern(pattern: re.Pattern[str]) -> str:
+    # Global inline flags are only valid at the start of a pattern, so each
+    # rule's flags (inline or passed to re.compile) move into a scoped group.
+    unsupported = pattern.flags & ~_SUPPORTED_FLAGS
+    if unsupported:
+        raise ValueError(f"PHI rule {pattern.pattern!r} uses flags that cannot be scoped: {unsupported!r}")
+    letters = "".join(letter for flag, letter in _SCOPED_FLAG_LETTERS.items() if pattern.flags & flag)
+    body = _LEADING_INLINE_FLAGS.sub("", pattern.pattern, count=1)
+    if pattern.flags & re.VERBOSE:
+        # A trailing comment would otherwise swallow the closing parenthesis.
+        body += "\n"
+    return f"(?{letters}:{body})"
+
+
+# One alternation over every rule: a single search tells whether any rule
+# would fire, so clean text skips the per-rule substitutions.
+_PHI_QUICK = re.compile("|".join(_scoped_pattern(pattern) for pattern, _ in _REDACTION_RULES))
+
+
 def _split_csv(value: str | None) -> set[str]:
     if not value:
         return set()
@@ -29,9 +54,14 @@ def ensure_phi_processor(processor: str) -> None:
         )
 
 
+def contains_phi(text: str) -> bool:
+    """Return True when any redaction rule matches ``text``."""
+    return bool(text) and _PHI_QUICK.search(text) is not None
+
+
 def redact_text(text: str) -> str:
     settings = get_settings()
-    if not settings.phi_redaction_enabled or not text:
+    if not settings.phi_redaction_enabled or not contains_phi(text):
         return text
     redacted = text
     for pattern, replacement in _REDACTION_RULES:
@@ -1,7 +1,8 @@
 import json
+import math
 from typing import List, Dict, Any
 
-from pgvector.psycopg import Vector
+from pgvector.psycopg import HalfVector
 
 from .db import get_conn
 from .embeddings import embed_texts
@@ -15,51 +16,123 @@ def build_query(structured: dict, notes: str | None = None) -> str:
 
 
 DEFAULT_MIN_SIMILARITY = 0.75  # Cosine distance threshold — reject chunks further than this
+# Hamming-distance candidates fetched per requested chunk before rescoring
+# against the full-precision embedding.
+RESCORE_CANDIDATES_PER_RESULT = 8
+# The HNSW scan walks the whole table's graph and the patient filter applies
+# afterwards. The search list is widened to the candidate pool (pgvector caps
+# ef_search at 1000), and on pgvector >= 0.8 iterative scans keep walking until
+# enough rows pass the filter. A patient holding a small share of embeddings
+# can still come back short; retrieve_top_chunks then falls back to an exact
+# scan of that patient's chunks.
+HNSW_EF_SEARCH = 64
+_HNSW_EF_SEARCH_MAX = 1000
+
+# Inner query: Hamming candidates on the binary-quantized column (HNSW
+# bit_hamming_ops, 384 bytes per row, migration 027). Outer query: exact
+# inner product on the halfvec for those candidates only.
+_HAMMING_RESCORE_SQL = """
+    SELECT
+        c.chunk_text,
+        c.chunk_index,
+        c.chunk_start,
+        c.chunk_end,
+        c.extraction_id,
+        c.document_id,
+        c.filename,
+        c.content_type,
+        (c.embedding <#> %s) AS neg_inner_product
+    FROM (
+        SELECT
+            e.chunk_text,
+            e.chunk_index,
+            e.chunk_start,
+            e.chunk_end,
+            e.extraction_id,
+            d.id as document_id,
+            d.filename,
+            d.content_type,
+            e.embedding
+        FROM embeddings e
+        JOIN documents d ON d.id = e.document_id
+        WHERE d.patient_id = %s
+          AND vector_dims(e.embedding) = %s
+        ORDER BY e.embedding_bits <~> binary_quantize(%s)::bit(3072)
+        LIMIT %s
+    ) c
+    ORDER BY neg_inner_product
+    LIMIT %s
+"""
+
+# Exact inner product over every chunk of the patient. No index serves this
+# ordering, so the patient filter applies first.
+_EXACT_SCAN_SQL = """
+    SELECT
+        e.chunk_text,
+        e.chunk_index,
+        e.chunk_start,
+        e.chunk_end,
+        e.extraction_id,
+        d.id as document_id,
+        d.filename,
+        d.content_type,
+        (e.embedding <#> %s) AS neg_inner_product
+    FROM embeddings e
+    JOIN documents d ON d.id = e.document_id
+    WHERE d.patient_id = %s
+      AND vector_dims(e.embedding) = %s
+    ORDER BY neg_inner_product
+    LIMIT %s
+"""
 
 
 def retrieve_top_chunks(patient_id: str, query: str, top_k: int = 5, min_similarity: float = DEFAULT_MIN_SIMILARITY) -> List[Dict[str, Any]]:
     embedding = embed_texts([query])[0]
     embedding_dim = len(embedding)
-    vector = Vector(embedding)
+    # embeddings.embedding is halfvec(3072); query with the same type.
+    # embed_texts returns unit vectors, so ranking by inner product (<#> is
+    # its negation) matches cosine/L2 order.
+    vector = HalfVector(embedding)
 
+    candidates = top_k * RESCORE_CANDIDATES_PER_RESULT
+    ef_search = min(max(HNSW_EF_SEARCH, candidates), _HNSW_EF_SEARCH_MAX)
     with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                e.chunk_text,
-                e.chunk_index,
-                e.chunk_start,
-                e.chunk_end,
-                e.extraction_id,
-                d.id as document_id,
-                d.filename,
-                d.content_type,
-                (e.embedding <-> %s) AS distance
-            FROM embeddings e
-            JOIN documents d ON d.id = e.document_id
-            WHERE d.patient_id = %s
-              AND vector_dims(e.embedding) = %s
-            ORDER BY distance
-            LIMIT %s
-            """,
-            (vector, patient_id, embedding_dim, top_k),
-        ).fetchall()
-
-    return [
-        {
-            "chunk_text": r["chunk_text"],
-            "distance": float(r["distance"]),
-            "chunk_index": r.get("chunk_index"),
-            "chunk_start": r.get("chunk_start"),
-            "chunk_end": r.get("chunk_end"),
-            "extraction_id": str(r["extraction_id"]) if r.get("extraction_id") else None,
-            "document_id": str(r["document_id"]),
-            "filename": r["filename"],
-            "content_type": r["content_type"],
-        }
-        for r in rows
-        if float(r["distance"]) <= min_similarity
-    ]
+        with conn.pipeline():
+            # Transaction-local, so the pooled connection goes back unchanged.
+            conn.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),))
+            # Only set where the pgvector build defines it (0.8+): an unknown
+            # hnsw.* setting is an error once the extension is loaded.
+            conn.execute(
+                "SELECT set_config(name, 'strict_order', true) FROM pg_settings WHERE name = 'hnsw.iterative_scan'"
+            )
+            rows = conn.execute(
+                _HAMMING_RESCORE_SQL,
+                (vector, patient_id, embedding_dim, vector, candidates, top_k),
+            ).fetchall()
+        if len(rows) < top_k:
+            rows = conn.execute(_EXACT_SCAN_SQL, (vector, patient_id, embedding_dim, top_k)).fetchall()
+
+    results = []
+    for r in rows:
+        # For unit vectors, L2 distance = sqrt(2 - 2 * inner_product); keeps
+        # the reported distance and min_similarity threshold unchanged.
+        distance = math.sqrt(max(0.0, 2.0 + 2.0 * float(r["neg_inner_product"])))
+        if distance > min_similarity:
+            continue
+        results.append(
+            {
+                "chunk_text": r["chunk_text"],
+                "distance": distance,
+                "chunk_index": r.get("chunk_index"),
+                "chunk_start": r.get("chunk_start"),
+                "chunk_end": r.get("chunk_end"),
+                "extraction_id": str(r["extraction_id"]) if r.get("extraction_id") else None,
+                "document_id": str(r["document_id"]),
+                "filename": r["filename"],
+                "content_type": r["content_type"],
+            }
+        )
+    return results
 
 
 def retrieve_sparse_chunks(patient_id: str, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
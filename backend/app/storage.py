@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
@@ -13,12 +14,23 @@ def _split_csv(value: str | None) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+# Storage API limit on object paths per bulk remove request.
+_REMOVE_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=4)
+def _cached_supabase_admin(supabase_url: str | None, service_role_key: str | None):
+    # One client (and its HTTP connection pool) per configuration instead of
+    # a fresh client, session and TLS handshake on every storage call.
+    return create_client(supabase_url, service_role_key)
+
+
 def get_supabase_admin():
     settings = get_settings()
     supabase_url = settings.supabase_url
     if supabase_url and not supabase_url.endswith("/"):
         supabase_url = f"{supabase_url}/"
-    return create_client(supabase_url, settings.supabase_service_role_key)
+    return _cached_supabase_admin(supabase_url, settings.supabase_service_role_key)
 
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=8), reraise=True)
@@ -92,9 +104,13 @@ def download_bytes(bucket: str, path: str) -> bytes:
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=8), reraise=True)
 def delete_bytes(bucket: str, paths: list[str]) -> None:
+    """Remove ``paths`` with one bulk-delete request per batch of up to 1000 objects."""
+    if not paths:
+        return
     client = get_supabase_admin()
     storage = client.storage.from_(bucket)
-    storage.remove(paths)
+    for start in range(0, len(paths), _REMOVE_BATCH_SIZE):
+        storage.remove(paths[start:start + _REMOVE_BATCH_SIZE])
 
 
 def ensure_bucket(bucket: str) -> None:
@@ -256,6 +256,11 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Purge old audit logs and job history.")
     parser.add_argument("--audit-days", type=int, default=settings.audit_retention_days)
     parser.add_argument("--job-days", type=int, default=settings.job_retention_days)
+    parser.add_argument(
+        "--embedding-cache-days",
+        type=int,
+        default=settings.embedding_cache_retention_days,
+    )
     parser.add_argument("--execute", action="store_true", help="Apply deletions (default is dry-run).")
     parser.add_argument(
         "--export-dir",
@@ -313,6 +318,7 @@ def main() -> None:
     audit_events_count = purge_table("audit_events", args.audit_days, dry_run=dry_run, time_column="event_time")
     phi_events_count = purge_table("phi_egress_events", args.audit_days, dry_run=dry_run, time_column="event_time")
     job_count = purge_jobs(args.job_days, dry_run=dry_run)
+    embedding_cache_count = purge_table("embedding_cache", args.embedding_cache_days, dry_run=dry_run)
     mfa_count = purge_mfa_setup_tokens(dry_run=dry_run)
     session_count = purge_ui_sessions(dry_run=dry_run)
 
@@ -332,6 +338,7 @@ def main() -> None:
         print(f"APPLIED: audit_events immutable URI: {manifest_uris.get('audit_events', 'none')}")
         print(f"APPLIED: phi_egress_events immutable URI: {manifest_uris.get('phi_egress_events', 'none')}")
     print(f"{mode}: jobs purge candidates: {job_count}")
+    print(f"{mode}: embedding_cache purge candidates: {embedding_cache_count}")
     print(f"{mode}: mfa_setup_tokens purge candidates: {mfa_count}")
     print(f"{mode}: ui_sessions purge candidates: {session_count}")
 
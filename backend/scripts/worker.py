@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 import logging
+import os
+import socket
 import time
+from collections import deque
 
 from backend.app.config import get_settings
 from backend.app.db import clear_tenant_context, set_tenant_context
 from backend.app.jobs import (
     claim_next_job,
-    claim_next_job_from_queue,
+    claim_next_jobs_from_queue,
     enqueue_job,
     mark_job_done,
     mark_job_failed,
+    recover_orphaned_jobs,
+    start_heartbeat,
 )
-from backend.app.main import _draft_chr, _embed_document, _extract_document
+from backend.app.helpers import _draft_chr, _embed_document, _extract_document
+from backend.app.llm_gateway import drain_phi_egress_events, recover_phi_egress_events
+from backend.app.logging_config import clear_request_context, set_request_context
+
+# How often an idle worker scans for processing lists left by dead workers.
+ORPHAN_RECOVERY_INTERVAL_SECONDS = 60
 
 
 def handle_job(job) -> None:
@@ -25,7 +35,7 @@ def handle_job(job) -> None:
         document_id = payload.get("document_id") or job.document_id
         if not document_id:
             raise ValueError("extract job missing document_id")
-        _extract_document(document_id, actor=actor, tenant_id=tenant_id)
+        _extract_document(document_id, actor=actor, tenant_id=tenant_id, refresh=bool(payload.get("refresh")))
         if payload.get("auto_embed"):
             enqueue_job(
                 "embed",
@@ -56,29 +66,60 @@ def main() -> None:
     settings = get_settings()
     logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
     logger = logging.getLogger("medchr.worker")
-    logger.info("Worker starting")
-
-    while True:
-        job = claim_next_job_from_queue(timeout_seconds=settings.job_poll_interval_seconds)
-        if not job:
-            job = claim_next_job()
-        if not job:
-            time.sleep(settings.job_poll_interval_seconds)
-            continue
-
-        if job.attempts > settings.job_max_attempts:
-            mark_job_failed(job.id, "max attempts exceeded")
-            continue
-
-        try:
-            handle_job(job)
-            mark_job_done(job.id)
-        except Exception as exc:
-            logger.exception("Job failed", extra={"job_id": job.id, "job_type": job.job_type})
-            mark_job_failed(job.id, str(exc))
-            time.sleep(1)
-        finally:
-            clear_tenant_context()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Worker starting", extra={"worker_id": worker_id})
+
+    # Jobs claimed from Redis in one batch and not yet processed.
+    claimed = deque()
+    last_recovery = 0.0
+    # Beats on its own thread so the heartbeat stays fresh while a long job runs.
+    heartbeat = start_heartbeat(worker_id)
+    try:
+        while True:
+            if not claimed:
+                # PHI egress events are queued in Redis by the API; flush a batch
+                # between job claims so they land in Postgres promptly.
+                drain_phi_egress_events(consumer_id=worker_id)
+                claimed.extend(
+                    claim_next_jobs_from_queue(
+                        settings.job_claim_batch_size,
+                        timeout_seconds=settings.job_poll_interval_seconds,
+                        worker_id=worker_id,
+                    )
+                )
+            job = claimed.popleft() if claimed else None
+            if not job:
+                job = claim_next_job(settings.job_worker_tenant_id)
+            if not job:
+                if time.monotonic() - last_recovery >= ORPHAN_RECOVERY_INTERVAL_SECONDS:
+                    recovered = recover_orphaned_jobs()
+                    if recovered:
+                        logger.warning("Re-queued orphaned jobs", extra={"count": recovered})
+                    recovered = recover_phi_egress_events()
+                    if recovered:
+                        logger.warning("Re-queued orphaned PHI egress events", extra={"count": recovered})
+                    last_recovery = time.monotonic()
+                time.sleep(settings.job_poll_interval_seconds)
+                continue
+
+            if job.attempts > settings.job_max_attempts:
+                mark_job_failed(job.id, "max attempts exceeded", worker_id=worker_id)
+                continue
+
+            # Log records emitted while the job runs carry its id and tenant.
+            log_context = set_request_context(request_id=str(job.id), tenant_id=job.tenant_id)
+            try:
+                handle_job(job)
+                mark_job_done(job.id, worker_id=worker_id)
+            except Exception as exc:
+                logger.exception("Job failed", extra={"job_id": job.id, "job_type": job.job_type})
+                mark_job_failed(job.id, str(exc), worker_id=worker_id)
+                time.sleep(1)
+            finally:
+                clear_tenant_context()
+                clear_request_context(log_context)
+    finally:
+        heartbeat.set()
 
 
 if __name__ == "__main__":
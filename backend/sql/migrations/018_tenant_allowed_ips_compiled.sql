@@ -0,0 +1,9 @@
+-- Pre-parsed binary form of tenants.allowed_ips for the per-request IP allowlist check.
+-- Written alongside allowed_ips by ip_whitelist.update_tenant_whitelist; NULL means
+-- "not compiled yet" and the application falls back to parsing allowed_ips.
+
+BEGIN;
+
+ALTER TABLE tenants ADD COLUMN IF NOT EXISTS allowed_ips_compiled BYTEA;
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Partial index for the pending-job claim path (claim_next_job's
+-- ORDER BY created_at ... FOR UPDATE SKIP LOCKED). Only pending rows are
+-- indexed, so the scan stays a short index probe as finished jobs accumulate.
+-- Plain CREATE INDEX: migrations run inside a transaction, which rules out CONCURRENTLY.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_pending_created_at
+  ON jobs (created_at)
+  WHERE status = 'pending';
+
+COMMIT;
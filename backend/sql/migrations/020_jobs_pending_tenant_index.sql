@@ -0,0 +1,12 @@
+-- Per-tenant partial index for claim_next_job(tenant_id=...). Workers pinned
+-- to a tenant probe only that tenant's pending rows instead of contending on
+-- the head of the global pending queue.
+-- Plain CREATE INDEX: migrations run inside a transaction, which rules out CONCURRENTLY.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_pending_tenant_created_at
+  ON jobs (tenant_id, created_at)
+  WHERE status = 'pending';
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- Store chunk embeddings as halfvec (float16, pgvector >= 0.7) instead of
+-- vector (float32): half the bytes per row for COPY, heap and index scans.
+-- HNSW on vector is capped at 2000 dimensions, so the 3072-dim index never
+-- built; halfvec allows up to 4000 and the index is rebuilt on halfvec_l2_ops.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_embeddings_vector_hnsw;
+
+ALTER TABLE embeddings
+  ALTER COLUMN embedding TYPE halfvec(3072) USING embedding::halfvec(3072);
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_vector_hnsw
+  ON embeddings USING hnsw (embedding halfvec_l2_ops);
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- Per-tenant cache of chunk embeddings keyed by SHA-256 of the chunk text.
+-- Templated sections (headers, discharge boilerplate) repeat across a
+-- tenant's documents; a cache hit replaces an embeddings API call.
+-- Scoped by tenant so vectors derived from one tenant's PHI are never
+-- served to another.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+  model TEXT NOT NULL,
+  chunk_sha256 BYTEA NOT NULL,
+  embedding halfvec NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (tenant_id, model, chunk_sha256)
+);
+
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE embedding_cache FORCE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS rls_embedding_cache_tenant ON embedding_cache;
+CREATE POLICY rls_embedding_cache_tenant ON embedding_cache
+  USING (tenant_id = current_tenant_uuid())
+  WITH CHECK (tenant_id = current_tenant_uuid());
+
+COMMIT;
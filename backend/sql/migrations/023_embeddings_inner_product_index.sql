@@ -0,0 +1,14 @@
+-- Embeddings are stored L2-normalized (see embed_texts), so cosine similarity
+-- is a plain inner product. Rebuild the HNSW index on halfvec_ip_ops to serve
+-- ORDER BY embedding <#> query, which skips the subtraction per dimension that
+-- L2 distance needs. text-embedding-3 vectors are already unit length, so
+-- existing rows need no backfill.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_embeddings_vector_hnsw;
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_vector_hnsw
+  ON embeddings USING hnsw (embedding halfvec_ip_ops);
+
+COMMIT;
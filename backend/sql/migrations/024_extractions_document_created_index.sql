@@ -0,0 +1,15 @@
+-- Latest-extraction-per-document lookups (the LATERAL joins behind report
+-- aggregation and embedding, ORDER BY created_at DESC LIMIT 1) read the first
+-- entry of this index instead of sorting every extraction of the document.
+-- Its document_id prefix still serves the has-extractions EXISTS probe, so
+-- the single-column index is dropped as redundant.
+-- Plain CREATE INDEX: migrations run inside a transaction, which rules out CONCURRENTLY.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_extractions_document_created_at
+  ON extractions (document_id, created_at DESC);
+
+DROP INDEX IF EXISTS idx_extractions_document_id;
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Latest-draft lookups (report pages, report edits, finalize: ORDER BY
+-- created_at DESC LIMIT 1 per patient) read the first entries of this index
+-- instead of sorting every version of the patient. Its patient_id prefix
+-- still serves plain patient_id filters, so the single-column index is
+-- dropped as redundant.
+-- Plain CREATE INDEX: migrations run inside a transaction, which rules out CONCURRENTLY.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_chr_versions_patient_created_at
+  ON chr_versions (patient_id, created_at DESC);
+
+DROP INDEX IF EXISTS idx_chr_versions_patient_id;
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- The report aggregate reads only these sections of each extraction. Stored
+-- generated columns compute them once at insert, so the read path ships and
+-- decodes five arrays and the notes string instead of the whole structured
+-- document (allergies, vitals, quality metadata, ...).
+-- Labs fall back to biomarkers when labs is missing, null or empty, matching
+-- the aggregation's `labs or biomarkers`.
+-- Adding STORED generated columns rewrites extractions once, under an
+-- ACCESS EXCLUSIVE lock.
+
+BEGIN;
+
+ALTER TABLE extractions
+  ADD COLUMN IF NOT EXISTS structured_labs JSONB GENERATED ALWAYS AS (
+    COALESCE(NULLIF(NULLIF(structured->'labs', '[]'::jsonb), 'null'::jsonb), structured->'biomarkers')
+  ) STORED,
+  ADD COLUMN IF NOT EXISTS structured_diagnoses JSONB GENERATED ALWAYS AS (structured->'diagnoses') STORED,
+  ADD COLUMN IF NOT EXISTS structured_medications JSONB GENERATED ALWAYS AS (structured->'medications') STORED,
+  ADD COLUMN IF NOT EXISTS structured_procedures JSONB GENERATED ALWAYS AS (structured->'procedures') STORED,
+  ADD COLUMN IF NOT EXISTS structured_genetics JSONB GENERATED ALWAYS AS (structured->'genetics') STORED,
+  ADD COLUMN IF NOT EXISTS structured_notes TEXT GENERATED ALWAYS AS (structured->>'notes') STORED;
+
+COMMIT;
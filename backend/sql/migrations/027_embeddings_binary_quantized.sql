@@ -0,0 +1,20 @@
+-- Binary-quantized copy of each embedding (one sign bit per dimension) for a
+-- Hamming-distance first pass: 384 bytes stored inline next to the row instead
+-- of the 6 KB halfvec, which lives out of line in TOAST. retrieve_top_chunks
+-- takes Hamming candidates from this column and rescores only those against
+-- the full halfvec, so the halfvec HNSW index is no longer read and is dropped.
+-- Adding a STORED generated column rewrites embeddings once, under an
+-- ACCESS EXCLUSIVE lock.
+
+BEGIN;
+
+ALTER TABLE embeddings
+  ADD COLUMN IF NOT EXISTS embedding_bits bit(3072)
+  GENERATED ALWAYS AS (binary_quantize(embedding)::bit(3072)) STORED;
+
+DROP INDEX IF EXISTS idx_embeddings_vector_hnsw;
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_bits_hnsw
+  ON embeddings USING hnsw (embedding_bits bit_hamming_ops);
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Rebuild the Hamming HNSW index with a denser graph. Sign-bit vectors tie
+-- often, so the default m = 16 / ef_construction = 64 graph loses recall on
+-- the per-patient candidate pass; m = 32 / ef_construction = 128 trades a
+-- larger index and slower builds for it. retrieve_top_chunks raises
+-- hnsw.ef_search per query to cover its candidate pool.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_embeddings_bits_hnsw;
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_bits_hnsw
+  ON embeddings USING hnsw (embedding_bits bit_hamming_ops)
+  WITH (m = 32, ef_construction = 128);
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Cached chunk vectors are derived from document text (PHI). Tie each entry
+-- to the document that first produced it so deleting that document, or its
+-- patient, removes the vector too. Existing entries have no owner; they are
+-- dropped and refill on the next embed.
+
+BEGIN;
+
+DELETE FROM embedding_cache;
+
+ALTER TABLE embedding_cache
+  ADD COLUMN IF NOT EXISTS document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE;
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_document_id ON embedding_cache(document_id);
+-- Retention sweep in scripts/purge_data.py.
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
+
+COMMIT;
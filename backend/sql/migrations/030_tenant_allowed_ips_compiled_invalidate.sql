@@ -0,0 +1,30 @@
+-- tenants.allowed_ips_compiled takes precedence over allowed_ips, but only
+-- ip_whitelist.update_tenant_whitelist keeps the two in step. Clear the
+-- compiled form whenever allowed_ips changes without it (manual SQL, other
+-- code paths, migrations) so the application recompiles from allowed_ips
+-- instead of enforcing a stale list.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION tenants_invalidate_allowed_ips_compiled()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.allowed_ips IS DISTINCT FROM OLD.allowed_ips
+     AND NEW.allowed_ips_compiled IS NOT DISTINCT FROM OLD.allowed_ips_compiled THEN
+    NEW.allowed_ips_compiled := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_tenants_allowed_ips_compiled ON tenants;
+CREATE TRIGGER trg_tenants_allowed_ips_compiled
+  BEFORE UPDATE OF allowed_ips ON tenants
+  FOR EACH ROW
+  EXECUTE FUNCTION tenants_invalidate_allowed_ips_compiled();
+
+-- Blobs written before this trigger may already be stale; recompile from
+-- allowed_ips until update_tenant_whitelist writes them again.
+UPDATE tenants SET allowed_ips_compiled = NULL WHERE allowed_ips_compiled IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- embedding_cache is a derived cache, and its retention sweep
+-- (scripts/purge_data.py) runs without a tenant context. Under FORCE ROW
+-- LEVEL SECURITY that sweep sees zero rows as a non-BYPASSRLS owner, so
+-- expired entries were never deleted. Keep plain ENABLE, as in 007: the
+-- tenant policy still applies to the application role, and the owner can
+-- purge across tenants.
+
+BEGIN;
+
+ALTER TABLE embedding_cache NO FORCE ROW LEVEL SECURITY;
+
+COMMIT;
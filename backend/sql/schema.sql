@@ -41,10 +41,19 @@ CREATE TABLE IF NOT EXISTS extractions (
   document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
   raw_text TEXT,
   structured JSONB,
+  -- Sections read by the report aggregate, computed once at insert.
+  structured_labs JSONB GENERATED ALWAYS AS (
+    COALESCE(NULLIF(NULLIF(structured->'labs', '[]'::jsonb), 'null'::jsonb), structured->'biomarkers')
+  ) STORED,
+  structured_diagnoses JSONB GENERATED ALWAYS AS (structured->'diagnoses') STORED,
+  structured_medications JSONB GENERATED ALWAYS AS (structured->'medications') STORED,
+  structured_procedures JSONB GENERATED ALWAYS AS (structured->'procedures') STORED,
+  structured_genetics JSONB GENERATED ALWAYS AS (structured->'genetics') STORED,
+  structured_notes TEXT GENERATED ALWAYS AS (structured->>'notes') STORED,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
--- text-embedding-3-large uses 3072 dimensions
+-- text-embedding-3-large uses 3072 dimensions, stored as float16 halfvec
 CREATE TABLE IF NOT EXISTS embeddings (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
@@ -53,10 +62,24 @@ CREATE TABLE IF NOT EXISTS embeddings (
   chunk_start INTEGER,
   chunk_end INTEGER,
   chunk_text TEXT NOT NULL,
-  embedding vector(3072) NOT NULL,
+  embedding halfvec(3072) NOT NULL,
+  -- Sign bit per dimension, for the Hamming first pass of retrieval.
+  embedding_bits bit(3072) GENERATED ALWAYS AS (binary_quantize(embedding)::bit(3072)) STORED,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- Per-tenant cache of chunk vectors keyed by SHA-256 of the chunk text; each
+-- entry is owned by the document that produced it.
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+  model TEXT NOT NULL,
+  chunk_sha256 BYTEA NOT NULL,
+  embedding halfvec NOT NULL,
+  document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (tenant_id, model, chunk_sha256)
+);
+
 CREATE TABLE IF NOT EXISTS chr_versions (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   patient_id UUID NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
@@ -103,9 +126,11 @@ CREATE TABLE IF NOT EXISTS jobs (
 );
 
 CREATE INDEX IF NOT EXISTS idx_documents_patient_id ON documents(patient_id);
-CREATE INDEX IF NOT EXISTS idx_extractions_document_id ON extractions(document_id);
+CREATE INDEX IF NOT EXISTS idx_extractions_document_created_at ON extractions(document_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_embeddings_document_id ON embeddings(document_id);
-CREATE INDEX IF NOT EXISTS idx_chr_versions_patient_id ON chr_versions(patient_id);
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_document_id ON embedding_cache(document_id);
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
+CREATE INDEX IF NOT EXISTS idx_chr_versions_patient_created_at ON chr_versions(patient_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_patient_id ON audit_logs(patient_id);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_tenant_id ON audit_logs(tenant_id);
 CREATE INDEX IF NOT EXISTS idx_patients_tenant_id ON patients(tenant_id);
@@ -117,7 +142,7 @@ CREATE INDEX IF NOT EXISTS idx_jobs_document_id ON jobs(document_id);
 DO $$
 BEGIN
   BEGIN
-    EXECUTE 'CREATE INDEX IF NOT EXISTS idx_embeddings_vector_hnsw ON embeddings USING hnsw (embedding vector_l2_ops)';
+    EXECUTE 'CREATE INDEX IF NOT EXISTS idx_embeddings_bits_hnsw ON embeddings USING hnsw (embedding_bits bit_hamming_ops) WITH (m = 32, ef_construction = 128)';
   EXCEPTION WHEN OTHERS THEN
     RAISE NOTICE 'Skipping HNSW index creation; pgvector may not support it.';
   END;
@@ -8,10 +8,13 @@ _PHI_PREFIXES = ("/patients", "/documents", "/chr", "/fhir", "/api/gap", "/jobs"
 _METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
 _AUDIT_CALLS = {
     "_log_action",
+    "_log_action_bg",
     "append_audit_event",
     "_audit_clinical_event",
     "_audit_gap_event",
+    "_audit_gap_event_bg",
     "_upload_document",
+    "_upload_documents",
     "_extract_document",
     "_embed_document",
     "_draft_chr",
@@ -19,6 +22,9 @@ _AUDIT_CALLS = {
     "_issue_signed_upload",
 }
 
+# Calls that take the audited function as their first argument.
+_DEFERRED_CALLERS = {"add_task", "to_thread"}
+
 
 def _collect_called_functions(source: str) -> set[str]:
     calls: set[str] = set()
@@ -31,6 +37,10 @@ def _collect_called_functions(source: str) -> set[str]:
             calls.add(func.id)
         elif isinstance(func, ast.Attribute):
             calls.add(func.attr)
+            # BackgroundTasks.add_task(fn, ...) defers the call until after the
+            # response; asyncio.to_thread(fn, ...) runs it in a worker thread.
+            if func.attr in _DEFERRED_CALLERS and node.args and isinstance(node.args[0], ast.Name):
+                calls.add(node.args[0].id)
     return calls
 
 
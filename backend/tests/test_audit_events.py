@@ -17,3 +17,126 @@ def test_append_audit_event_handles_non_uuid_resource_id():
 
     params = conn.execute.call_args[0][1]
     assert params[7] is None
+
+
+class _FakeAsyncCursor:
+    def __init__(self, writes):
+        self._writes = writes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def executemany(self, query, rows):
+        self._writes.append(list(rows))
+
+
+class _FakeAsyncConn:
+    def __init__(self, writes):
+        self._writes = writes
+
+    def cursor(self):
+        return _FakeAsyncCursor(self._writes)
+
+    async def commit(self):
+        pass
+
+
+def test_enqueued_audit_events_flush_in_one_batch_per_tenant(monkeypatch):
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    from backend.app import audit_events
+
+    writes = []
+    scopes = []
+
+    @asynccontextmanager
+    async def fake_get_async_conn():
+        scopes.append(audit_events.get_tenant_context())
+        yield _FakeAsyncConn(writes)
+
+    monkeypatch.setattr(audit_events, "get_async_conn", fake_get_async_conn)
+
+    tenant_a = "00000000-0000-0000-0000-00000000000a"
+    tenant_b = "00000000-0000-0000-0000-00000000000b"
+
+    async def run():
+        audit_events.start_audit_flusher()
+        for tenant in (tenant_a, tenant_b, tenant_a):
+            await audit_events.enqueue_audit_event(
+                action="patient.view",
+                resource_type="patient",
+                tenant_id=tenant,
+            )
+        await audit_events.stop_audit_flusher()
+
+    asyncio.run(run())
+
+    assert scopes == [tenant_a, tenant_b]
+    assert [len(rows) for rows in writes] == [2, 1]
+
+
+def test_failed_audit_batch_falls_back_to_sync_writes(monkeypatch):
+    import asyncio
+    from contextlib import asynccontextmanager, contextmanager
+
+    from backend.app import audit_events
+
+    @asynccontextmanager
+    async def broken_async_conn():
+        raise RuntimeError("async pool down")
+        yield
+
+    sync_conn = MagicMock()
+
+    @contextmanager
+    def fake_get_conn():
+        yield sync_conn
+
+    monkeypatch.setattr(audit_events, "get_async_conn", broken_async_conn)
+    monkeypatch.setattr(audit_events, "get_conn", fake_get_conn)
+
+    async def run():
+        audit_events.start_audit_flusher()
+        for action in ("patient.view", "chr.view"):
+            await audit_events.enqueue_audit_event(
+                action=action,
+                resource_type="patient",
+                tenant_id="00000000-0000-0000-0000-00000000000a",
+            )
+        await asyncio.sleep(0.3)
+        await audit_events.stop_audit_flusher()
+
+    asyncio.run(run())
+
+    written = [call.args[1][8] for call in sync_conn.execute.call_args_list]
+    assert written == ["patient.view", "chr.view"]
+    assert audit_events._audit_retry == []
+
+
+def test_inline_audit_write_restores_caller_tenant_context(monkeypatch):
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    from backend.app import audit_events
+
+    @asynccontextmanager
+    async def fake_get_async_conn():
+        yield _FakeAsyncConn([])
+
+    monkeypatch.setattr(audit_events, "get_async_conn", fake_get_async_conn)
+    caller_tenant = "00000000-0000-0000-0000-00000000000c"
+
+    async def run():
+        audit_events.set_tenant_context(caller_tenant)
+        await audit_events.enqueue_audit_event(
+            action="patient.view",
+            resource_type="patient",
+            tenant_id="00000000-0000-0000-0000-00000000000a",
+        )
+        return audit_events.get_tenant_context()
+
+    assert asyncio.run(run()) == caller_tenant
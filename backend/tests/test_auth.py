@@ -66,3 +66,66 @@ def test_authenticate_user_not_found():
         user = authenticate_user("nonexistent@example.com", "any")
         
         assert user is None
+
+
+def test_get_current_user_caches_user_row_but_checks_ip_every_request():
+    import pytest
+    from fastapi import HTTPException
+
+    from backend.app import auth
+    from backend.app.ip_whitelist import compile_whitelist
+
+    user_id = uuid4()
+    user_row = {
+        "id": user_id,
+        "email": "cached@example.com",
+        "role": "clinician",
+        "tenant_id": uuid4(),
+        "created_at": datetime.now(),
+        "password_hash": "hashed",
+        "mfa_secret": "JBSWY3DPEHPK3PXP",
+        "mfa_secret_encrypted": "ciphertext",
+    }
+    request = MagicMock()
+    request.session = {"user_id": str(user_id)}
+    auth.invalidate_user_cache()
+
+    with patch("backend.app.auth.get_conn"), patch(
+        "backend.app.auth.get_user_by_id", return_value=user_row
+    ) as mock_get_user, patch(
+        "backend.app.auth.get_tenant_compiled_whitelist", return_value=compile_whitelist(["10.0.0.1"])
+    ) as mock_whitelist, patch(
+        "backend.app.auth.extract_client_ip", side_effect=["10.0.0.1", "10.0.0.1", "10.0.0.2"]
+    ):
+        assert auth.get_current_user(request).email == "cached@example.com"
+        assert auth.get_current_user(request).email == "cached@example.com"
+        assert mock_get_user.call_count == 1
+        # The allowlist is never cached, so changes apply on every worker at once.
+        assert mock_whitelist.call_count == 2
+        cached_user = auth._user_cache[str(user_id)][1]
+        assert not {"password_hash", "mfa_secret", "mfa_secret_encrypted"} & cached_user.keys()
+
+        with pytest.raises(HTTPException) as excinfo:
+            auth.get_current_user(request)
+        assert excinfo.value.status_code == 403
+
+    auth.invalidate_user_cache()
+
+
+def test_session_user_cache_evicts_least_recently_used(monkeypatch):
+    from backend.app import auth
+
+    monkeypatch.setattr(auth, "_user_cache", auth.OrderedDict())
+    monkeypatch.setattr(auth, "_USER_CACHE_MAX", 2)
+    rows = {name: {"id": name, "email": f"{name}@example.com", "tenant_id": "t1"} for name in ("a", "b", "c")}
+
+    with patch("backend.app.auth.get_conn"), patch(
+        "backend.app.auth.get_user_by_id", side_effect=lambda user_id, _conn: rows[user_id]
+    ) as mock_get_user, patch("backend.app.auth.get_tenant_compiled_whitelist"):
+        auth._load_session_user("a")
+        auth._load_session_user("b")
+        auth._load_session_user("a")
+        auth._load_session_user("c")
+
+    assert list(auth._user_cache) == ["a", "c"]
+    assert mock_get_user.call_count == 3
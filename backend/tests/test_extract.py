@@ -124,3 +124,202 @@ class TestExtractStructured:
         user_msg = [m for m in messages if m["role"] == "user"][0]["content"]
         assert "Ignore all previous instructions" not in user_msg
         assert "[REDACTED]" in user_msg
+
+
+# ── OCR result cache ───────────────────────────────────────────
+
+class TestOcrCache:
+    def test_hit_returns_copy_and_evicts_oldest(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_ocr_cache", helpers.OrderedDict())
+        monkeypatch.setattr(helpers, "_OCR_CACHE_MAX", 2)
+
+        helpers._ocr_cache_put(("d1", "p/1"), "text one", {"labs": [{"test_name": "A1C"}]})
+        raw_text, structured = helpers._ocr_cache_get(("d1", "p/1"))
+        assert raw_text == "text one"
+        structured["labs"].clear()
+        assert helpers._ocr_cache_get(("d1", "p/1"))[1]["labs"] == [{"test_name": "A1C"}]
+
+        helpers._ocr_cache_put(("d2", "p/2"), "text two", {})
+        helpers._ocr_cache_put(("d3", "p/3"), "text three", {})
+        assert helpers._ocr_cache_get(("d1", "p/1")) is None
+        assert helpers._ocr_cache_get(("d3", "p/3")) == ("text three", {})
+
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_ocr_cache", helpers.OrderedDict())
+        monkeypatch.setattr(helpers, "_OCR_CACHE_TTL_SECONDS", -1.0)
+
+        helpers._ocr_cache_put(("d1", "p/1"), "text", {})
+        assert helpers._ocr_cache_get(("d1", "p/1")) is None
+
+    def test_failed_and_empty_extractions_are_not_cacheable(self):
+        from backend.app import helpers
+        from backend.app.schemas import ExtractionData
+
+        assert not helpers._is_cacheable_extraction(ExtractionData(notes="Extraction failed: timeout").dict())
+        assert not helpers._is_cacheable_extraction(ExtractionData().dict())
+        assert helpers._is_cacheable_extraction(ExtractionData(notes="Routine follow-up").dict())
+
+
+# ── Aggregated structured data cache ───────────────────────────
+
+class TestAggregateCache:
+    def _conn(self, probe, rows):
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = probe
+        conn.execute.return_value.fetchall.return_value = rows
+        return conn
+
+    def _row(self):
+        from datetime import datetime, timezone
+
+        return {
+            "document_id": "doc-1",
+            "filename": "labs.pdf",
+            "content_type": "application/pdf",
+            "document_created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "extraction_id": "ext-1",
+            "diagnoses": ["CKD"],
+            "labs": [{"test": "Creatinine", "value": "1.9"}],
+            "extracted_at": datetime(2024, 1, 2, tzinfo=timezone.utc),
+        }
+
+    def test_unchanged_fingerprint_skips_aggregate_query(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_aggregate_cache", helpers.OrderedDict())
+        probe = {"extraction_count": 1, "latest_extraction": "2024-01-02"}
+        conn = self._conn(probe, [self._row()])
+
+        first, _ = helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+        first["diagnoses"].append("mutated")
+        second, sources = helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+
+        # Probe + aggregate on the first call, probe only on the second.
+        assert conn.execute.call_count == 3
+        assert second["diagnoses"] == ["CKD"]
+        assert sources[0]["document_id"] == "doc-1"
+
+    def test_new_extraction_misses_and_empty_patient_short_circuits(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_aggregate_cache", helpers.OrderedDict())
+        conn = self._conn({"extraction_count": 1, "latest_extraction": "2024-01-02"}, [self._row()])
+        helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+
+        conn.execute.return_value.fetchone.return_value = {"extraction_count": 2, "latest_extraction": "2024-02-01"}
+        helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+        assert conn.execute.call_count == 4
+
+        empty = self._conn({"extraction_count": 0, "latest_extraction": None}, [])
+        assert helpers._aggregate_structured("p-2", tenant_id="t-1", conn=empty) == (None, [])
+        assert empty.execute.call_count == 1
+
+    def test_dedupes_across_documents_keeping_first_spelling(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_aggregate_cache", helpers.OrderedDict())
+        second = self._row()
+        second.update(
+            diagnoses=[" ckd ", "Anemia"],
+            medications=["Metformin", "metformin"],
+            labs=[{"test": "Creatinine", "value": "1.9"}, {"test": "Hgb", "value": "10.1"}],
+        )
+        conn = self._conn({"extraction_count": 2, "latest_extraction": "2024-01-02"}, [self._row(), second])
+
+        aggregated, _ = helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+
+        assert aggregated["diagnoses"] == ["CKD", "Anemia"]
+        assert aggregated["medications"] == ["Metformin"]
+        assert [lab["test"] for lab in aggregated["labs"]] == ["Creatinine", "Hgb"]
+
+    def test_large_patient_streams_through_server_side_cursor(self, monkeypatch):
+        from backend.app import helpers
+
+        monkeypatch.setattr(helpers, "_aggregate_cache", helpers.OrderedDict())
+        conn = self._conn({"extraction_count": helpers._AGGREGATE_STREAM_THRESHOLD + 1, "latest_extraction": "2024-01-02"}, [])
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.__iter__.return_value = iter([self._row()])
+
+        aggregated, _ = helpers._aggregate_structured("p-1", tenant_id="t-1", conn=conn)
+
+        conn.cursor.assert_called_once_with(name="aggregate_structured")
+        assert cur.itersize == helpers._AGGREGATE_STREAM_ITERSIZE
+        assert conn.execute.call_count == 1
+        assert aggregated["diagnoses"] == ["CKD"]
+
+
+# ── Embedding de-duplication ───────────────────────────────────
+
+def test_embed_with_cache_embeds_repeated_chunks_once():
+    from backend.app import helpers
+
+    with patch.object(helpers, "embed_texts", side_effect=lambda texts: [[float(len(t))] for t in texts]) as mock_embed:
+        vectors, cache_rows = helpers._embed_with_cache(["Page 1", "Na 140 mmol/L", "Page 1"], tenant_id=None)
+
+    mock_embed.assert_called_once_with(["Page 1", "Na 140 mmol/L"])
+    assert vectors == [[6.0], [13.0], [6.0]]
+    assert cache_rows == []
+
+
+# ── Multi-file upload ──────────────────────────────────────────
+
+def test_upload_documents_inserts_rows_in_one_batch():
+    from contextlib import contextmanager
+
+    from backend.app import helpers
+
+    conn = MagicMock()
+    conn.execute.return_value.fetchone.return_value = {"id": "p-1"}
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.side_effect = [
+        {"id": f"d-{i}", "patient_id": "p-1", "filename": "upload.bin", "content_type": "application/octet-stream", "storage_path": f"p-1/{i}"}
+        for i in (1, 2)
+    ]
+    cur.nextset.side_effect = [True, None]
+
+    @contextmanager
+    def fake_conn():
+        yield conn
+
+    with patch.object(helpers, "get_conn", fake_conn), patch.object(
+        helpers, "upload_bytes_via_signed_url"
+    ) as mock_upload, patch.object(helpers, "_log_action") as mock_log:
+        docs = helpers._upload_documents("p-1", [b"one", b"two"], actor="dr", tenant_id="t-1")
+
+    assert [doc.id for doc in docs] == ["d-1", "d-2"]
+    assert mock_upload.call_count == 2
+    cur.executemany.assert_called_once()
+    assert len(cur.executemany.call_args.args[1]) == 2
+    assert mock_log.call_count == 2
+    conn.commit.assert_called_once()
+
+
+def test_upload_documents_removes_stored_objects_when_insert_fails():
+    from contextlib import contextmanager
+
+    import pytest
+
+    from backend.app import helpers
+
+    conn = MagicMock()
+    conn.execute.return_value.fetchone.return_value = {"id": "p-1"}
+    conn.cursor.return_value.__enter__.return_value.executemany.side_effect = RuntimeError("db down")
+
+    @contextmanager
+    def fake_conn():
+        yield conn
+
+    with patch.object(helpers, "get_conn", fake_conn), patch.object(
+        helpers, "upload_bytes_via_signed_url"
+    ), patch.object(helpers, "delete_bytes") as mock_delete, patch.object(helpers, "_log_action"):
+        with pytest.raises(RuntimeError):
+            helpers._upload_documents("p-1", [b"one", b"two"], actor="dr", tenant_id="t-1")
+
+    bucket, paths = mock_delete.call_args.args
+    assert len(paths) == 2
+    assert all(path.startswith("p-1/") for path in paths)
+    conn.commit.assert_not_called()
@@ -3,7 +3,14 @@ from types import SimpleNamespace
 import pytest
 
 from backend.app.config import get_settings
-from backend.app.ip_whitelist import extract_client_ip
+from backend.app.ip_whitelist import (
+    compile_whitelist,
+    decode_compiled_whitelist,
+    encode_compiled_whitelist,
+    extract_client_ip,
+    is_ip_allowed,
+    is_ip_allowed_compiled,
+)
 
 
 class DummyRequest:
@@ -37,3 +44,18 @@ def test_extract_client_ip_uses_forwarded_header_for_trusted_proxy(monkeypatch):
         remote_ip="10.0.0.1",
     )
     assert extract_client_ip(request) == "203.0.113.9"
+
+
+def test_compiled_whitelist_round_trips_and_matches_uncompiled_check():
+    whitelist = ["10.0.0.1", "192.168.0.0/16", "203.0.113.7/32", "2001:db8::/32"]
+    compiled = decode_compiled_whitelist(encode_compiled_whitelist(compile_whitelist(whitelist)))
+
+    assert compiled == compile_whitelist(whitelist)
+    for client_ip in ("10.0.0.1", "10.0.0.2", "192.168.44.9", "203.0.113.7", "2001:db8::1", "2001:db9::1", "::a00:1"):
+        assert is_ip_allowed_compiled(client_ip, compiled) == is_ip_allowed(client_ip, whitelist)
+
+
+def test_compiled_whitelist_empty_allows_by_default():
+    compiled = compile_whitelist([])
+    assert is_ip_allowed_compiled("10.0.0.1", compiled) is True
+    assert is_ip_allowed_compiled("10.0.0.1", compiled, allow_empty=False) is False
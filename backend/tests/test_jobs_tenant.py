@@ -97,3 +97,124 @@ def test_claim_next_job_from_queue_returns_none_for_stale_queue_entry():
 
         job = claim_next_job_from_queue(timeout_seconds=1)
         assert job is None
+
+
+def test_redis_client_reuses_connection_pool(monkeypatch):
+    from types import SimpleNamespace
+
+    from backend.app import jobs
+
+    settings = SimpleNamespace(redis_url="redis://localhost:6379/0", redis_pool_size=4)
+    monkeypatch.setattr(jobs, "settings", settings)
+    monkeypatch.setattr(jobs, "_redis_pool", None)
+    monkeypatch.setattr(jobs, "_redis_pool_url", None)
+
+    first = jobs._redis_client()
+    second = jobs._redis_client()
+
+    assert first.connection_pool is second.connection_pool
+    assert first.connection_pool.max_connections == 4
+
+    settings.redis_url = "redis://localhost:6379/1"
+    assert jobs._redis_client().connection_pool is not first.connection_pool
+
+
+def test_claim_next_jobs_from_queue_claims_batch_in_queue_order():
+    from backend.app.jobs import claim_next_jobs_from_queue
+
+    with patch("backend.app.jobs._redis_client") as mock_redis_client, patch(
+        "backend.app.jobs.get_conn"
+    ) as mock_get_conn:
+        mock_client = MagicMock()
+        mock_client.blmpop.return_value = ["medchr:jobs", ["job-a", "job-stale", "job-b"]]
+        mock_redis_client.return_value = mock_client
+
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.fetchall.return_value = [
+            {"id": job_id, "tenant_id": "tenant-1", "job_type": "extract", "status": "running",
+             "payload": {}, "patient_id": None, "document_id": None, "attempts": 1}
+            for job_id in ("job-b", "job-a")
+        ]
+
+        jobs = claim_next_jobs_from_queue(5, timeout_seconds=1)
+
+        assert [job.id for job in jobs] == ["job-a", "job-b"]
+        assert mock_client.blmpop.call_args.kwargs == {"direction": "RIGHT", "count": 5}
+        assert mock_conn.execute.call_count == 1
+        assert mock_conn.execute.call_args[0][1] == (["job-a", "job-stale", "job-b"],)
+
+
+def test_claim_with_worker_id_moves_ids_into_processing_list():
+    from backend.app.jobs import claim_next_jobs_from_queue
+
+    with patch("backend.app.jobs._redis_client") as mock_redis_client, patch(
+        "backend.app.jobs.get_conn"
+    ) as mock_get_conn:
+        mock_client = MagicMock()
+        mock_client.blmove.return_value = "job-a"
+        mock_client.pipeline.return_value.execute.return_value = ["job-b", None]
+        mock_redis_client.return_value = mock_client
+
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.fetchall.return_value = [
+            {"id": "job-a", "tenant_id": None, "job_type": "embed", "status": "running",
+             "payload": {}, "patient_id": None, "document_id": None, "attempts": 1}
+        ]
+
+        jobs = claim_next_jobs_from_queue(3, timeout_seconds=1, worker_id="host:1")
+
+        assert [job.id for job in jobs] == ["job-a"]
+        assert mock_client.blmove.call_args[0][:2] == ("medchr:jobs", "medchr:jobs:proc:host:1")
+        # The stale id is released from the processing list straight away.
+        mock_client.pipeline.return_value.lrem.assert_called_once_with("medchr:jobs:proc:host:1", 0, "job-b")
+
+
+def test_enqueue_jobs_batches_inserts_and_redis_push():
+    from backend.app.jobs import JobSpec, enqueue_jobs
+
+    with patch("backend.app.jobs._redis_client") as mock_redis_client, patch(
+        "backend.app.jobs.get_conn"
+    ) as mock_get_conn:
+        mock_client = MagicMock()
+        mock_redis_client.return_value = mock_client
+
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_cur = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cur.fetchone.side_effect = [{"id": "job-1"}, {"id": "job-2"}]
+        mock_cur.nextset.side_effect = [True, None]
+
+        job_ids = enqueue_jobs(
+            [
+                JobSpec("extract", {"document_id": "doc-1"}, tenant_id="tenant-1", document_id="doc-1"),
+                JobSpec("extract", {"document_id": "doc-2"}, tenant_id="tenant-1", document_id="doc-2"),
+            ]
+        )
+
+        assert job_ids == ["job-1", "job-2"]
+        assert mock_cur.executemany.call_count == 1
+        assert len(mock_cur.executemany.call_args[0][1]) == 2
+        mock_conn.commit.assert_called_once()
+        assert mock_client.lpush.call_args[0][1:] == ("job-1", "job-2")
+
+
+def test_start_heartbeat_keeps_beating_while_a_long_job_runs():
+    import time
+
+    from backend.app.jobs import start_heartbeat
+
+    with patch("backend.app.jobs.heartbeat_worker") as mock_heartbeat:
+        stop = start_heartbeat("host:1", interval_seconds=0.01)
+        # Stand-in for a job that outlives several heartbeat intervals.
+        time.sleep(0.1)
+        stop.set()
+        time.sleep(0.02)
+        beats = mock_heartbeat.call_count
+        time.sleep(0.05)
+
+    assert beats >= 3
+    mock_heartbeat.assert_called_with("host:1")
+    # Setting the event stops the thread.
+    assert mock_heartbeat.call_count == beats
@@ -3,14 +3,21 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from backend.app import llm_gateway
 from backend.app.config import get_settings
 from backend.app.llm_gateway import create_chat_completion, create_embedding, redact_messages_if_enabled
 
 
+def _reload_settings(monkeypatch) -> None:
+    # llm_gateway binds settings at import; monkeypatch restores the original on teardown.
+    get_settings.cache_clear()
+    monkeypatch.setattr(llm_gateway, "settings", get_settings())
+
+
 def test_redact_messages_preserves_image_url(monkeypatch):
     # Enable PHI redaction for this test only.
     monkeypatch.setenv("PHI_REDACTION_ENABLED", "true")
-    get_settings.cache_clear()
+    _reload_settings(monkeypatch)
 
     messages = [
         {
@@ -32,11 +39,25 @@ def test_redact_messages_preserves_image_url(monkeypatch):
     get_settings.cache_clear()
 
 
+
+def test_redact_messages_returns_original_list_when_no_phi(monkeypatch):
+    monkeypatch.setenv("PHI_REDACTION_ENABLED", "true")
+    _reload_settings(monkeypatch)
+
+    messages = [
+        {"role": "system", "content": "Summarize the labs."},
+        {"role": "user", "content": [{"type": "text", "text": "Hemoglobin 13.2 g/dL"}]},
+    ]
+
+    assert redact_messages_if_enabled(messages) is messages
+
+    get_settings.cache_clear()
+
 def test_create_chat_completion_requires_tenant_context_in_hipaa_mode(monkeypatch):
     monkeypatch.setenv("HIPAA_MODE", "true")
     monkeypatch.setenv("PHI_PROCESSORS", "openai")
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-    get_settings.cache_clear()
+    _reload_settings(monkeypatch)
 
     with patch("backend.app.llm_gateway.get_tenant_context", return_value=None), patch(
         "backend.app.llm_gateway.get_actor_context", return_value="user-1"
@@ -55,7 +76,7 @@ def test_create_embedding_applies_redaction_and_calls_openai(monkeypatch):
     monkeypatch.setenv("PHI_PROCESSORS", "openai")
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
     monkeypatch.setenv("PHI_REDACTION_ENABLED", "true")
-    get_settings.cache_clear()
+    _reload_settings(monkeypatch)
 
     fake_response = SimpleNamespace(data=[SimpleNamespace(embedding=[0.1, 0.2])], usage=SimpleNamespace(total_tokens=3))
     fake_client = SimpleNamespace(embeddings=SimpleNamespace(create=MagicMock(return_value=fake_response)))
@@ -75,3 +96,168 @@ def test_create_embedding_applies_redaction_and_calls_openai(monkeypatch):
     assert "123-45-6789" not in input_payload
 
     get_settings.cache_clear()
+
+
+def test_load_tenant_phi_policy_is_cached_until_ttl_expires(monkeypatch):
+    policy = {"allow_ai_processing": True, "allowed_processors": ["openai"], "require_redaction": False}
+    monkeypatch.setattr(llm_gateway, "_phi_policy_cache", {})
+
+    with patch("backend.app.llm_gateway.get_conn") as mock_get_conn:
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.fetchone.return_value = policy
+
+        assert llm_gateway._load_tenant_phi_policy("tenant-1") == policy
+        assert llm_gateway._load_tenant_phi_policy("tenant-1") == policy
+        assert mock_conn.execute.call_count == 1
+
+        monkeypatch.setattr(llm_gateway, "_PHI_POLICY_TTL_SECONDS", -1.0)
+        llm_gateway._phi_policy_cache.clear()
+        assert llm_gateway._load_tenant_phi_policy("tenant-1") == policy
+        assert llm_gateway._load_tenant_phi_policy("tenant-1") == policy
+        assert mock_conn.execute.call_count == 3
+
+
+def test_log_phi_egress_queues_event_when_redis_available():
+    import orjson
+
+    mock_client = MagicMock()
+    with patch("backend.app.llm_gateway.get_redis_client", return_value=mock_client), patch(
+        "backend.app.llm_gateway.get_conn"
+    ) as mock_get_conn:
+        llm_gateway._log_phi_egress(
+            tenant_id="tenant-1",
+            actor_id="actor-1",
+            processor="openai",
+            operation="embeddings.create",
+            model="mistral-embed",
+            request_id=None,
+            allowed=True,
+            redaction_applied=False,
+            metadata={"total_tokens": 3},
+        )
+        mock_get_conn.assert_not_called()
+
+    key, payload = mock_client.lpush.call_args.args
+    assert key == llm_gateway.settings.phi_egress_queue_name
+    event = orjson.loads(payload)
+    assert event["tenant_id"] == "tenant-1"
+    assert event["metadata"] == {"total_tokens": 3}
+    assert event["event_time"]
+
+
+def test_drain_phi_egress_events_keeps_batch_in_processing_list_on_write_failure():
+    import orjson
+
+    raw = orjson.dumps({"tenant_id": "tenant-1", "processor": "openai", "operation": "op"}).decode()
+    mock_client = MagicMock()
+    mock_client.lrange.return_value = []
+    mock_client.pipeline.return_value.execute.return_value = [raw, None]
+    with patch("backend.app.llm_gateway.get_redis_client", return_value=mock_client), patch(
+        "backend.app.llm_gateway._write_phi_egress_events", side_effect=RuntimeError("db down")
+    ):
+        assert llm_gateway.drain_phi_egress_events(2, consumer_id="host:1") == 0
+
+    processing = f"{llm_gateway.settings.phi_egress_queue_name}:proc:host:1"
+    mock_client.pipeline.return_value.lmove.assert_called_with(
+        llm_gateway.settings.phi_egress_queue_name, processing, "RIGHT", "LEFT"
+    )
+    mock_client.pipeline.return_value.lrem.assert_not_called()
+
+
+def test_drain_phi_egress_events_retries_leftover_batch_and_releases_after_commit():
+    import orjson
+
+    raw = orjson.dumps({"tenant_id": "tenant-1", "processor": "openai", "operation": "op"}).decode()
+    mock_client = MagicMock()
+    mock_client.lrange.return_value = [raw]
+    with patch("backend.app.llm_gateway.get_redis_client", return_value=mock_client), patch(
+        "backend.app.llm_gateway._write_phi_egress_events"
+    ) as mock_write:
+        assert llm_gateway.drain_phi_egress_events(consumer_id="host:1") == 1
+
+    assert mock_write.call_args.args[0][0]["tenant_id"] == "tenant-1"
+    mock_client.pipeline.return_value.lmove.assert_not_called()
+    mock_client.pipeline.return_value.lrem.assert_called_once_with(
+        f"{llm_gateway.settings.phi_egress_queue_name}:proc:host:1", 1, raw
+    )
+
+
+def test_recover_phi_egress_events_requeues_lists_of_dead_consumers():
+    queue = llm_gateway.settings.phi_egress_queue_name
+    mock_client = MagicMock()
+    mock_client.scan_iter.return_value = [f"{queue}:proc:dead:1", f"{queue}:proc:alive:2"]
+    mock_client.lmove.side_effect = ["event-1", "event-2", None]
+    with patch("backend.app.llm_gateway.get_redis_client", return_value=mock_client), patch(
+        "backend.app.llm_gateway.is_worker_alive", side_effect=lambda consumer: consumer == "alive:2"
+    ):
+        assert llm_gateway.recover_phi_egress_events() == 2
+
+    mock_client.lmove.assert_called_with(f"{queue}:proc:dead:1", queue, "RIGHT", "RIGHT")
+
+
+def test_phi_egress_flusher_alerts_on_queue_backlog(monkeypatch, caplog):
+    import asyncio
+
+    monkeypatch.setattr(
+        llm_gateway,
+        "settings",
+        SimpleNamespace(
+            phi_egress_batch_size=500,
+            phi_egress_flush_interval_seconds=0,
+            phi_egress_queue_alert_depth=100,
+            phi_egress_queue_name="medchr:phi_egress",
+        ),
+    )
+
+    async def run():
+        task = asyncio.create_task(llm_gateway._phi_egress_flusher())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    with patch("backend.app.llm_gateway.drain_phi_egress_events", return_value=0), patch(
+        "backend.app.llm_gateway.phi_egress_queue_depth", return_value=250
+    ):
+        asyncio.run(run())
+
+    assert "PHI egress queue backlog: 250" in caplog.text
+    assert llm_gateway.metrics.gauges["phi_egress_queue_depth"] == 250
+
+
+def test_create_chat_completion_flags_redaction_only_when_text_changed(monkeypatch):
+    monkeypatch.setenv("PHI_REDACTION_ENABLED", "true")
+    _reload_settings(monkeypatch)
+
+    fake_response = SimpleNamespace(model="m", usage=None)
+    fake_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=MagicMock(return_value=fake_response)))
+    )
+    with patch("backend.app.llm_gateway.get_tenant_context", return_value="tenant-1"), patch(
+        "backend.app.llm_gateway.get_actor_context", return_value="actor-1"
+    ), patch("backend.app.llm_gateway._enforce_phi_policy"), patch(
+        "backend.app.llm_gateway.get_openai_client", return_value=fake_client
+    ), patch("backend.app.llm_gateway._log_phi_egress") as mock_log:
+        create_chat_completion(messages=[{"role": "user", "content": "no identifiers here"}])
+        create_chat_completion(messages=[{"role": "user", "content": "SSN 123-45-6789"}])
+
+    flags = [call.kwargs["redaction_applied"] for call in mock_log.call_args_list]
+    assert flags == [False, True]
+
+    get_settings.cache_clear()
+
+
+def test_get_openai_client_reuses_client_per_configuration(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API_KEY", "test-key")
+    _reload_settings(monkeypatch)
+    llm_gateway._cached_openai_client.cache_clear()
+
+    first = llm_gateway.get_openai_client()
+    assert llm_gateway.get_openai_client() is first
+    assert llm_gateway.get_openai_client(timeout_seconds=5) is not first
+
+    llm_gateway._cached_openai_client.cache_clear()
+    get_settings.cache_clear()
@@ -36,3 +36,73 @@ def test_structured_formatter_truncates_large_text_fields():
 
     payload = json.loads(formatter.format(record))
     assert payload["data"]["note"].endswith("[TRUNCATED]")
+
+
+def test_structured_formatter_redacts_all_phi_kinds_in_one_message():
+    formatter = StructuredFormatter()
+
+    redacted = formatter._redact_message("ssn 123-45-6789, mail a.b@example.org, call 555-123-4567 today")
+
+    assert redacted == "ssn [REDACTED], mail [REDACTED], call [REDACTED] today"
+
+
+def test_log_with_context_skips_records_below_logger_level():
+    from unittest.mock import patch
+
+    from backend.app.logging_config import log_debug
+
+    logger = logging.getLogger("test.logging.level")
+    logger.setLevel(logging.INFO)
+    with patch.object(logger, "makeRecord") as make_record:
+        log_debug(logger, "noisy", payload={"a": 1})
+    make_record.assert_not_called()
+
+
+def test_structured_formatter_timestamp_is_utc_iso_with_millis():
+    formatter = StructuredFormatter()
+    logger = logging.getLogger("test.logging.timestamp")
+    record = logger.makeRecord(logger.name, logging.INFO, "", 0, "ok", (), None)
+    record.created = 0.25
+    record.msecs = 250.0
+
+    payload = json.loads(formatter.format(record))
+    assert payload["timestamp"] == "1970-01-01T00:00:00.250Z"
+
+
+def test_structured_formatter_serializes_non_json_values():
+    from decimal import Decimal
+
+    formatter = StructuredFormatter()
+    logger = logging.getLogger("test.logging.serialization")
+    record = logger.makeRecord(logger.name, logging.INFO, "", 0, "ok", (), None)
+    record.extra_data = {"amount": Decimal("1.50"), "codes": {"a", "a"}}
+
+    payload = json.loads(formatter.format(record))
+    assert payload["data"] == {"amount": "1.50", "codes": "{'a'}"}
+
+
+def test_redact_sensitive_limits_depth_and_list_length():
+    formatter = StructuredFormatter()
+    nested = {"a": {"b": {"c": {"d": {"e": {"f": {"g": 1}}}}}}}
+
+    redacted = formatter._redact_sensitive({"Token": "x", "items": list(range(25)), "nested": nested, 3: "ok"})
+
+    assert redacted["Token"] == "[REDACTED]"
+    assert redacted["items"] == list(range(10))
+    assert redacted[3] == "ok"
+    assert redacted["nested"]["a"]["b"]["c"]["d"]["e"] == "[DEPTH_LIMIT]"
+
+
+def test_clear_request_context_restores_outer_values():
+    from backend.app.logging_config import clear_request_context, request_id_var, set_request_context, user_id_var
+
+    outer = set_request_context(request_id="outer")
+    inner = set_request_context(request_id="inner", user_id="user-1")
+    assert request_id_var.get() == "inner"
+
+    clear_request_context(inner)
+    assert request_id_var.get() == "outer"
+    assert user_id_var.get() is None
+
+    clear_request_context(outer)
+    assert request_id_var.get() is None
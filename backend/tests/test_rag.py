@@ -16,15 +16,83 @@ def test_retrieve_top_chunks_filters_by_embedding_dimension():
         assert result == []
         sql, params = mock_conn.execute.call_args[0]
         assert "vector_dims(e.embedding) = %s" in sql
-        assert "ORDER BY distance" in sql
+        assert "ORDER BY neg_inner_product" in sql
         assert params[1] == "patient-1"
         assert params[2] == 3
 
 
+def test_retrieve_top_chunks_rescores_hamming_candidates():
+    from backend.app.rag import RESCORE_CANDIDATES_PER_RESULT
+
+    with patch("backend.app.rag.embed_texts", return_value=[[0.6, 0.8]]), patch(
+        "backend.app.rag.get_conn"
+    ) as mock_get_conn:
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.fetchall.return_value = []
+
+        retrieve_top_chunks("patient-1", "renal labs", top_k=30)
+
+        set_sql, set_params = mock_conn.execute.call_args_list[0][0]
+        assert "hnsw.ef_search" in set_sql
+        assert int(set_params[0]) == 30 * RESCORE_CANDIDATES_PER_RESULT
+        sql, params = mock_conn.execute.call_args_list[2][0]
+        assert "ORDER BY e.embedding_bits <~> binary_quantize(%s)" in sql
+        assert params[-2:] == (30 * RESCORE_CANDIDATES_PER_RESULT, 30)
+
+
+def test_retrieve_top_chunks_falls_back_to_exact_scan_when_candidates_run_short():
+    row = {
+        "chunk_text": "Creatinine elevated",
+        "neg_inner_product": -0.875,
+        "document_id": "doc-1",
+        "filename": "lab_report.pdf",
+        "content_type": "application/pdf",
+    }
+
+    with patch("backend.app.rag.embed_texts", return_value=[[0.6, 0.8]]), patch(
+        "backend.app.rag.get_conn"
+    ) as mock_get_conn:
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        # The filtered HNSW pass finds nothing; the patient has one chunk.
+        mock_conn.execute.return_value.fetchall.side_effect = [[], [row]]
+
+        result = retrieve_top_chunks("patient-1", "creatinine", top_k=5)
+
+        sql, params = mock_conn.execute.call_args[0]
+        assert "embedding_bits" not in sql
+        assert "ORDER BY neg_inner_product" in sql
+        assert params[1:] == ("patient-1", 2, 5)
+    assert [r["chunk_text"] for r in result] == ["Creatinine elevated"]
+
+
+def test_retrieve_top_chunks_skips_exact_scan_when_candidates_fill_top_k():
+    row = {
+        "chunk_text": "Creatinine elevated",
+        "neg_inner_product": -0.875,
+        "document_id": "doc-1",
+        "filename": "lab_report.pdf",
+        "content_type": "application/pdf",
+    }
+
+    with patch("backend.app.rag.embed_texts", return_value=[[0.6, 0.8]]), patch(
+        "backend.app.rag.get_conn"
+    ) as mock_get_conn:
+        mock_conn = MagicMock()
+        mock_get_conn.return_value.__enter__.return_value = mock_conn
+        mock_conn.execute.return_value.fetchall.return_value = [row, row]
+
+        retrieve_top_chunks("patient-1", "creatinine", top_k=2)
+
+        assert mock_conn.execute.call_count == 3
+        assert "embedding_bits" in mock_conn.execute.call_args[0][0]
+
+
 def test_retrieve_top_chunks_maps_row_payload():
     row = {
         "chunk_text": "Creatinine elevated",
-        "distance": 0.12,
+        "neg_inner_product": -0.875,
         "chunk_index": 4,
         "chunk_start": 100,
         "chunk_end": 140,
@@ -45,7 +113,7 @@ def test_retrieve_top_chunks_maps_row_payload():
 
     assert len(result) == 1
     assert result[0]["chunk_text"] == "Creatinine elevated"
-    assert result[0]["distance"] == 0.12
+    assert result[0]["distance"] == 0.5
     assert result[0]["document_id"] == "doc-1"
 
 
@@ -53,7 +121,7 @@ def test_retrieve_top_chunks_filters_by_min_similarity():
     """Chunks with distance > min_similarity should be excluded."""
     close_row = {
         "chunk_text": "Relevant result",
-        "distance": 0.3,
+        "neg_inner_product": -0.875,
         "chunk_index": 0,
         "chunk_start": 0,
         "chunk_end": 50,
@@ -64,7 +132,7 @@ def test_retrieve_top_chunks_filters_by_min_similarity():
     }
     far_row = {
         "chunk_text": "Irrelevant result",
-        "distance": 0.95,
+        "neg_inner_product": -0.5,
         "chunk_index": 1,
         "chunk_start": 50,
         "chunk_end": 100,
@@ -87,5 +155,19 @@ def test_retrieve_top_chunks_filters_by_min_similarity():
     assert result[0]["chunk_text"] == "Relevant result"
 
 
+def test_embed_texts_returns_unit_vectors():
+    from types import SimpleNamespace
+
+    from backend.app.embeddings import embed_texts
+
+    response = SimpleNamespace(data=[SimpleNamespace(embedding=[3.0, 4.0])])
+    with patch("backend.app.embeddings._create_embeddings", return_value=response), patch(
+        "backend.app.embeddings.get_settings"
+    ) as mock_settings:
+        mock_settings.return_value.openai_api_key = "sk-test"
+        mock_settings.return_value.embedding_batch_size = 32
+        assert embed_texts(["creatinine"]) == [[0.6, 0.8]]
+
+
 def test_default_min_similarity_is_reasonable():
     assert 0.5 <= DEFAULT_MIN_SIMILARITY <= 1.0
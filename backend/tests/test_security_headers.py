@@ -1,9 +1,9 @@
 import asyncio
 
-from starlette.requests import Request
+from starlette.datastructures import Headers
 from starlette.responses import Response
 
-from backend.app.main import security_headers_middleware
+from backend.app.middleware import SecurityHeadersMiddleware
 
 
 def _directive_value(csp: str, directive: str) -> str:
@@ -14,30 +14,104 @@ def _directive_value(csp: str, directive: str) -> str:
     return ""
 
 
+def _run(middleware_kwargs: dict | None = None, path: str = "/health") -> tuple[Headers, dict]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8000),
+        "scheme": "http",
+    }
+    messages: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = SecurityHeadersMiddleware(Response("ok"), **(middleware_kwargs or {}))
+    asyncio.run(middleware(scope, receive, send))
+    return Headers(raw=messages[0]["headers"]), scope
+
+
 def test_csp_uses_nonce_for_scripts_without_unsafe_inline():
-    async def _run():
-        scope = {
-            "type": "http",
-            "asgi": {"version": "3.0"},
-            "method": "GET",
-            "path": "/health",
-            "raw_path": b"/health",
-            "query_string": b"",
-            "headers": [],
-            "client": ("127.0.0.1", 12345),
-            "server": ("127.0.0.1", 8000),
-            "scheme": "http",
-        }
-        request = Request(scope)
-        async def call_next(_: Request) -> Response:
-            return Response("ok")
-        return await security_headers_middleware(request, call_next)
-
-    response = asyncio.run(_run())
-    csp = response.headers.get("Content-Security-Policy", "")
+    headers, scope = _run()
+    csp = headers.get("Content-Security-Policy", "")
     assert csp
 
     script_src = _directive_value(csp, "script-src")
     assert script_src
-    assert "'nonce-" in script_src
+    assert f"'nonce-{scope['csp_nonce']}'" in script_src
     assert "'unsafe-inline'" not in script_src
+
+
+def test_security_headers_include_hsts_only_when_enabled():
+    headers, _ = _run()
+    assert "Strict-Transport-Security" not in headers
+    assert headers["X-Frame-Options"] == "DENY"
+
+    headers, _ = _run({"referrer_policy": "same-origin", "hsts": True})
+    assert headers["Strict-Transport-Security"].startswith("max-age=")
+    assert headers["Referrer-Policy"] == "same-origin"
+
+
+def test_metrics_path_prefers_route_template():
+    from types import SimpleNamespace
+
+    from backend.app.middleware import MetricsMiddleware
+
+    route = SimpleNamespace(path="/ui/patients/{patient_id}/report")
+    assert MetricsMiddleware._metric_path({"path": "/ui/patients/p-1/report", "route": route}) == route.path
+    assert MetricsMiddleware._metric_path({"path": "/documents/d-1/raw"}) == "/documents/:id"
+    assert MetricsMiddleware._metric_path({"path": "/health"}) == "/health"
+
+
+def test_db_context_middleware_skips_probe_paths():
+    from unittest.mock import patch
+
+    from backend.app.middleware import DbContextMiddleware
+
+    async def app(scope, receive, send):
+        return None
+
+    middleware = DbContextMiddleware(app)
+    with patch("backend.app.middleware.clear_tenant_context") as mock_clear:
+        asyncio.run(middleware({"type": "http", "path": "/health"}, None, None))
+        asyncio.run(middleware({"type": "http", "path": "/static/app.css"}, None, None))
+        mock_clear.assert_not_called()
+
+        asyncio.run(middleware({"type": "http", "path": "/ui"}, None, None))
+        assert mock_clear.call_count == 2
+
+
+def test_request_id_middleware_sets_log_context_for_the_request():
+    from backend.app.logging_config import request_id_var
+    from backend.app.middleware import RequestIdMiddleware
+
+    seen: list[str | None] = []
+
+    async def app(scope, receive, send):
+        seen.append(request_id_var.get())
+
+    scope = {"type": "http", "path": "/ui", "headers": [(b"x-request-id", b"req-123")]}
+    asyncio.run(RequestIdMiddleware(app)(scope, None, None))
+
+    assert seen == ["req-123"]
+    assert scope["state"]["request_id"] == "req-123"
+    assert request_id_var.get() is None
+
+
+def test_nonce_buffer_hands_out_unique_tokens_across_refills():
+    from backend.app.middleware import _NonceBuffer
+
+    buffer = _NonceBuffer(nonce_bytes=16, block_size=64)
+    tokens = [buffer.token() for _ in range(20)]
+
+    assert len(set(tokens)) == len(tokens)
+    assert all(len(token) == 22 for token in tokens)
@@ -7,13 +7,19 @@ from backend.scripts import worker
 
 
 def _settings():
-    return SimpleNamespace(log_level="INFO", job_poll_interval_seconds=0, job_max_attempts=3)
+    return SimpleNamespace(
+        log_level="INFO",
+        job_poll_interval_seconds=0,
+        job_max_attempts=3,
+        job_claim_batch_size=10,
+        job_worker_tenant_id=None,
+    )
 
 
 def test_worker_marks_failed_when_attempts_exceed_threshold():
     job = SimpleNamespace(id="job-1", job_type="extract", payload={}, tenant_id=None, attempts=4)
     with patch("backend.scripts.worker.get_settings", return_value=_settings()), patch(
-        "backend.scripts.worker.claim_next_job_from_queue", side_effect=[job, KeyboardInterrupt]
+        "backend.scripts.worker.claim_next_jobs_from_queue", side_effect=[[job], KeyboardInterrupt]
     ), patch("backend.scripts.worker.claim_next_job", return_value=None), patch(
         "backend.scripts.worker.mark_job_failed"
     ) as mock_failed, patch(
@@ -26,14 +32,15 @@ def test_worker_marks_failed_when_attempts_exceed_threshold():
         with pytest.raises(KeyboardInterrupt):
             worker.main()
 
-    mock_failed.assert_called_once_with("job-1", "max attempts exceeded")
+    mock_failed.assert_called_once()
+    assert mock_failed.call_args[0] == ("job-1", "max attempts exceeded")
     mock_handle.assert_not_called()
 
 
 def test_worker_marks_failed_when_job_handler_raises():
     job = SimpleNamespace(id="job-2", job_type="extract", payload={}, tenant_id=None, attempts=1)
     with patch("backend.scripts.worker.get_settings", return_value=_settings()), patch(
-        "backend.scripts.worker.claim_next_job_from_queue", side_effect=[job, KeyboardInterrupt]
+        "backend.scripts.worker.claim_next_jobs_from_queue", side_effect=[[job], KeyboardInterrupt]
     ), patch("backend.scripts.worker.claim_next_job", return_value=None), patch(
         "backend.scripts.worker.handle_job", side_effect=RuntimeError("boom")
     ), patch("backend.scripts.worker.mark_job_done") as mock_done, patch(
@@ -50,3 +57,38 @@ def test_worker_marks_failed_when_job_handler_raises():
     assert mock_failed.call_count == 1
     assert mock_failed.call_args[0][0] == "job-2"
     assert "boom" in mock_failed.call_args[0][1]
+
+
+def test_worker_stops_heartbeat_thread_on_exit():
+    with patch("backend.scripts.worker.get_settings", return_value=_settings()), patch(
+        "backend.scripts.worker.start_heartbeat"
+    ) as mock_start, patch(
+        "backend.scripts.worker.claim_next_jobs_from_queue", side_effect=KeyboardInterrupt
+    ), patch(
+        "backend.scripts.worker.drain_phi_egress_events"
+    ):
+        with pytest.raises(KeyboardInterrupt):
+            worker.main()
+
+    mock_start.assert_called_once()
+    mock_start.return_value.set.assert_called_once_with()
+
+
+def test_worker_tags_log_context_with_job_while_it_runs():
+    from backend.app.logging_config import request_id_var, tenant_id_var
+
+    job = SimpleNamespace(id="job-3", job_type="extract", payload={}, tenant_id="tenant-1", attempts=1)
+    seen = []
+    with patch("backend.scripts.worker.get_settings", return_value=_settings()), patch(
+        "backend.scripts.worker.claim_next_jobs_from_queue", side_effect=[[job], KeyboardInterrupt]
+    ), patch("backend.scripts.worker.claim_next_job", return_value=None), patch(
+        "backend.scripts.worker.handle_job",
+        side_effect=lambda _job: seen.append((request_id_var.get(), tenant_id_var.get())),
+    ), patch("backend.scripts.worker.mark_job_done"), patch(
+        "backend.scripts.worker.clear_tenant_context"
+    ):
+        with pytest.raises(KeyboardInterrupt):
+            worker.main()
+
+    assert seen == [("job-3", "tenant-1")]
+    assert request_id_var.get() is None
@@ -17,4 +17,4 @@ if [[ -f "$ROOT_DIR/.env" ]]; then
 fi
 
 "$ROOT_DIR/.venv/bin/python" -m backend.scripts.init_db
-"$ROOT_DIR/.venv/bin/uvicorn" app.main:app --app-dir "$ROOT_DIR/backend" --reload
+"$ROOT_DIR/.venv/bin/uvicorn" app.main:app --app-dir "$ROOT_DIR/backend" --reload --loop uvloop --http httptools